@@ -0,0 +1,4 @@
+"""
+Benchmarks for the matching pipeline, run as modules from the microservice
+root, e.g. `python -m benchmarks.parallel_scoring`.
+"""
@@ -0,0 +1,212 @@
+"""
+Seeded synthetic cohorts in the dictionary format MatchingService loads,
+for benchmarks.
+
+Two distributions are available: 'uniform' draws every attribute
+uniformly, while 'realistic' skews area rankings, organization areas and
+locations towards popular choices, draws grades around a class average,
+ties statements to each student's top-ranked areas and gives most
+organizations one or two positions.
+
+Usage Flow:
+    students, organizations = generate_cohort(10000, 500, seed=1)
+    students, organizations = generate_cohort(10000, 500, distribution='realistic')
+    problem = MatchingProblem.from_dicts(students, organizations)
+"""
+
+from typing import Dict, List, Tuple
+import random
+
+# Same vocabularies as db_seed.py
+AREAS_OF_LAW = [
+    'Public Interest',
+    'Social Justice',
+    'Private/Civil',
+    'International Law',
+    'Environment',
+    'Labour',
+    'Family',
+    'Business Law',
+    'IP'
+]
+
+WORK_MODES = ['in-person', 'hybrid', 'remote']
+
+LOCATIONS = [
+    'New York',
+    'Los Angeles',
+    'Chicago',
+    'San Francisco',
+    'Washington DC',
+    'Boston',
+    'Seattle',
+    'Austin',
+    'Remote'
+]
+
+DISTRIBUTIONS = ('uniform', 'realistic')
+
+# Relative popularity of each area, for the 'realistic' distribution
+AREA_POPULARITY = {
+    'Public Interest': 1.6,
+    'Social Justice': 1.3,
+    'Private/Civil': 1.2,
+    'International Law': 1.1,
+    'Environment': 0.9,
+    'Labour': 0.7,
+    'Family': 0.8,
+    'Business Law': 1.8,
+    'IP': 0.6
+}
+
+# Relative share of organizations in each location
+LOCATION_POPULARITY = {
+    'New York': 3.0,
+    'Los Angeles': 1.5,
+    'Chicago': 1.2,
+    'San Francisco': 1.2,
+    'Washington DC': 2.0,
+    'Boston': 1.0,
+    'Seattle': 0.7,
+    'Austin': 0.6,
+    'Remote': 0.8
+}
+
+WORK_MODE_POPULARITY = {'in-person': 2.0, 'hybrid': 2.5, 'remote': 1.0}
+
+def generate_cohort(
+    n_students: int,
+    n_organizations: int,
+    seed: int = 0,
+    positions: Tuple[int, int] = (1, 4),
+    mandatory_fraction: float = 0.2,
+    distribution: str = 'uniform'
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """
+    Generate students and organizations.
+
+    Args:
+        n_students: Number of students
+        n_organizations: Number of organizations
+        seed: Random seed; the same arguments always give the same cohort
+        positions: Inclusive range of available positions per organization
+        mandatory_fraction: Fraction of organizations whose minimum grade
+            is mandatory
+        distribution: 'uniform' or 'realistic' (see module docstring)
+
+    Returns:
+        tuple: (students, organizations) keyed by ID
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown cohort distribution: {distribution}")
+    if distribution == 'realistic':
+        return _realistic_cohort(
+            n_students, n_organizations, random.Random(seed), positions, mandatory_fraction
+        )
+
+    rng = random.Random(seed)
+
+    organizations = {}
+    for j in range(n_organizations):
+        org_id = str(100000 + j)
+        organizations[org_id] = {
+            'id': org_id,
+            'name': f'Organization {j + 1}',
+            'area_of_law': rng.choice(AREAS_OF_LAW),
+            'location': rng.choice(LOCATIONS),
+            'work_mode': rng.choice(WORK_MODES),
+            'available_positions': rng.randint(*positions),
+            'minimum_grade': float(rng.randint(20, 32)),
+            'minimum_grade_mandatory': rng.random() < mandatory_fraction
+        }
+
+    students = {}
+    for i in range(n_students):
+        student_id = str(i + 1)
+        ranks = list(range(1, len(AREAS_OF_LAW) + 1))
+        rng.shuffle(ranks)
+        statement_areas = rng.sample(AREAS_OF_LAW, 3)
+        students[student_id] = {
+            'id': student_id,
+            'rankings': dict(zip(AREAS_OF_LAW, ranks)),
+            'grades': {'overall_grade': round(rng.uniform(18.0, 40.0), 1)},
+            'statements': {area: 'Statement' for area in statement_areas},
+            'statement_ratings': {
+                'clarity': rng.randint(1, 5),
+                'relevance': rng.randint(1, 5),
+                'passion': rng.randint(1, 5)
+            },
+            'preferences': {
+                'location': rng.sample(LOCATIONS, rng.randint(0, 3)),
+                'work_mode': rng.sample(WORK_MODES, rng.randint(0, 2))
+            }
+        }
+
+    return students, organizations
+
+def _realistic_cohort(
+    n_students: int,
+    n_organizations: int,
+    rng: random.Random,
+    positions: Tuple[int, int],
+    mandatory_fraction: float
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Cohort for the 'realistic' distribution."""
+    low, high = positions
+    # Most organizations take one or two students, a few take many
+    position_counts = list(range(low, high + 1))
+    position_weights = [1.0 / (1 + k - low) ** 2 for k in position_counts]
+
+    organizations = {}
+    for j in range(n_organizations):
+        org_id = str(100000 + j)
+        organizations[org_id] = {
+            'id': org_id,
+            'name': f'Organization {j + 1}',
+            'area_of_law': _weighted_choice(rng, AREA_POPULARITY),
+            'location': _weighted_choice(rng, LOCATION_POPULARITY),
+            'work_mode': _weighted_choice(rng, WORK_MODE_POPULARITY),
+            'available_positions': rng.choices(position_counts, position_weights)[0],
+            'minimum_grade': float(round(min(max(rng.gauss(26.0, 3.0), 15.0), 36.0))),
+            'minimum_grade_mandatory': rng.random() < mandatory_fraction
+        }
+
+    students = {}
+    for i in range(n_students):
+        student_id = str(i + 1)
+        ordered_areas = _weighted_permutation(rng, AREA_POPULARITY)
+        # Statements for two to four of the student's top five areas
+        statement_areas = rng.sample(ordered_areas[:5], rng.randint(2, 4))
+        grade = min(max(rng.gauss(29.0, 4.5), 10.0), 40.0)
+        students[student_id] = {
+            'id': student_id,
+            'rankings': {area: rank for rank, area in enumerate(ordered_areas, start=1)},
+            'grades': {'overall_grade': round(grade, 1)},
+            'statements': {area: 'Statement' for area in statement_areas},
+            'statement_ratings': {
+                'clarity': _rating(rng, grade),
+                'relevance': _rating(rng, grade),
+                'passion': _rating(rng, grade)
+            },
+            'preferences': {
+                'location': _weighted_permutation(rng, LOCATION_POPULARITY)[:rng.randint(0, 3)],
+                'work_mode': _weighted_permutation(rng, WORK_MODE_POPULARITY)[:rng.randint(0, 2)]
+            }
+        }
+
+    return students, organizations
+
+def _weighted_choice(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), list(weights.values()))[0]
+
+def _weighted_permutation(rng: random.Random, weights: Dict[str, float]) -> List[str]:
+    """All keys of weights, more popular ones more likely to come first."""
+    # Sorting by u ** (1 / w) samples without replacement proportionally to w
+    keys = [
+        (rng.random() ** (1.0 / w), key) for key, w in weights.items()
+    ]
+    return [key for _, key in sorted(keys, reverse=True)]
+
+def _rating(rng: random.Random, grade: float) -> int:
+    """A 1-5 statement rating loosely correlated with the student's grade."""
+    return min(max(int(round(rng.gauss(1.0 + 4.0 * grade / 40.0, 0.8))), 1), 5)
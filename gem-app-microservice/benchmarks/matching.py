@@ -0,0 +1,220 @@
+"""
+Benchmark suite for multi-round matching: every engine at several cohort
+sizes, reporting wall time, peak RSS, proposals and rounds as JSON so
+runs can be compared across commits.
+
+Each case runs in a fresh process, so peak RSS is that case's own; a case
+that exceeds --timeout is stopped and recorded as such. Rounds follow
+MatchingService.run_matching: later rounds match the students left over
+against the positions left, until max rounds or a round without matches.
+
+Usage:
+    python -m benchmarks.matching --output results.json
+    python -m benchmarks.matching --sizes 1000 10000 --engines heap optimal
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.cohort import DISTRIBUTIONS, generate_cohort
+from gem_app.utils.matching_algorithm import ENGINES, SCORING_MODES, MatchingAlgorithm
+from gem_app.utils.matching_problem import MatchingProblem
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+# Largest cohort each engine runs at by default; beyond these the legacy
+# engine's Python lists and the optimal engine's dense benefit matrix
+# need more memory than a typical host has
+DEFAULT_MAX_STUDENTS = {'legacy': 10000, 'optimal': 10000}
+
+def run_case(
+    n_students: int,
+    n_organizations: int,
+    engine: str,
+    scoring: str = 'sparse',
+    seed: int = 1,
+    distribution: str = 'realistic',
+    max_rounds: int = 3,
+    top_k: Optional[int] = None,
+    decompose: bool = False
+) -> Dict[str, Any]:
+    """
+    Generate a cohort and match it, in the current process.
+
+    Returns:
+        dict: measurements of the matching run (cohort generation excluded)
+    """
+    students, organizations = generate_cohort(
+        n_students, n_organizations, seed=seed, distribution=distribution
+    )
+    problem = MatchingProblem.from_dicts(students, organizations)
+    del students, organizations
+    algorithm = MatchingAlgorithm(
+        scoring=scoring, engine=engine, top_k=top_k, decompose=decompose
+    )
+    baseline_rss = _peak_rss_bytes()
+
+    all_matches: Dict[str, List[str]] = {}
+    unmatched = list(problem.student_ids)
+    rounds = []
+    start = time.perf_counter()
+    while unmatched and len(rounds) < max_rounds:
+        round_start = time.perf_counter()
+        round_matches, _, unmatched = algorithm.run_matching_problem(
+            problem, previous_matches=all_matches
+        )
+        for org_id, student_ids in round_matches.items():
+            all_matches.setdefault(org_id, []).extend(student_ids)
+        rounds.append(dict(
+            algorithm.last_round_stats,
+            matched=sum(len(sids) for sids in round_matches.values()),
+            wall_time_s=time.perf_counter() - round_start
+        ))
+        if not round_matches:
+            break
+    wall_time = time.perf_counter() - start
+
+    return {
+        'students': n_students,
+        'organizations': n_organizations,
+        'positions': int(np.sum(problem.capacities)),
+        'engine': engine,
+        'scoring': scoring,
+        'top_k': top_k,
+        'decompose': decompose,
+        'wall_time_s': wall_time,
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'cohort_rss_bytes': baseline_rss,
+        'proposals': sum(r.get('proposals', 0) for r in rounds),
+        'rounds': len(rounds),
+        'matched': sum(r['matched'] for r in rounds),
+        'round_stats': rounds
+    }
+
+def run_isolated(case: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """run_case in a fresh process; errors and timeouts are recorded in the result."""
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(case, sender))
+    process.start()
+    sender.close()
+
+    result = None
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            # The process died without reporting, e.g. killed when out of memory
+            pass
+    timed_out = process.is_alive() and result is None
+    if process.is_alive():
+        process.terminate()
+    process.join()
+
+    if timed_out:
+        return dict(case, status=f'timed out after {timeout:.0f}s')
+    if result is None:
+        return dict(case, status=f'exited with code {process.exitcode}')
+    return result
+
+def _child(case: Dict[str, Any], sender) -> None:
+    try:
+        result = dict(run_case(**case), status='ok')
+    except Exception as e:
+        result = dict(case, status=f'error: {type(e).__name__}: {str(e)}')
+    sender.send(result)
+    sender.close()
+
+def _peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return int(peak if sys.platform == 'darwin' else peak * 1024)
+
+def _environment() -> Dict[str, Any]:
+    """Commit and host details recorded with the results."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def main():
+    """Run every (size, engine) case and write the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark matching engines across cohort sizes")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="Numbers of students")
+    parser.add_argument("--engines", nargs='+', choices=ENGINES, default=list(ENGINES), help="Engines to run")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default='sparse', help="Scoring mode")
+    parser.add_argument("--students-per-org", type=int, default=20, help="Students per organization")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default='realistic', help="Cohort distribution")
+    parser.add_argument("--seed", type=int, default=1, help="Cohort seed")
+    parser.add_argument("--max-rounds", type=int, default=3, help="Maximum matching rounds")
+    parser.add_argument("--top-k", type=int, default=None, help="Top-K preference lists (heap engine only)")
+    parser.add_argument("--decompose", action='store_true', help="Match connected components separately (heap engine only)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds before a case is stopped")
+    parser.add_argument("--all-sizes", action='store_true', help="Ignore the per-engine size limits")
+    parser.add_argument("--output", default='matching_benchmark.json', help="JSON results file")
+    args = parser.parse_args()
+
+    results = []
+    for n_students in args.sizes:
+        for engine in args.engines:
+            case = {
+                'n_students': n_students,
+                'n_organizations': max(n_students // args.students_per_org, 1),
+                'engine': engine,
+                'scoring': args.scoring,
+                'seed': args.seed,
+                'distribution': args.distribution,
+                'max_rounds': args.max_rounds,
+                'top_k': args.top_k if engine == 'heap' else None,
+                'decompose': args.decompose and engine == 'heap'
+            }
+            limit = DEFAULT_MAX_STUDENTS.get(engine)
+            if limit is not None and n_students > limit and not args.all_sizes:
+                result = dict(case, status=f'skipped: above {limit} students (use --all-sizes)')
+            else:
+                result = run_isolated(case, args.timeout)
+            results.append(result)
+
+            if result['status'] == 'ok':
+                print(
+                    f"students={n_students:<6d} engine={engine:<8s} "
+                    f"time={result['wall_time_s']:.3f}s "
+                    f"peak_rss={result['peak_rss_bytes'] / 2 ** 20:.0f}MB "
+                    f"proposals={result['proposals']} rounds={result['rounds']} "
+                    f"matched={result['matched']}"
+                )
+            else:
+                print(f"students={n_students:<6d} engine={engine:<8s} {result['status']}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': _environment(), 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark ParallelScorer across process counts.
+
+Usage:
+    python -m benchmarks.parallel_scoring --students 50000 --orgs 500 --cores 1 2 4 8
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.cohort import generate_cohort
+from gem_app.utils.matching_algorithm import MatchingAlgorithm
+from gem_app.utils.matching_problem import MatchingProblem
+from gem_app.utils.parallel_scoring import ParallelScorer
+
+def main():
+    """Score one cohort with each core count and print timings."""
+    parser = argparse.ArgumentParser(description="Benchmark multi-core scoring")
+    parser.add_argument("--students", type=int, default=50000, help="Number of students")
+    parser.add_argument("--orgs", type=int, default=500, help="Number of organizations")
+    parser.add_argument("--cores", type=int, nargs='+', default=[1, 2, 4, 8], help="Process counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per core count (best is reported)")
+    parser.add_argument("--seed", type=int, default=1, help="Cohort seed")
+    args = parser.parse_args()
+
+    students, organizations = generate_cohort(args.students, args.orgs, seed=args.seed)
+    problem = MatchingProblem.from_dicts(students, organizations)
+    weights = MatchingAlgorithm().weights
+    print(f"{args.students} students x {args.orgs} organizations")
+
+    reference = None
+    baseline = None
+    for cores in args.cores:
+        scorer = ParallelScorer(weights, workers=cores, min_parallel_pairs=0)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            total_scores = scorer.score(problem)
+            timings.append(time.perf_counter() - start)
+
+        if reference is None:
+            reference = total_scores
+        elif not np.array_equal(reference, total_scores):
+            raise AssertionError(f"Scores with {cores} cores differ from {args.cores[0]} cores")
+
+        best = min(timings)
+        baseline = baseline or best
+        print(f"cores={cores:<3d} best={best:.3f}s speedup={baseline / best:.2f}x")
+
+if __name__ == "__main__":
+    main()
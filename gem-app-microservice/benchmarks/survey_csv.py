@@ -0,0 +1,139 @@
+"""
+Benchmark survey CSV parsing: the untyped read of every column (the path
+before SurveyDataParser.read_csv) against the schema-driven typed reader,
+on a synthetic export with the survey tool's extra metadata columns.
+
+Parse time is the best of --repeat runs; memory is the parsed DataFrame's
+deep size and the peak of Python allocations while parsing.
+
+Usage:
+    python -m benchmarks.survey_csv --students 50000
+    python -m benchmarks.survey_csv --students 20000 --keep survey.csv
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.cohort import AREAS_OF_LAW, LOCATIONS, WORK_MODES
+from gem_app.utils.csv_parser import TEXT_DTYPE, SurveyDataParser
+
+# Columns survey exports carry that the parser never uses
+METADATA_COLUMNS = [
+    'StartDate', 'EndDate', 'Status', 'IPAddress', 'Progress',
+    'Duration (in seconds)', 'Finished', 'RecordedDate', 'ResponseId',
+    'ExternalReference', 'LocationLatitude', 'LocationLongitude',
+    'DistributionChannel', 'UserLanguage'
+]
+
+WORDS = (
+    'law justice community client advocacy policy research court rights '
+    'access practice public interest experience clinic legal fairness'
+).split()
+
+def write_survey(path, n_students, seed=1):
+    """Write a synthetic survey CSV with n_students rows."""
+    rng = random.Random(seed)
+    parser = SurveyDataParser()
+    rows = []
+    for i in range(n_students):
+        row = {
+            'StartDate': '2024-01-15 10:00:00',
+            'EndDate': '2024-01-15 10:25:00',
+            'Status': 'IP Address',
+            'IPAddress': f"10.0.{i % 256}.{rng.randint(1, 254)}",
+            'Progress': 100,
+            'Duration (in seconds)': rng.randint(300, 3000),
+            'Finished': 'True',
+            'RecordedDate': '2024-01-15 10:25:01',
+            'ResponseId': f"R_{i:012d}",
+            'ExternalReference': '',
+            'LocationLatitude': round(rng.uniform(40, 50), 4),
+            'LocationLongitude': round(rng.uniform(-80, -70), 4),
+            'DistributionChannel': 'anonymous',
+            'UserLanguage': 'EN',
+            'RecipientLastName': f"Last{i}",
+            'RecipientFirstName': f"First{i}",
+            'RecipientEmail': f"Student{i}@Example.edu",
+            'Student ID': str(100000000 + i),
+            'Location': ', '.join(rng.sample(LOCATIONS, rng.randint(1, 3))),
+            'WorkMode': rng.choice(WORK_MODES)
+        }
+        ranks = rng.sample(range(1, len(AREAS_OF_LAW) + 1), len(AREAS_OF_LAW))
+        for col, rank in zip(parser.required_columns['rankings'], ranks):
+            row[col] = rank
+        for col in parser.required_columns['statements']:
+            row[col] = ' '.join(rng.choices(WORDS, k=rng.randint(40, 120)))
+        rows.append(row)
+    columns = METADATA_COLUMNS + [col for col in rows[0] if col not in METADATA_COLUMNS]
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+def parse_untyped(path):
+    """Read every column with inferred types, then validate and clean."""
+    parser = SurveyDataParser()
+    df = pd.read_csv(path)
+    if parser._validate_dataframe(df):
+        raise AssertionError("Synthetic survey failed validation")
+    return parser._clean_dataframe(df)
+
+def parse_typed(path):
+    """The typed, column-pruned reader."""
+    df, errors = SurveyDataParser().parse_csv(path)
+    if errors:
+        raise AssertionError(f"Synthetic survey failed validation: {errors}")
+    return df
+
+def measure(parse, path, repeat):
+    """Best parse time, DataFrame deep size and allocation peak (in MB)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = parse(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, min(timings), df.memory_usage(deep=True).sum() / 1e6, peak / 1e6
+
+def main():
+    """Parse one synthetic survey both ways and print time and memory."""
+    parser = argparse.ArgumentParser(description="Benchmark survey CSV parsing")
+    parser.add_argument("--students", type=int, default=50000, help="Number of survey rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per reader (best is reported)")
+    parser.add_argument("--seed", type=int, default=1, help="Survey seed")
+    parser.add_argument("--keep", default=None, help="Write the survey here and keep it")
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(), 'survey.csv')
+    write_survey(path, args.students, seed=args.seed)
+    print(
+        f"{args.students} students, {os.path.getsize(path) / 1e6:.1f} MB on disk, "
+        f"text dtype={TEXT_DTYPE}"
+    )
+
+    results = {}
+    for name, parse in (('untyped', parse_untyped), ('typed', parse_typed)):
+        df, best, frame_mb, peak_mb = measure(parse, path, args.repeat)
+        results[name] = df
+        print(
+            f"reader={name:<8s} best={best:.3f}s columns={len(df.columns)} "
+            f"frame={frame_mb:.1f}MB peak={peak_mb:.1f}MB"
+        )
+
+    survey_parser = SurveyDataParser()
+    if (survey_parser.bulk_process_students(results['untyped'])
+            != survey_parser.bulk_process_students(results['typed'])):
+        raise AssertionError("Typed reader produced different student records")
+
+    if not args.keep:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,23 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     WP_SITE_URL = os.getenv('WP_SITE_URL')
 
+    # Where incremental matching runs keep their snapshot, relative to the
+    # instance folder
+    MATCHING_SNAPSHOT_PATH = os.getenv('MATCHING_SNAPSHOT_PATH', 'matching_snapshot.npz')
+
+    # On-disk cache of computed match scores, relative to the instance
+    # folder (empty to disable)
+    SCORE_CACHE_DIR = os.getenv('SCORE_CACHE_DIR', 'score_cache')
+    SCORE_CACHE_MAX_BYTES = int(os.getenv('SCORE_CACHE_MAX_BYTES', str(1 << 30)))
+
+    # On-disk cache of parsed survey CSVs and grade PDFs, relative to the
+    # instance folder (empty to disable)
+    PARSE_CACHE_DIR = os.getenv('PARSE_CACHE_DIR', 'parse_cache')
+    PARSE_CACHE_MAX_BYTES = int(os.getenv('PARSE_CACHE_MAX_BYTES', str(256 << 20)))
+
+    # Record per-phase timings and counters of matching runs
+    MATCHING_PROFILE = os.getenv('MATCHING_PROFILE', 'false').lower() == 'true'
+
 class DevelopmentConfig(Config):
     """Development config."""
     DEBUG = True
@@ -13,7 +13,7 @@ class Match(BaseModel):
     organization_profile_id = db.Column(db.Integer, db.ForeignKey('organization_profiles.id'))
     faculty_profile_id = db.Column(db.Integer, db.ForeignKey('faculty_profiles.id'))
 
-    status = db.Column(db.String(20), nullable=False)  # 'pending', 'accepted', 'rejected'
+    status = db.Column(db.String(20), nullable=False)  # 'pending', 'accepted', 'rejected', 'superseded'
     match_type = db.Column(db.String(20), nullable=False)  # 'algorithmic', 'manual'
     score = db.Column(db.Float)
     round_number = db.Column(db.Integer)
@@ -136,6 +136,8 @@ class MatchingRound(BaseModel):
     total_organizations = db.Column(db.Integer)
     filled_positions = db.Column(db.Integer)
     error_message = db.Column(db.Text)
+    # Per-phase timings and counters of a profiled run (MatchingProfiler.report)
+    profile = db.Column(db.JSON)
 
     def complete(self, matched_count: int):
         """Mark the matching round as completed."""
@@ -164,6 +166,7 @@ class MatchingRound(BaseModel):
             'matched_students': self.matched_students,
             'total_organizations': self.total_organizations,
             'filled_positions': self.filled_positions,
-            'error_message': self.error_message
+            'error_message': self.error_message,
+            'profile': self.profile
         })
         return base
\ No newline at end of file
@@ -22,6 +22,7 @@ from gem_app.utils.decorators import admin_required
 from gem_app.utils.matching_service import MatchingService  # If used
 from gem_app.utils.pdf_parser import process_grade_pdf      # If you parse PDF files
 from gem_app.utils.csv_parser import process_survey_data    # If you parse CSV data
+from gem_app.utils.parse_cache import default_parse_cache
 from ..models.student import StudentProfile
 
 admin = Blueprint('admin', __name__)
@@ -296,9 +297,12 @@ def update_match(match_id):
         if 'organization_id' in data:
             old_org_id = match_obj.organization_profile_id
             new_org_id = data['organization_id']
+            # filled_positions counts accepted matches only, so moving a
+            # pending match checks for room without taking a position
+            fills_position = match_obj.status == 'accepted'
 
             # Decrement old org's filled_positions
-            if old_org_id and old_org_id != new_org_id:
+            if fills_position and old_org_id and old_org_id != new_org_id:
                 old_org = OrganizationProfile.query.get(old_org_id)
                 if old_org and old_org.filled_positions > 0:
                     old_org.filled_positions -= 1
@@ -309,14 +313,19 @@ def update_match(match_id):
                 new_org = OrganizationProfile.query.get(new_org_id)
                 if new_org.filled_positions >= new_org.available_positions:
                     raise ValueError("Organization has no available positions.")
-                new_org.filled_positions += 1
-                new_org.save()
+                if fills_position:
+                    new_org.filled_positions += 1
+                    new_org.save()
 
             match_obj.organization_profile_id = new_org_id
             match_obj.match_type = 'manual'
             match_obj.modified_by = current_user.id
             match_obj.save()
 
+            # Report any capacity or stability problems the edit introduced
+            verification = MatchingService().verify_matches()
+            return jsonify({'success': True, 'verification': verification})
+
         return jsonify({'success': True})
 
     except ValueError as e:
@@ -326,6 +335,51 @@ def update_match(match_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# ------------------------------------------------------------------------------
+# VERIFY MATCHES
+# ------------------------------------------------------------------------------
+@admin.route('/matching/verify')
+@login_required
+@admin_required
+def verify_matches():
+    """
+    Checks the pending matches for capacity, duplicate and stability
+    problems (blocking pairs). Returns JSON.
+    """
+    try:
+        verification = MatchingService().verify_matches()
+        return jsonify({'success': True, 'verification': verification})
+    except Exception as e:
+        current_app.logger.error(f"Error verifying matches: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ------------------------------------------------------------------------------
+# WEIGHT SWEEP
+# ------------------------------------------------------------------------------
+@admin.route('/matching/sweep', methods=['POST'])
+@login_required
+@admin_required
+def sweep_matching_weights():
+    """
+    Matches the current students under each weight vector in the JSON
+    'weights' list and returns summary metrics per vector. Nothing is saved.
+    """
+    try:
+        data = request.get_json() or {}
+        weight_vectors = data.get('weights')
+        if not weight_vectors:
+            return jsonify({'success': False, 'error': 'weights list is required'}), 400
+
+        sweep = MatchingService().sweep_weights(weight_vectors)
+        return jsonify({'success': True, 'sweep': sweep})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error sweeping matching weights: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ------------------------------------------------------------------------------
 # VIEW GRADES (formerly rendered a template)
 # ------------------------------------------------------------------------------
@@ -525,7 +579,7 @@ def reprocess_grades(student_id):
             raise FileNotFoundError("No PDF found for that student.")
 
         # parse the PDF for new grades
-        grades_data, error_msg = process_grade_pdf(pdf_path)
+        grades_data, error_msg = process_grade_pdf(pdf_path, cache=default_parse_cache())
         if error_msg:
             raise ValueError(error_msg)
 
@@ -600,9 +654,15 @@ def import_survey():
             file.save(filepath)
 
             try:
-                process_survey_data(filepath)
+                # Imported here: the processing package starts its worker threads on import
+                from gem_app.utils.processing import ProcessingPipeline
+
+                # Streamed in chunks and saved in batches, so large exports fit in memory
+                results = ProcessingPipeline().process_survey_stream(filepath)
                 os.remove(filepath)
-                return jsonify({'success': True})
+                if not results['success']:
+                    return jsonify({'error': '; '.join(results['errors']), **results}), 400
+                return jsonify(results)
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         else:
@@ -640,7 +700,7 @@ def upload_grades():
                     filepath = os.path.join(current_app.config['GRADES_FOLDER'], filename)
                     file.save(filepath)
 
-                    grades_data, error = process_grade_pdf(filepath)
+                    grades_data, error = process_grade_pdf(filepath, cache=default_parse_cache())
                     if error:
                         processed_results.append({
                             'filename': filename,
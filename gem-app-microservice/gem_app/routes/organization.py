@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from gem_app.extensions import db
@@ -6,6 +6,7 @@ from gem_app.models.user import User
 from gem_app.models.organization import OrganizationProfile, OrganizationRequirement
 from gem_app.models.matching import Match
 from gem_app.models.student import StudentProfile
+from gem_app.utils.matching_service import MatchingService
 
 organization = Blueprint('organization', __name__)
 
@@ -220,8 +221,18 @@ def match_decision(match_id):
         return jsonify({'success': True, 'status': 'accepted'})
     
     elif action == 'reject':
+        was_pending = match.status == 'pending'
         match.reject(current_user.id, reason)
-        return jsonify({'success': True, 'status': 'rejected'})
+
+        # Offer the freed seat on through a vacancy chain; the rejection is
+        # already saved, so a failed repair leaves it to the next full run
+        repair = None
+        if was_pending:
+            try:
+                repair = MatchingService().repair_rejection(match, current_user.id)
+            except Exception as e:
+                current_app.logger.error(f"Error repairing rejected match {match_id}: {str(e)}")
+        return jsonify({'success': True, 'status': 'rejected', 'repair': repair})
     
     else:
         return jsonify({'error': 'Invalid action; must be "accept" or "reject"'}), 400
\ No newline at end of file
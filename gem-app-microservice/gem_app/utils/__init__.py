@@ -5,6 +5,8 @@ Central initialization point for utility modules.
 from .context_processors import init_template_context
 from .matching_algorithm import MatchingAlgorithm, validate_matching_results
 from .matching_service import MatchingService
+from .matching_problem import MatchingProblem
+from .matching_verifier import verify_matching
 from .wp_auth import verify_wordpress_signature
 from .decorators import (
     admin_required, 
@@ -21,7 +23,9 @@ __all__ = [
     # Matching utilities
     'MatchingAlgorithm',
     'MatchingService',
+    'MatchingProblem',
     'validate_matching_results',
+    'verify_matching',
     
     # WordPress authentication
     'verify_wordpress_signature',
@@ -2,9 +2,19 @@
 
 import pandas as pd
 import numpy as np
+import io
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
 from datetime import datetime
 
@@ -19,6 +29,26 @@ from gem_app.utils.pdf_parser import process_grade_pdf
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bumped whenever parsing changes, so cached parse results are never reused
+SURVEY_PARSER_VERSION = 1
+
+# A rank must be numeric or blank
+RANK_PATTERN = r'^\d+(\.\d+)?$'
+
+# Column types of the typed reader: ranks are nullable ints, text is
+# Arrow-backed when pyarrow is installed. Ranks too large for a fixed-width
+# int wrap around silently; only Int64 wraps to a negative value, which
+# read_csv can detect
+RANK_DTYPE = 'Int64'
+TEXT_DTYPE = 'string[pyarrow]' if pyarrow is not None else object
+
+# Read if present, beyond SurveyDataParser.required_columns
+OPTIONAL_COLUMNS = ['Location', 'WorkMode']
+
+# Rows read per chunk, and most row errors listed, when streaming a survey
+STREAM_CHUNK_ROWS = 5000
+STREAM_MAX_ERRORS = 100
+
 ###############################################################################
 # SurveyDataParser
 ###############################################################################
@@ -57,17 +87,20 @@ class SurveyDataParser:
     ###########################################################################
     # parse_csv
     ###########################################################################
-    def parse_csv(self, csv_content: str) -> Tuple[pd.DataFrame, List[str]]:
+    def parse_csv(self, csv_content: Any) -> Tuple[pd.DataFrame, List[str]]:
         """
-        Parse the raw CSV data (already loaded as a string), validate columns,
-        and clean the DataFrame if no validation errors.
+        Parse the raw CSV data (already loaded as a string, or a path or
+        file object), validate columns, and clean the DataFrame if no
+        validation errors.
 
         Returns (df, errors). If errors, df may be empty.
         """
         try:
             # concurrency_lock.acquire()  # Uncomment if you have concurrency
 
-            df = pd.read_csv(csv_content)
+            if isinstance(csv_content, str) and '\n' in csv_content:
+                csv_content = io.StringIO(csv_content)
+            df = self.read_csv(csv_content)
             validation_errors = self._validate_dataframe(df)
             if not validation_errors:
                 df = self._clean_dataframe(df)
@@ -80,6 +113,83 @@ class SurveyDataParser:
             # if concurrency_lock: concurrency_lock.release()
             return pd.DataFrame(), [str(e)]
 
+    ###########################################################################
+    # read_csv
+    ###########################################################################
+    def read_csv(self, source: Any, chunksize: Optional[int] = None) -> Any:
+        """
+        Read a survey CSV with the schema of csv_schema: only the columns we
+        use, ranks as nullable ints and text as strings, through the
+        pyarrow engine when it is installed (and not reading in chunks).
+
+        If the ranks do not fit the schema (e.g. "abc", "1.5", or a value
+        out of range or negative), the file is read again with ranks as
+        text, so it parses exactly as a chunked read would and
+        _validate_dataframe can report them. Chunked reads (a reader over
+        DataFrames) always read ranks as text, since each chunk is
+        validated row by row.
+        """
+        position = source.tell() if hasattr(source, 'seek') else None
+        header = list(pd.read_csv(source, nrows=0).columns)
+        if position is not None:
+            source.seek(position)
+
+        usecols, dtype = self.csv_schema(header, typed_ranks=chunksize is None)
+        if chunksize is not None:
+            return pd.read_csv(source, usecols=usecols, dtype=dtype, chunksize=chunksize)
+
+        df = None
+        if pyarrow is not None:
+            try:
+                df = pd.read_csv(source, usecols=usecols, dtype=dtype, engine='pyarrow')
+            except Exception as e:
+                logger.debug(f"pyarrow engine could not read the survey, using the C engine: {str(e)}")
+                if position is not None:
+                    source.seek(position)
+        if df is None:
+            try:
+                df = pd.read_csv(source, usecols=usecols, dtype=dtype)
+            except (ValueError, TypeError, OverflowError):
+                pass
+        if df is not None and not self._negative_ranks(df):
+            return df
+
+        if position is not None:
+            source.seek(position)
+        _, dtype = self.csv_schema(header, typed_ranks=False)
+        return pd.read_csv(source, usecols=usecols, dtype=dtype)
+
+    ###########################################################################
+    # _negative_ranks
+    ###########################################################################
+    def _negative_ranks(self, df: pd.DataFrame) -> bool:
+        """Whether a typed rank is negative: written so, or wrapped around."""
+        return any(
+            bool((df[col] < 0).any())
+            for col in self.required_columns['rankings'] if col in df.columns
+        )
+
+    ###########################################################################
+    # csv_schema
+    ###########################################################################
+    def csv_schema(self, header: List[str], typed_ranks: bool = True) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        The columns to read from a CSV with the given header (required and
+        optional ones present, in file order) and their dtypes, generated
+        from required_columns. Missing columns are left for
+        _validate_dataframe to report.
+        """
+        rank_cols = set(self.required_columns['rankings'])
+        wanted = {col for columns in self.required_columns.values() for col in columns}
+        wanted.update(OPTIONAL_COLUMNS)
+
+        usecols = [col for col in header if col in wanted]
+        dtype = {
+            col: RANK_DTYPE if typed_ranks and col in rank_cols else TEXT_DTYPE
+            for col in usecols
+        }
+        return usecols, dtype
+
     ###########################################################################
     # _validate_dataframe
     ###########################################################################
@@ -109,13 +219,29 @@ class SurveyDataParser:
         for col in ranking_cols:
             if col in df.columns:
                 # A “rank” must be numeric or blank
-                mask_invalid = df[col].notna() & (~df[col].astype(str).str.match(r'^\d+(\.\d+)?$'))
+                mask_invalid = df[col].notna() & (~df[col].astype(str).str.match(RANK_PATTERN))
                 invalid_count = df[mask_invalid].shape[0]
                 if invalid_count > 0:
                     errors.append(f"Found {invalid_count} invalid numeric rank values in {col}.")
 
         return errors
 
+    ###########################################################################
+    # _row_errors
+    ###########################################################################
+    def _row_errors(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Per row, what _validate_dataframe would flag in it ('' if nothing):
+        a missing Student ID or invalid numeric ranks. Assumes the required
+        columns are present.
+        """
+        problems = pd.Series('', index=df.index)
+        problems.loc[df['Student ID'].isna()] = 'missing Student ID; '
+        for col in self.required_columns['rankings']:
+            invalid = df[col].notna() & (~df[col].astype(str).str.match(RANK_PATTERN))
+            problems.loc[invalid] += f"invalid rank in {col}; "
+        return problems.str.rstrip('; ')
+
     ###########################################################################
     # _clean_dataframe
     ###########################################################################
@@ -265,21 +391,69 @@ class SurveyDataParser:
     ###########################################################################
     def bulk_process_students(self, df: pd.DataFrame) -> Dict[str, Dict]:
         """
-        For each row in df, create the student's dictionary of data
-        and store by ID.
+        Build every student's dictionary of data (as extract_student_data
+        does for one) in a single pass over the columns, and store by ID.
+        A student listed more than once keeps their first row.
         """
+        students = df.drop_duplicates('Student ID', keep='first').reset_index(drop=True)
+        if students.empty:
+            return {}
+
+        # Rename ranking columns once, e.g. 'PublicInterestRank' => 'PublicInterest'
+        ranking_cols = [col for col in self.required_columns['rankings'] if col in df.columns]
+        rankings = _column_records(
+            students[ranking_cols].astype(float),
+            ranking_cols,
+            [col.replace('Rank', '') for col in ranking_cols]
+        )
+        statement_cols = [col for col in self.required_columns['statements'] if col in df.columns]
+        statements = _column_records(students, statement_cols, statement_cols)
+
+        locations = self._split_preferences(students, 'Location')
+        work_modes = self._split_preferences(students, 'WorkMode')
+
         results = {}
-        for _, row in df.iterrows():
-            sid = str(row['Student ID'])
-            try:
-                data = self.extract_student_data(df, sid)
-                results[sid] = data
-            except Exception as e:
-                logger.error(f"Error in bulk processing for student {sid}: {str(e)}")
-                # current_app.logger.info(f"Bulk process error for {sid}, user {current_user.id}")
-                continue
+        for i, (sid, first_name, last_name, email) in enumerate(zip(
+            students['Student ID'].astype(str).tolist(),
+            students['RecipientFirstName'].tolist(),
+            students['RecipientLastName'].tolist(),
+            students['RecipientEmail'].tolist()
+        )):
+            results[sid] = {
+                'demographic': {
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'email': email,
+                    'student_id': sid
+                },
+                'rankings': rankings[i],
+                'statements': statements[i],
+                'preferences': {
+                    'location': locations[i],
+                    'work_mode': work_modes[i]
+                }
+            }
         return results
 
+    ###########################################################################
+    # _split_preferences
+    ###########################################################################
+    def _split_preferences(self, df: pd.DataFrame, column: str) -> List[List[str]]:
+        """
+        Per row, the comma-separated values of column as a clean list, like
+        _parse_location_preferences but over the whole column at once.
+        Rows without the column or a value get [].
+        """
+        if column not in df.columns:
+            return [[] for _ in range(len(df))]
+
+        parts = df[column].fillna('').astype(str).str.split(',').explode().str.strip()
+        parts = parts[parts != '']
+        # explode keeps rows in order, so each row's values are contiguous
+        bounds = np.searchsorted(parts.index.to_numpy(), np.arange(len(df) + 1)).tolist()
+        values = parts.tolist()
+        return [values[bounds[i]:bounds[i + 1]] for i in range(len(df))]
+
     ###########################################################################
     # export_to_json
     ###########################################################################
@@ -295,9 +469,17 @@ class SurveyDataParser:
             raise
 
 ###############################################################################
-# process_survey_csv
+# _column_records
+###############################################################################
+def _column_records(df: pd.DataFrame, columns: List[str], keys: List[str]) -> List[Dict]:
+    """Per row, {key: value} over the given columns (like to_dict('records'), faster)."""
+    values = [df[col].tolist() for col in columns]
+    return [dict(zip(keys, row)) for row in zip(*values)] if values else [{} for _ in range(len(df))]
+
+###############################################################################
+# process_survey_data
 ###############################################################################
-def process_survey_data(csv_path: str) -> Tuple[Dict[str, Dict], Optional[str]]:
+def process_survey_data(csv_path: str, cache=None) -> Tuple[Dict[str, Dict], Optional[str]]:
     """
     High-level function to parse and process a single CSV file from disk.
     Returns (processed_data, error_msg).
@@ -305,13 +487,19 @@ def process_survey_data(csv_path: str) -> Tuple[Dict[str, Dict], Optional[str]]:
     - processed_data: A dictionary keyed by student ID,
       containing demographic, statements, preferences, etc.
     - error_msg: None if successful, or a string explaining what went wrong.
+
+    With a ParseCache, a CSV processed before (same bytes, same parser
+    version) is returned from the cache without reading it with pandas.
     """
     parser = SurveyDataParser()
     try:
-        with open(csv_path, 'r', encoding='utf-8') as csv_file:
-            csv_content = csv_file.read()
+        if cache is not None:
+            key = cache.key(csv_path, 'survey', SURVEY_PARSER_VERSION)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached, None
 
-        df, validation_errors = parser.parse_csv(csv_content)
+        df, validation_errors = parser.parse_csv(csv_path)
         if validation_errors:
             return {}, "Validation errors: " + "; ".join(validation_errors)
 
@@ -324,12 +512,166 @@ def process_survey_data(csv_path: str) -> Tuple[Dict[str, Dict], Optional[str]]:
             ranking_scores = parser.calculate_ranking_scores(student_data['rankings'])
             student_data['ranking_scores'] = ranking_scores
 
+        if cache is not None:
+            cache.put(key, processed_data)
         return processed_data, None
 
     except Exception as e:
-        logger.error(f"Error in process_survey_csv({csv_path}): {str(e)}")
+        logger.error(f"Error in process_survey_data({csv_path}): {str(e)}")
         return {}, str(e)
 
+###############################################################################
+# SurveyStream
+###############################################################################
+class SurveyStream:
+    """
+    Streams a survey CSV from disk a chunk of rows at a time, for files too
+    large to hold (with their statements) in memory at once.
+
+    Each chunk is validated and cleaned as parse_csv would, and its valid
+    students are yielded as (student_id, data) pairs shaped like
+    process_survey_data's values, ranking_scores included. Instead of
+    rejecting the whole file, rows with a missing Student ID or invalid
+    ranks are skipped and reported in errors by spreadsheet row (the header
+    is row 1). Missing columns are reported and nothing is yielded. A
+    student listed more than once keeps their first row, across chunks too.
+
+    Only the current chunk, plus the IDs seen so far, is held in memory.
+    With a ParseCache, a file streamed before (same bytes, same parser
+    version) is replayed from the cache, a line at a time, without pandas.
+
+    Usage Flow:
+        stream = SurveyStream(csv_path, cache=parse_cache)
+        for batch in stream.batches(500):
+            save(batch)                  # {student_id: data, ...}
+        stream.errors, stream.rows, stream.students
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        parser: Optional[SurveyDataParser] = None,
+        chunksize: int = STREAM_CHUNK_ROWS,
+        max_errors: int = STREAM_MAX_ERRORS,
+        cache=None
+    ):
+        """
+        Args:
+            csv_path: survey CSV on disk
+            parser: parser whose columns and cleaning are used
+            chunksize: rows read at a time
+            max_errors: most row errors listed (all are counted in invalid_rows)
+            cache: optional ParseCache for the streamed students
+        """
+        self.csv_path = csv_path
+        self.parser = parser or SurveyDataParser()
+        self.chunksize = chunksize
+        self.max_errors = max_errors
+        self.cache = cache
+
+        self.errors: List[str] = []
+        self.rows = 0
+        self.students = 0
+        self.invalid_rows = 0
+        self.duplicates = 0
+        self._failed = False
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+        if self.cache is None:
+            yield from self._stream()
+            return
+
+        try:
+            key = self.cache.key(self.csv_path, 'survey-stream', SURVEY_PARSER_VERSION)
+        except OSError as e:
+            logger.error(f"Error streaming survey CSV {self.csv_path}: {str(e)}")
+            self.errors.append(str(e))
+            return
+        entry = self.cache.open(key)
+        if entry is not None:
+            for sid, data in entry:
+                self.students += 1
+                yield sid, data
+            for name, value in (entry.meta or {}).items():
+                setattr(self, name, value)
+            return
+
+        # Cache what is streamed, unless reading fails or the consumer stops early
+        writer = self.cache.writer(key)
+        try:
+            for sid, data in self._stream():
+                writer.add(sid, data)
+                yield sid, data
+            if not self._failed:
+                writer.meta = {
+                    'errors': self.errors,
+                    'rows': self.rows,
+                    'students': self.students,
+                    'invalid_rows': self.invalid_rows,
+                    'duplicates': self.duplicates
+                }
+                writer.commit()
+        finally:
+            writer.discard()
+
+    def _stream(self) -> Iterator[Tuple[str, Dict]]:
+        seen = set()
+        try:
+            with self.parser.read_csv(self.csv_path, chunksize=self.chunksize) as chunks:
+                for chunk in chunks:
+                    if self.rows == 0:
+                        missing = self._missing_columns(chunk)
+                        if missing:
+                            self.errors.extend(missing)
+                            return
+                    self.rows += len(chunk)
+                    for sid, data in self._process_chunk(chunk, seen):
+                        self.students += 1
+                        yield sid, data
+        except Exception as e:
+            logger.error(f"Error streaming survey CSV {self.csv_path}: {str(e)}")
+            self.errors.append(str(e))
+            self._failed = True
+
+    def batches(self, batch_size: int) -> Iterator[Dict[str, Dict]]:
+        """The streamed students as dicts of at most batch_size, by ID."""
+        batch = {}
+        for sid, data in self:
+            batch[sid] = data
+            if len(batch) >= batch_size:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def _missing_columns(self, df: pd.DataFrame) -> List[str]:
+        errors = []
+        for category, columns in self.parser.required_columns.items():
+            missing_cols = [col for col in columns if col not in df.columns]
+            if missing_cols:
+                errors.append(f"Missing {category} columns: {', '.join(missing_cols)}")
+        return errors
+
+    def _process_chunk(self, chunk: pd.DataFrame, seen: set) -> Iterator[Tuple[str, Dict]]:
+        # Chunks keep numbering rows from the start of the file
+        problems = self.parser._row_errors(chunk)
+        invalid = problems != ''
+        self.invalid_rows += int(invalid.sum())
+        for row, problem in problems[invalid].items():
+            if len(self.errors) < self.max_errors:
+                self.errors.append(f"Row {row + 2}: {problem}")
+
+        chunk = self.parser._clean_dataframe(chunk[~invalid].copy())
+        students = self.parser.bulk_process_students(chunk)
+        self.duplicates += len(chunk) - len(students)
+        for sid, data in students.items():
+            if sid in seen:
+                self.duplicates += 1
+                continue
+            seen.add(sid)
+            data['ranking_scores'] = self.parser.calculate_ranking_scores(data['rankings'])
+            yield sid, data
+
 ###############################################################################
 # DataBatchProcessor
 ###############################################################################
@@ -337,67 +679,145 @@ class DataBatchProcessor:
     """
     Processes multiple CSV and PDF files in one pass, merging them by student ID.
     No guesswork—this absolutely calls process_grade_pdf from pdf_parser.
+
+    With parallel=True, files are parsed in a ProcessPoolExecutor (PDF text
+    extraction is CPU-bound) and merged as workers finish. The merge gives
+    the same result as the sequential order: a later CSV overrides an
+    earlier one for a student, a later PDF replaces earlier grades.
+
+    After each batch, file_stats holds per file its 'file', 'kind'
+    ('csv' or 'pdf'), parse 'seconds' and 'error' (None on success).
     """
 
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: processes for parallel batches (defaults to the CPU count)
+        """
         self.survey_parser = SurveyDataParser()
+        self.workers = workers or os.cpu_count() or 1
+        self.file_stats: List[Dict] = []
 
     def process_batch(
         self,
         csv_files: List[str],
-        pdf_files: List[str]
+        pdf_files: List[str],
+        parallel: bool = False
     ) -> Tuple[Dict[str, Dict], List[str]]:
         """
         For each CSV in csv_files, parse + build data. For each PDF in pdf_files,
         parse + merge 'grades' into the existing data dict by matching student_id.
+        Errors are attributed to the file they came from.
 
         Returns (merged_data, error_list).
         """
         errors = []
         merged_data = {}
+        # Per ('csv' or 'pdf', student ID), index of the file whose data was kept
+        owners = {}
+        self.file_stats = []
 
         # concurrency_lock.acquire()  # Uncomment if concurrency is used
 
-        # Process all CSVs
-        for csvf in csv_files:
-            try:
-                data, err = process_survey_csv(csvf)
-                if err:
-                    errors.append(f"{csvf}: {err}")
-                else:
-                    # Merge into merged_data
-                    for sid, stud_data in data.items():
-                        if sid not in merged_data:
-                            merged_data[sid] = stud_data
-                        else:
-                            # If that student ID is already present, we could merge fields
-                            merged_data[sid].update(stud_data)
-            except Exception as e:
-                errors.append(f"{csvf}: {str(e)}")
-
-        # Process all PDFs
-        for pdff in pdf_files:
-            try:
-                pdf_data, pdf_err = process_grade_pdf(pdff)
-                if pdf_err:
-                    errors.append(f"{pdff}: {pdf_err}")
-                else:
-                    sid = pdf_data.get('student_id')
-                    if sid is None:
-                        errors.append(f"{pdff}: No student_id found in PDF data.")
-                        continue
-
-                    # Merge PDF grades into the existing record or create a new one
-                    if sid not in merged_data:
-                        merged_data[sid] = {}
-                    merged_data[sid]['grades'] = pdf_data
-            except Exception as e:
-                errors.append(f"{pdff}: {str(e)}")
+        # CSVs before PDFs, as in the sequential order
+        files = [('csv', path) for path in csv_files] + [('pdf', path) for path in pdf_files]
+        workers = min(self.workers, len(files)) if parallel else 1
+        start = time.perf_counter()
+
+        if workers < 2:
+            for index, (kind, path) in enumerate(files):
+                result = _parse_batch_file(kind, path)
+                self._merge_file(index, kind, path, result, merged_data, owners, errors)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context()
+            ) as executor:
+                futures = {
+                    executor.submit(_parse_batch_file, kind, path): (index, kind, path)
+                    for index, (kind, path) in enumerate(files)
+                }
+                for future in as_completed(futures):
+                    index, kind, path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # The worker itself failed, e.g. the process died
+                        result = ({}, str(e), 0.0)
+                    self._merge_file(index, kind, path, result, merged_data, owners, errors)
 
         # concurrency_lock.release()  # Uncomment if concurrency is used
 
+        # Report errors in file order, however the files finished
+        errors = [message for _, message in sorted(errors, key=lambda error: error[0])]
+        logger.info(
+            f"Processed {len(csv_files)} CSV and {len(pdf_files)} PDF files "
+            f"in {time.perf_counter() - start:.2f}s on {max(workers, 1)} process(es), "
+            f"{len(errors)} error(s)"
+        )
         return merged_data, errors
 
+    def _merge_file(
+        self,
+        index: int,
+        kind: str,
+        path: str,
+        result: Tuple[Dict, Optional[str], float],
+        merged_data: Dict[str, Dict],
+        owners: Dict[Tuple[str, str], int],
+        errors: List[Tuple[int, str]]
+    ) -> None:
+        """
+        Merge one file's parse result, in whatever order files finish: data
+        from a later file (higher index) wins over an earlier one.
+        """
+        data, err, seconds = result
+        self.file_stats.append({'file': path, 'kind': kind, 'seconds': seconds, 'error': err})
+        if err:
+            errors.append((index, f"{path}: {err}"))
+            return
+
+        if kind == 'csv':
+            for sid, stud_data in data.items():
+                record = merged_data.setdefault(sid, {})
+                if owners.get(('csv', sid), -1) < index:
+                    record.update(stud_data)
+                    owners[('csv', sid)] = index
+                else:
+                    # A later CSV already merged; only fill what it lacked
+                    for key, value in stud_data.items():
+                        record.setdefault(key, value)
+            return
+
+        sid = data.get('student_id')
+        if sid is None:
+            errors.append((index, f"{path}: No student_id found in PDF data."))
+            self.file_stats[-1]['error'] = "No student_id found in PDF data."
+            return
+
+        # Merge PDF grades into the existing record or create a new one
+        if owners.get(('pdf', sid), -1) < index:
+            merged_data.setdefault(sid, {})['grades'] = data
+            owners[('pdf', sid)] = index
+
+###############################################################################
+# _parse_batch_file
+###############################################################################
+def _parse_batch_file(kind: str, path: str) -> Tuple[Dict, Optional[str], float]:
+    """
+    Parse one batch file, in a worker process or in-process.
+    Returns (data, error_msg, seconds); exceptions become the error.
+    """
+    start = time.perf_counter()
+    try:
+        if kind == 'csv':
+            data, err = process_survey_data(path)
+        else:
+            data, err = process_grade_pdf(path)
+    except Exception as e:
+        data, err = {}, str(e)
+    return data, err, time.perf_counter() - start
+
 ###############################################################################
 # validate_batch_results
 ###############################################################################
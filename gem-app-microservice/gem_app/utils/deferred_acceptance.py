@@ -0,0 +1,215 @@
+"""
+Heap-based student-proposing deferred acceptance (Gale-Shapley) over
+integer-indexed students and organizations.
+
+Each student keeps a pointer into its preference list and each organization
+keeps a min-heap of its current matches bounded by its capacity, so every
+proposal or bump costs O(log capacity). Free students wait in a FIFO deque.
+
+Tie-breaking follows MatchingAlgorithm's original loop exactly: among equal
+scores an organization keeps whoever it accepted first, and a bumped student
+re-proposes to the organization that bumped it before moving on.
+
+Preference lists may be truncated: when a student runs out of choices, the
+optional extend callback is asked to append more to that student's lists in
+place before the student gives up.
+
+run() can be given a deadline; when it passes, the students still waiting
+to propose are left in pending and the matching so far is kept, so run()
+can be called again to continue.
+
+Usage Flow:
+    da = DeferredAcceptance(preferences, scores, capacities)
+    da.run(range(len(preferences)))
+    matches = da.matches()   # {org_index: [student_index, ...]}
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class DeferredAcceptance:
+    """
+    Proposal state for one deferred acceptance run.
+
+    Attributes:
+        next_choice: per student, index of the next preference to propose to
+        assignment: per student, matched org index or -1
+        org_heaps: per org, heap of (score, -sequence, student) entries
+        proposals: number of proposals made so far
+        bumps: number of matched students displaced so far
+        extended: students whose preference lists were extended
+        pending: students still free to propose when a run hit its deadline
+    """
+
+    def __init__(
+        self,
+        preferences: List[List[int]],
+        scores: List[List[float]],
+        capacities: List[int],
+        extend: Optional[Callable[[int], bool]] = None
+    ):
+        """
+        Args:
+            preferences: per student, org indexes in descending preference order
+            scores: per student, the score for each entry of preferences
+            capacities: per org, number of positions available
+            extend: called with a student index when that student's list is
+                exhausted; appends to preferences/scores and returns True if
+                it added anything
+        """
+        self.preferences = preferences
+        self.scores = scores
+        self.capacities = capacities
+        self.extend = extend
+
+        self.next_choice: List[int] = [0] * len(preferences)
+        self.assignment: List[int] = [-1] * len(preferences)
+        self.org_heaps: List[List[Tuple[float, int, int]]] = [[] for _ in capacities]
+
+        # Orgs that have rejected or bumped someone keep score order on output
+        self._contested: List[bool] = [False] * len(capacities)
+        # Orgs in the order they first received a proposal
+        self._proposed_orgs: Dict[int, None] = {}
+        self._sequence = 0
+
+        self.proposals = 0
+        self.bumps = 0
+        self.extended: Set[int] = set()
+        self.pending: List[int] = []
+
+    def run(self, free_students: Iterable[int], deadline: Optional[float] = None) -> bool:
+        """
+        Let free students propose until each is matched or out of choices,
+        or until the deadline passes.
+
+        Args:
+            free_students: student indexes to process, in queue order
+            deadline: optional time.perf_counter() value to stop at
+
+        Returns:
+            bool: True if every student was processed, False if the
+            deadline stopped the run (the rest are in pending)
+        """
+        queue = deque(free_students)
+        preferences = self.preferences
+        scores = self.scores
+        capacities = self.capacities
+        next_choice = self.next_choice
+        assignment = self.assignment
+        org_heaps = self.org_heaps
+
+        while queue:
+            # The clock is read once every 1024 proposals
+            if (
+                deadline is not None
+                and not self.proposals & 1023
+                and time.perf_counter() >= deadline
+            ):
+                self.pending = list(queue)
+                return False
+            sid = queue.popleft()
+            choice = next_choice[sid]
+            prefs = preferences[sid]
+            if choice >= len(prefs):
+                if self.extend is None or not self.extend(sid):
+                    # No viable org left for this student
+                    continue
+                self.extended.add(sid)
+
+            org = prefs[choice]
+            self._sequence += 1
+            self.proposals += 1
+            self._proposed_orgs.setdefault(org, None)
+            entry = (scores[sid][choice], -self._sequence, sid)
+            heap = org_heaps[org]
+
+            if len(heap) < capacities[org]:
+                # Organization has space, accept the student
+                heapq.heappush(heap, entry)
+                assignment[sid] = org
+                continue
+
+            # Organization is full: the lowest score (latest on ties) loses
+            self._contested[org] = True
+            loser = heapq.heappushpop(heap, entry)[2]
+            if loser == sid:
+                next_choice[sid] += 1
+            else:
+                assignment[sid] = org
+                assignment[loser] = -1
+                self.bumps += 1
+            queue.append(loser)
+
+        return True
+
+    def seat(self, sid: int, choice: int) -> bool:
+        """
+        Place a student at the choice-th org of their list without a
+        proposal, e.g. to restore a previous matching before a repair.
+
+        Returns:
+            bool: False (and the student stays free) if the org is full
+        """
+        org = self.preferences[sid][choice]
+        heap = self.org_heaps[org]
+        if len(heap) >= self.capacities[org]:
+            return False
+        self._sequence += 1
+        self._proposed_orgs.setdefault(org, None)
+        heapq.heappush(heap, (self.scores[sid][choice], -self._sequence, sid))
+        self.next_choice[sid] = choice
+        self.assignment[sid] = org
+        return True
+
+    def release(self, sid: int) -> int:
+        """
+        Remove a student from their org, leaving them free.
+
+        Returns:
+            int: the org index the student left, or -1 if they were free
+        """
+        org = self.assignment[sid]
+        if org < 0:
+            return -1
+        heap = self.org_heaps[org]
+        heap[:] = [entry for entry in heap if entry[2] != sid]
+        heapq.heapify(heap)
+        self.assignment[sid] = -1
+        return org
+
+    def acceptance_threshold(self, org: int) -> float:
+        """
+        Score a new proposal must exceed to be accepted by org: -inf while
+        it has room, else its lowest current score (inf with no positions).
+        """
+        heap = self.org_heaps[org]
+        if len(heap) < self.capacities[org]:
+            return float('-inf')
+        if not heap:
+            return float('inf')
+        return heap[0][0]
+
+    def matches(self) -> Dict[int, List[int]]:
+        """
+        Current matches keyed by org index, in the order orgs first received
+        a proposal. Contested orgs list students by descending score; others
+        list them in acceptance order.
+        """
+        result: Dict[int, List[int]] = {}
+        for org in self._proposed_orgs:
+            heap = self.org_heaps[org]
+            if self._contested[org]:
+                ordered = sorted(heap, key=lambda e: (-e[0], -e[1]))
+            else:
+                ordered = sorted(heap, key=lambda e: -e[1])
+            result[org] = [e[2] for e in ordered]
+        return result
+
+    def remaining_scores(self, sid: int) -> List[float]:
+        """Scores of the preferences the student has not been rejected from."""
+        return self.scores[sid][self.next_choice[sid]:]
@@ -0,0 +1,370 @@
+"""
+Incremental re-matching: when a few students or organizations change,
+update the previous run's score matrix and repair its stable matching
+instead of rescoring everyone and restarting deferred acceptance.
+
+A rematch
+  1) aligns the new problem with the snapshot's by student / org ID,
+  2) rescores only new or changed students (rows) and organizations
+     (columns); capacity changes need no rescoring,
+  3) seats every unchanged student back at their previous organization
+     unless it was rescored, frees changed, new and displaced students, and
+     lets the free students propose (DeferredAcceptance),
+  4) repeats: at every organization that gained room or lost a student
+     ("dirty"), finds the students who would now rather be there and
+     would be accepted (blocking pairs), re-enters them at that
+     organization, and runs deferred acceptance again, until no dirty
+     organization has a blocking pair.
+
+The result is stable for the new input. With exact score ties it need not
+be the same stable matching a full run would pick.
+
+Build the new problem with the snapshot's vocabularies (see
+MatchingProblemBuilder) so interned IDs line up; otherwise the rematch
+falls back to a full run.
+
+Usage Flow:
+    matcher = IncrementalMatcher()
+    results, snapshot = matcher.match(problem)           # full run
+    results, snapshot = matcher.rematch(snapshot, new_problem)
+    matcher.report   # {'repair_proposals': ..., 'full_run_proposals': ...}
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import itertools
+import logging
+
+import numpy as np
+
+from gem_app.utils.deferred_acceptance import DeferredAcceptance
+from gem_app.utils.matching_algorithm import (
+    MatchingAlgorithm, meets_requirements, preference_lists
+)
+from gem_app.utils.matching_problem import (
+    MatchingProblem, ORGANIZATION_COLUMNS, STUDENT_COLUMNS
+)
+from gem_app.utils.matching_snapshot import MatchingSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Organization columns that affect scores (capacity only affects who may
+# propose where)
+SCORED_ORGANIZATION_COLUMNS = tuple(
+    name for name in ORGANIZATION_COLUMNS if name != 'capacities'
+)
+
+RoundResults = Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]
+
+class IncrementalMatcher:
+    """
+    Runs deferred acceptance rounds that keep a MatchingSnapshot, so the
+    next round can be repaired rather than recomputed.
+
+    Attributes:
+        report: counters from the last match / rematch call
+    """
+
+    def __init__(self, algorithm: Optional[MatchingAlgorithm] = None):
+        """
+        Args:
+            algorithm: supplies the score weights and builds the results
+                (defaults to vectorized scoring with the heap engine)
+        """
+        self.algorithm = algorithm or MatchingAlgorithm(scoring='vectorized', engine='heap')
+        self.report: Dict[str, Any] = {}
+
+    def match(self, problem: MatchingProblem) -> Tuple[RoundResults, MatchingSnapshot]:
+        """
+        Full run: score every pair and run deferred acceptance.
+
+        Returns:
+            tuple: ((current_matches, student_scores, unmatched_students), snapshot)
+        """
+        scores = self.feasible_scores(problem)
+        preferences, pref_scores, _ = _open_preferences(scores, problem.capacities)
+        engine = DeferredAcceptance(preferences, pref_scores, problem.capacities.tolist())
+        engine.run(range(problem.n_students))
+
+        self.report = {
+            'mode': 'full',
+            'proposals': engine.proposals,
+            'full_run_proposals': engine.proposals
+        }
+        snapshot = MatchingSnapshot(problem, scores, engine.assignment, engine.proposals)
+        results = self.algorithm.collect_results(
+            problem.student_ids, problem.org_ids, preferences, engine
+        )
+        return results, snapshot
+
+    def rematch(
+        self,
+        snapshot: MatchingSnapshot,
+        problem: MatchingProblem
+    ) -> Tuple[RoundResults, MatchingSnapshot]:
+        """
+        Repair the snapshot's matching for a changed problem.
+
+        Returns:
+            tuple: ((current_matches, student_scores, unmatched_students), snapshot)
+        """
+        old = snapshot.problem
+        if snapshot.scores is None:
+            logger.info("Matching snapshot has no scores; running a full match instead")
+            return self.match(problem)
+        if not _compatible_vocabularies(old, problem):
+            logger.info("Matching vocabularies changed; running a full match instead")
+            return self.match(problem)
+
+        # 1) Align rows and columns with the snapshot
+        old_rows = _index_map(old.student_ids, problem.student_ids)
+        old_cols = _index_map(old.org_ids, problem.org_ids)
+        changed_rows = _changed(old, problem, old_rows, STUDENT_COLUMNS)
+        changed_cols = _changed(old, problem, old_cols, SCORED_ORGANIZATION_COLUMNS)
+
+        # 2) Reuse unchanged scores, rescore the rest
+        scores = np.zeros((problem.n_students, problem.n_organizations))
+        kept_rows = np.flatnonzero(~changed_rows)
+        kept_cols = np.flatnonzero(~changed_cols)
+        scores[np.ix_(kept_rows, kept_cols)] = snapshot.scores[
+            np.ix_(old_rows[kept_rows], old_cols[kept_cols])
+        ]
+        rescored_rows = np.flatnonzero(changed_rows)
+        rescored_cols = np.flatnonzero(changed_cols)
+        if len(rescored_rows):
+            scores[rescored_rows] = self.feasible_scores(problem, students=rescored_rows)
+        if len(rescored_cols):
+            scores[:, rescored_cols] = self.feasible_scores(problem, organizations=rescored_cols)
+
+        # 3) Restore the previous matching and let free students propose
+        preferences, pref_scores, rank = _open_preferences(scores, problem.capacities)
+        engine = DeferredAcceptance(preferences, pref_scores, problem.capacities.tolist())
+
+        dirty: Set[int] = set(rescored_cols.tolist())
+        existing = np.flatnonzero(old_cols >= 0)
+        capacity_changed = existing[
+            problem.capacities[existing] != old.capacities[old_cols[existing]]
+        ]
+        dirty.update(capacity_changed.tolist())
+
+        new_org = np.full(old.n_organizations, -1, dtype=np.int64)
+        new_org[old_cols[existing]] = existing
+        previous = np.full(problem.n_students, -1, dtype=np.int64)
+        has_old = np.flatnonzero(old_rows >= 0)
+        old_assignment = snapshot.assignment[old_rows[has_old]]
+        previous[has_old] = np.where(old_assignment >= 0, new_org[old_assignment], -1)
+        was_matched = np.zeros(problem.n_students, dtype=bool)
+        was_matched[has_old] = old_assignment >= 0
+
+        # A rescored org may have moved down its holders' lists, so they
+        # propose again like changed students
+        keep = (previous >= 0) & ~changed_rows
+        keep[keep] = ~changed_cols[previous[keep]]
+        keep[keep] = rank[np.flatnonzero(keep), previous[keep]] >= 0
+        kept = np.flatnonzero(keep)
+        kept = kept[np.lexsort((kept, -scores[kept, previous[kept]]))]
+
+        free: List[int] = []
+        for sid in kept.tolist():
+            choice = int(rank[sid, previous[sid]])
+            if not engine.seat(sid, choice):
+                # Over the org's new capacity: rejected there
+                engine.next_choice[sid] = choice + 1
+                free.append(sid)
+
+        # Previous holders who were not seated again leave a vacancy
+        kept_old = np.zeros(old.n_students, dtype=bool)
+        kept_old[old_rows[kept]] = True
+        lost = np.flatnonzero((snapshot.assignment >= 0) & ~kept_old)
+        lost_orgs = new_org[snapshot.assignment[lost]]
+        dirty.update(lost_orgs[lost_orgs >= 0].tolist())
+
+        # Changed, new and displaced students start over; unchanged
+        # unmatched students stay exhausted until a vacancy reopens
+        for sid in range(problem.n_students):
+            if keep[sid]:
+                continue
+            if changed_rows[sid] or was_matched[sid]:
+                free.append(sid)
+            else:
+                engine.next_choice[sid] = len(preferences[sid])
+
+        engine.run(free)
+
+        # 4) Re-enter students with blocking pairs at dirty orgs
+        iterations = 0
+        while dirty:
+            iterations += 1
+            dirty = self._reenter_blocking(engine, scores, rank, sorted(dirty))
+
+        self.report = {
+            'mode': 'incremental',
+            'rescored_students': len(rescored_rows),
+            'rescored_organizations': len(rescored_cols),
+            'repair_proposals': engine.proposals,
+            'repair_iterations': iterations,
+            'full_run_proposals': snapshot.full_run_proposals
+        }
+        logger.info(
+            f"Incremental rematch: rescored {len(rescored_rows)} students and "
+            f"{len(rescored_cols)} organizations, repair took {engine.proposals} "
+            f"proposals (full run: {snapshot.full_run_proposals})"
+        )
+
+        new_snapshot = MatchingSnapshot(
+            problem, scores, engine.assignment, snapshot.full_run_proposals
+        )
+        results = self.algorithm.collect_results(
+            problem.student_ids, problem.org_ids, preferences, engine
+        )
+        return results, new_snapshot
+
+    def feasible_scores(
+        self,
+        problem: MatchingProblem,
+        students: Optional[np.ndarray] = None,
+        organizations: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Scores of pairs a student may propose to (positive, meeting
+        mandatory requirements), 0 elsewhere; for all pairs, the listed
+        students' rows, or the listed organizations' columns.
+        """
+        if students is None and organizations is None:
+            total_scores, _ = self.algorithm.score_problem(problem)
+        else:
+            row_ids = np.arange(problem.n_students) if students is None else students
+            col_ids = np.arange(problem.n_organizations) if organizations is None else organizations
+            rows = np.repeat(row_ids, len(col_ids))
+            cols = np.tile(col_ids, len(row_ids))
+            values, _ = self.algorithm.score_pairs(problem, rows, cols)
+            total_scores = values.reshape(len(row_ids), len(col_ids))
+
+        feasible = (total_scores > 0) & meets_requirements(problem, students, organizations)
+        return np.where(feasible, total_scores, 0.0)
+
+    def _reenter_blocking(
+        self,
+        engine: DeferredAcceptance,
+        scores: np.ndarray,
+        rank: np.ndarray,
+        orgs: Sequence[int]
+    ) -> Set[int]:
+        """
+        Let every student who prefers one of orgs to their current match
+        and would be accepted there move to the best such org that still
+        accepts them when their turn comes; a student no longer accepted
+        anywhere keeps their current state. Anyone displaced continues with
+        deferred acceptance.
+
+        Returns:
+            set: orgs students left, which may now have blocking pairs
+        """
+        n_students, n_orgs = rank.shape
+        cols = np.asarray(orgs, dtype=np.int64)
+        assignment = np.asarray(engine.assignment, dtype=np.int64)
+        current_rank = np.where(
+            assignment >= 0,
+            rank[np.arange(n_students), np.maximum(assignment, 0)],
+            n_orgs
+        )
+        thresholds = np.array([engine.acceptance_threshold(org) for org in orgs])
+
+        col_rank = rank[:, cols]
+        blocking = (
+            (col_rank >= 0)
+            & (col_rank < current_rank[:, None])
+            & (scores[:, cols] > thresholds[None, :])
+        )
+        students = np.flatnonzero(blocking.any(axis=1))
+        if not len(students):
+            return set()
+
+        vacated: Set[int] = set()
+        for sid in students.tolist():
+            choices = np.sort(col_rank[sid, blocking[sid]]).tolist()
+            for choice in choices:
+                org = engine.preferences[sid][choice]
+                if engine.scores[sid][choice] <= engine.acceptance_threshold(org):
+                    continue
+                left = engine.release(sid)
+                if left >= 0:
+                    vacated.add(left)
+                engine.next_choice[sid] = choice
+                engine.run([sid])
+                break
+        return vacated
+
+def _open_preferences(
+    scores: np.ndarray,
+    capacities: np.ndarray
+) -> Tuple[List[List[int]], List[List[float]], np.ndarray]:
+    """
+    Preference lists over orgs with capacity, plus rank[s, o]: o's position
+    in s's list, or -1 if o is not on it.
+    """
+    n_students, n_orgs = scores.shape
+    rows, cols = np.nonzero((scores > 0) & (capacities > 0)[None, :])
+    preferences, pref_scores = preference_lists(rows, cols, scores[rows, cols], n_students)
+
+    lengths = np.array([len(prefs) for prefs in preferences], dtype=np.int64)
+    starts = np.cumsum(lengths) - lengths
+    sorted_cols = np.fromiter(
+        itertools.chain.from_iterable(preferences), dtype=np.int64, count=int(lengths.sum())
+    )
+    sorted_rows = np.repeat(np.arange(n_students), lengths)
+    rank = np.full((n_students, n_orgs), -1, dtype=np.int32)
+    rank[sorted_rows, sorted_cols] = np.arange(len(sorted_cols)) - starts[sorted_rows]
+    return preferences, pref_scores, rank
+
+def _compatible_vocabularies(old: MatchingProblem, new: MatchingProblem) -> bool:
+    """True if every interned ID of old means the same value in new."""
+    return all(
+        list(new_values[:len(old_values)]) == list(old_values)
+        for old_values, new_values in (
+            (old.areas, new.areas),
+            (old.locations, new.locations),
+            (old.work_modes, new.work_modes)
+        )
+    )
+
+def _index_map(old_ids: List[str], new_ids: List[str]) -> np.ndarray:
+    """Per new ID, its index in old_ids, or -1 if it is new."""
+    position = {oid: i for i, oid in enumerate(old_ids)}
+    return np.array([position.get(nid, -1) for nid in new_ids], dtype=np.int64)
+
+def _changed(
+    old: MatchingProblem,
+    new: MatchingProblem,
+    old_index: np.ndarray,
+    column_names: Sequence[str]
+) -> np.ndarray:
+    """
+    Per new row (or org), whether it is new or any of the named columns
+    differs from its old value. Wider new columns (more interned values)
+    are compared against the old ones padded with NaN / 0.
+    """
+    changed = old_index < 0
+    present = np.flatnonzero(~changed)
+    for name in column_names:
+        new_values = getattr(new, name)[present]
+        old_values = getattr(old, name)[old_index[present]]
+        if new_values.ndim == 2 and old_values.shape[1] != new_values.shape[1]:
+            fill = np.nan if old_values.dtype.kind == 'f' else 0
+            width = max(old_values.shape[1], new_values.shape[1])
+            old_values = _pad_columns(old_values, width, fill)
+            new_values = _pad_columns(new_values, width, fill)
+
+        same = old_values == new_values
+        if new_values.dtype.kind == 'f':
+            same |= np.isnan(old_values) & np.isnan(new_values)
+        if same.ndim == 2:
+            same = same.all(axis=1)
+        changed[present[~same]] = True
+    return changed
+
+def _pad_columns(values: np.ndarray, width: int, fill: Any) -> np.ndarray:
+    if values.shape[1] == width:
+        return values
+    padded = np.full((values.shape[0], width), fill, dtype=values.dtype)
+    padded[:, :values.shape[1]] = values
+    return padded
@@ -9,17 +9,69 @@ Usage Flow:
     matches, student_scores, unmatched = algo.run_matching_round(students, organizations)
 3. Validate:
     errors = validate_matching_results(matches, students, organizations)
+
+An encoded MatchingProblem (see matching_problem.py) can be matched directly
+with run_matching_problem(problem), which returns the same tuple.
+
+Passing scoring='vectorized' to MatchingAlgorithm scores every pair at once
+with NumPy (see calculate_score_matrix) instead of calling
+calculate_match_scores per (student, organization) pair, and
+scoring='sparse' scores only the feasible candidates generated by
+CandidateIndex (see matching_candidates.py), and scoring='parallel' scores
+the full grid in shards across processes (see parallel_scoring.py). Passing
+engine='heap' runs the round with DeferredAcceptance instead of the
+original list-based loop, and engine='optimal' replaces deferred
+acceptance with the assignment that maximizes the total match score (see
+optimal_assignment.py).
+
+Passing top_k=K (heap engine, vectorized or sparse scoring) keeps only each
+student's K best organizations and loads the next K lazily when a student
+runs out of proposals, so preference lists take O(n*K) memory instead of
+O(n*m). Matches are the same as with full lists.
+
+Passing deadline=seconds (heap engine, vectorized or sparse scoring) makes
+each round an anytime run for previews: students are scored and propose in
+blocks, highest grades first, and the round stops when the time is up,
+returning the matching so far; unprocessed_students lists the students it
+did not finish.
+
+Passing decompose=True (heap engine, vectorized or sparse scoring) splits
+each round into the connected components of the feasible-pair graph and
+runs deferred acceptance on them in a process pool (see
+matching_components.py), with the same matches.
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 import logging
+import math
+import numbers
+import time
 from datetime import datetime
 import numpy as np
 from collections import defaultdict
 
+from gem_app.utils.deferred_acceptance import DeferredAcceptance
+from gem_app.utils.matching_candidates import CandidateIndex
+from gem_app.utils.matching_components import DecomposedDeferredAcceptance
+from gem_app.utils.matching_problem import MatchingProblem, bitmask_contains
+from gem_app.utils.optimal_assignment import OptimalAssignment
+from gem_app.utils.matching_profiler import MatchingProfiler
+from gem_app.utils.parallel_scoring import PARALLEL_MIN_PAIRS, ParallelScorer
+from gem_app.utils.score_cache import ScoreCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Score components, in the order they are summed into the total score
+SCORE_COMPONENTS = ('ranking', 'grades', 'statement', 'location', 'work_mode')
+
+SCORING_MODES = ('pairwise', 'vectorized', 'sparse', 'parallel')
+
+ENGINES = ('legacy', 'heap', 'optimal')
+
+# Pairs scored per block of students in a deadline-limited round
+ANYTIME_BLOCK_PAIRS = 250_000
+
 class MatchingAlgorithm:
     """
     Dictionary-based approach to:
@@ -27,9 +79,57 @@ class MatchingAlgorithm:
       - run a deferred acceptance matching round
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        scoring: str = 'pairwise',
+        engine: str = 'legacy',
+        top_k: Optional[int] = None,
+        workers: Optional[int] = None,
+        min_parallel_pairs: int = PARALLEL_MIN_PAIRS,
+        score_cache: Optional[ScoreCache] = None,
+        profiler: Optional[MatchingProfiler] = None,
+        deadline: Optional[float] = None,
+        decompose: bool = False
+    ):
         """
         Initialize the matching algorithm with score component weights.
+
+        scoring: how preference lists are scored:
+          - 'pairwise': one calculate_match_scores call per pair
+          - 'vectorized': one calculate_score_matrix call for all pairs
+          - 'sparse': vectorized scoring of CandidateIndex candidates only
+          - 'parallel': vectorized scoring sharded across `workers` processes
+            (default: one per CPU), in-process below min_parallel_pairs pairs
+
+        engine: which deferred acceptance implementation runs the round:
+          - 'legacy': the original list-based loop
+          - 'heap': DeferredAcceptance with per-org min-heaps (same results)
+          - 'optimal': OptimalAssignment, maximum total score subject to
+            capacities (not necessarily stable)
+
+        top_k: if set, preference lists hold each student's top_k orgs and
+        are extended top_k at a time on demand (requires engine='heap' and
+        scoring other than 'pairwise'). student_scores then lists only the
+        scores loaded so far.
+
+        score_cache: optional ScoreCache; score_problem and scored_pairs
+        results are looked up there first and stored there after scoring.
+
+        profiler: optional MatchingProfiler receiving 'scoring', 'sorting'
+        and 'proposals' (or 'assignment') spans and pairs_scored, proposals
+        and bumps counters; disabled by default.
+
+        deadline: if set, seconds each round may take; students are scored
+        and propose in blocks, highest grades first, and the round returns
+        the matching found when time runs out (requires engine='heap' and
+        scoring other than 'pairwise'). Students it did not finish are
+        listed in unprocessed_students.
+
+        decompose: run each round's deferred acceptance separately on every
+        connected component of the feasible-pair graph, across `workers`
+        processes (requires engine='heap' and scoring other than
+        'pairwise', without top_k or deadline). Matches are the same;
+        last_round_stats reports the component count and sizes.
         
         weights: fraction of total match score allocated to each component:
         1. ranking: 0.30 - Student's ranking of the area of law
@@ -46,6 +146,44 @@ class MatchingAlgorithm:
             'work_mode': 0.10
         }
 
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring}")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown matching engine: {engine}")
+        if top_k is not None:
+            if top_k < 1:
+                raise ValueError(f"top_k must be positive: {top_k}")
+            if engine != 'heap' or scoring == 'pairwise':
+                raise ValueError("top_k requires engine='heap' and vectorized or sparse scoring")
+        if deadline is not None:
+            if deadline < 0:
+                raise ValueError(f"deadline must not be negative: {deadline}")
+            if engine != 'heap' or scoring == 'pairwise':
+                raise ValueError("deadline requires engine='heap' and vectorized or sparse scoring")
+        if decompose:
+            if engine != 'heap' or scoring == 'pairwise':
+                raise ValueError("decompose requires engine='heap' and vectorized or sparse scoring")
+            if top_k is not None or deadline is not None:
+                raise ValueError("decompose cannot be combined with top_k or deadline")
+        self.scoring = scoring
+        self.engine = engine
+        self.top_k = top_k
+        self.workers = workers
+        self.min_parallel_pairs = min_parallel_pairs
+        self.score_cache = score_cache
+        self.profiler = profiler or MatchingProfiler(enabled=False)
+        self.deadline = deadline
+        self.decompose = decompose
+
+        # Counters from the last engine round
+        self.last_round_stats: Dict[str, int] = {}
+        # Students the last deadline-limited round did not finish
+        self.unprocessed_students: List[str] = []
+
+        # Scored pairs of the last problem, reused by later rounds
+        self._scored_problem: Optional[MatchingProblem] = None
+        self._scored_pairs: Tuple[np.ndarray, np.ndarray, np.ndarray] = ()
+
     def calculate_match_scores(
         self,
         student: Dict,
@@ -272,6 +410,784 @@ class MatchingAlgorithm:
             logger.error(f"Error calculating work mode score: {str(e)}")
             return 0.0
 
+    def calculate_score_matrix(
+        self,
+        students: Dict[str, Dict],
+        organizations: Dict[str, Dict]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Calculate match scores for every (student, organization) pair at once.
+
+        Every cell equals the corresponding calculate_match_scores result
+        exactly.
+
+        Args:
+            students: Dictionary of student data keyed by student ID
+            organizations: Dictionary of organization data keyed by org ID
+
+        Returns:
+            tuple: (total_scores, component_scores)
+              - total_scores: array of shape (n_students, n_organizations),
+                rows/columns in the iteration order of the input dicts
+              - component_scores: {component -> array of the same shape}
+        """
+        return self.score_problem(MatchingProblem.from_dicts(students, organizations))
+
+    def score_problem(
+        self,
+        problem: MatchingProblem
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Vectorized scoring of an encoded MatchingProblem over the full
+        students x organizations grid.
+
+        Ranking and statement scores are computed once per (student, area),
+        location and work-mode scores once per (student, location/work mode),
+        then broadcast to the full grid through each organization's interned
+        IDs. Grades are compared directly against each minimum grade.
+
+        Returns:
+            tuple: (total_scores, component_scores) as in calculate_score_matrix
+        """
+        try:
+            if self.score_cache is not None:
+                key = self.score_cache.key(problem, self.weights, 'matrix')
+                cached = self.score_cache.get(key)
+                if cached is not None:
+                    return cached['total'], {
+                        name: cached[name] for name in SCORE_COMPONENTS
+                    }
+
+            tables = self._score_tables(problem)
+            component_scores = {
+                'ranking': tables['ranking'][:, problem.org_area],
+                'grades': self._grades_scores(
+                    problem.grades[:, None],
+                    problem.grades_valid[:, None],
+                    problem.minimum_grade[None, :],
+                    problem.minimum_grade_valid[None, :]
+                ),
+                'statement': tables['statement'][:, problem.org_area],
+                'location': tables['location'][:, problem.org_location],
+                'work_mode': tables['work_mode'][:, problem.org_work_mode]
+            }
+            total_scores = _sum_components(
+                component_scores, (problem.n_students, problem.n_organizations)
+            )
+            if self.score_cache is not None:
+                self.score_cache.put(key, dict(component_scores, total=total_scores))
+            return total_scores, component_scores
+
+        except Exception as e:
+            logger.error(f"Error in score_problem: {str(e)}")
+            raise
+
+    def score_pairs(
+        self,
+        problem: MatchingProblem,
+        rows: np.ndarray,
+        cols: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Vectorized scoring of selected (student, organization) pairs only,
+        e.g. the candidates from CandidateIndex.
+
+        Args:
+            problem: Encoded matching input
+            rows: Student index of each pair
+            cols: Organization index of each pair
+
+        Returns:
+            tuple: (total_scores, component_scores), 1-D arrays parallel to rows
+        """
+        try:
+            return self._gather_scores(
+                problem, self._score_tables(problem), rows, rows, cols
+            )
+        except Exception as e:
+            logger.error(f"Error in score_pairs: {str(e)}")
+            raise
+
+    def score_student(
+        self,
+        problem: MatchingProblem,
+        student: int
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Vectorized scoring of one student against every organization,
+        building the lookup tables for that student only.
+
+        Returns:
+            tuple: (total_scores, component_scores), arrays of length n_organizations
+        """
+        cols = np.arange(problem.n_organizations)
+        rows = np.full(len(cols), student)
+        tables = self._score_tables(problem, np.array([student]))
+        return self._gather_scores(
+            problem, tables, np.zeros(len(cols), dtype=np.int64), rows, cols
+        )
+
+    def _gather_scores(
+        self,
+        problem: MatchingProblem,
+        tables: Dict[str, np.ndarray],
+        table_rows: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Look up the components of each (rows, cols) pair, reading the
+        student tables at table_rows.
+        """
+        component_scores = {
+            'ranking': tables['ranking'][table_rows, problem.org_area[cols]],
+            'grades': self._grades_scores(
+                problem.grades[rows],
+                problem.grades_valid[rows],
+                problem.minimum_grade[cols],
+                problem.minimum_grade_valid[cols]
+            ),
+            'statement': tables['statement'][table_rows, problem.org_area[cols]],
+            'location': tables['location'][table_rows, problem.org_location[cols]],
+            'work_mode': tables['work_mode'][table_rows, problem.org_work_mode[cols]]
+        }
+        total_scores = _sum_components(component_scores, (len(rows),))
+        return total_scores, component_scores
+
+    def _score_tables(
+        self,
+        problem: MatchingProblem,
+        students: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Weighted per-student lookup tables for the components that depend
+        only on one organization attribute:
+          - ranking / statement: (n_students, n_areas)
+          - location: (n_students, n_locations)
+          - work_mode: (n_students, n_work_modes)
+
+        If students is given, the tables have one row per listed student.
+        """
+        rows = slice(None) if students is None else students
+
+        # 1) Ranking: unranked areas count as the student's max rank
+        max_rank = problem.max_rank[rows].astype(float)
+        ranks = problem.ranks[rows].astype(float)
+        ranks = np.where(np.isnan(ranks), max_rank[:, None], ranks)
+        area_named = np.array([bool(area) for area in problem.areas], dtype=bool)
+        ranked = ~np.isnan(max_rank) & (max_rank > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ranking_table = np.where(
+                ranked[:, None] & area_named[None, :],
+                (max_rank[:, None] - ranks + 1) / max_rank[:, None],
+                0.0
+            )
+
+        # 3) Statement: quality score for areas with a statement
+        statement_table = np.where(
+            bitmask_contains(problem.statement_areas[rows], np.arange(len(problem.areas))),
+            problem.statement_quality[rows][:, None],
+            0.0
+        )
+
+        # 4-5) Location / work mode: 1 if preferred, 0.5 if no preference
+        location_table = _preference_table(
+            problem.location_prefs[rows], len(problem.locations)
+        )
+        work_mode_table = _preference_table(
+            problem.work_mode_prefs[rows], len(problem.work_modes)
+        )
+
+        return {
+            'ranking': ranking_table * self.weights['ranking'],
+            'statement': statement_table * self.weights['statement'],
+            'location': location_table * self.weights['location'],
+            'work_mode': work_mode_table * self.weights['work_mode']
+        }
+
+    def _grades_scores(
+        self,
+        grades: np.ndarray,
+        grades_valid: np.ndarray,
+        min_grades: np.ndarray,
+        min_valid: np.ndarray
+    ) -> np.ndarray:
+        """
+        Weighted grades component, broadcasting grades against minimum
+        grades: grade/40 (capped at 1), or 0 below the minimum.
+        """
+        passes = grades_valid & min_valid & ~(grades < min_grades)
+        return np.where(passes, np.minimum(grades / 40.0, 1.0), 0.0) * self.weights['grades']
+
+    def scored_pairs(
+        self,
+        problem: MatchingProblem
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every pair a student may propose to: org with capacity, mandatory
+        requirements met and a positive score, in row-major order.
+
+        With scoring='sparse' only CandidateIndex candidates are scored;
+        otherwise the full score matrix is, across processes with
+        scoring='parallel'. The pairs of the last problem scored are kept,
+        so later rounds on the same problem don't score it again, and are
+        looked up in / stored to score_cache if there is one.
+
+        Returns:
+            tuple: (rows, cols, values) arrays
+        """
+        if self._scored_problem is problem:
+            return self._scored_pairs
+
+        if self.score_cache is not None:
+            key = self.score_cache.key(problem, self.weights, 'pairs')
+            cached = self.score_cache.get(key)
+            if cached is not None:
+                self._scored_problem = problem
+                self._scored_pairs = (cached['rows'], cached['cols'], cached['values'])
+                return self._scored_pairs
+
+        if self.scoring == 'sparse':
+            candidates = CandidateIndex(problem).generate()
+            rows = candidates.rows()
+            cols = candidates.indices.astype(np.int64)
+            values, _ = self.score_pairs(problem, rows, cols)
+            self.profiler.count('pairs_scored', len(values))
+            keep = values > 0
+            rows, cols, values = rows[keep], cols[keep], values[keep]
+        else:
+            if self.scoring == 'parallel':
+                total_scores = ParallelScorer(
+                    self.weights, self.workers, self.min_parallel_pairs
+                ).score(problem)
+            else:
+                total_scores, _ = self.score_problem(problem)
+            self.profiler.count('pairs_scored', total_scores.size)
+            feasible = (
+                (total_scores > 0)
+                & (problem.capacities > 0)[None, :]
+                & meets_requirements(problem)
+            )
+            rows, cols = np.nonzero(feasible)
+            values = total_scores[rows, cols]
+
+        if self.score_cache is not None:
+            self.score_cache.put(key, {'rows': rows, 'cols': cols, 'values': values})
+        self._scored_problem = problem
+        self._scored_pairs = (rows, cols, values)
+        return self._scored_pairs
+
+    def use_scores(self, problem: MatchingProblem, scores: np.ndarray) -> None:
+        """
+        Reuse a dense score matrix for problem instead of scoring it, e.g.
+        an IncrementalMatcher snapshot's. Zero entries are infeasible.
+        """
+        rows, cols = np.nonzero((scores > 0) & (problem.capacities > 0)[None, :])
+        self._scored_problem = problem
+        self._scored_pairs = (rows, cols, scores[rows, cols])
+
+    def _problem_preferences(
+        self,
+        problem: MatchingProblem,
+        capacities: Optional[np.ndarray] = None,
+        active: Optional[np.ndarray] = None
+    ) -> Tuple[List[List[int]], List[List[float]]]:
+        """
+        Build each student's preference list from scored_pairs: by
+        descending score, ties in organization order. With top_k set, each
+        list holds only the first top_k entries.
+
+        Args:
+            capacities: remaining positions per org, if not problem.capacities
+            active: mask of students still to be matched; others get no list
+
+        Returns:
+            tuple: (preferences, scores), one list per student
+        """
+        rows, cols, values = self._round_pairs(problem, capacities, active)
+
+        with self.profiler.span('sorting'):
+            if self.top_k is not None:
+                rows, cols, values = _top_k_pairs(
+                    rows, cols, values, problem.n_students, problem.n_organizations, self.top_k
+                )
+
+            return preference_lists(rows, cols, values, problem.n_students)
+
+    def _round_pairs(
+        self,
+        problem: MatchingProblem,
+        capacities: Optional[np.ndarray] = None,
+        active: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        scored_pairs restricted to orgs with remaining capacity and active
+        students (see _problem_preferences), in row-major order.
+        """
+        with self.profiler.span('scoring'):
+            rows, cols, values = self.scored_pairs(problem)
+
+        if capacities is not None or active is not None:
+            keep = np.ones(len(rows), dtype=bool)
+            if capacities is not None:
+                keep &= capacities[cols] > 0
+            if active is not None:
+                keep &= active[rows]
+            rows, cols, values = rows[keep], cols[keep], values[keep]
+        return rows, cols, values
+
+    def _pairwise_preferences(
+        self,
+        students: Dict[str, Dict],
+        organizations: Dict[str, Dict]
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Build each student's preference list of (org_id, score) pairs with
+        calculate_match_scores, sorted by descending score.
+        """
+        student_preferences: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+
+        # Organizations without capacity are never proposed to
+        open_orgs = {
+            oid: odata for oid, odata in organizations.items()
+            if odata.get('available_positions', 1) > 0
+        }
+
+        # 1) Calculate scores for each feasible (student, org) pair
+        pairs_scored = 0
+        with self.profiler.span('scoring'):
+            for sid, sdata in students.items():
+                for oid, odata in open_orgs.items():
+                    if not self._meets_requirements(sdata, odata):
+                        continue
+                    score, _ = self.calculate_match_scores(sdata, odata)
+                    pairs_scored += 1
+                    if score > 0:
+                        student_preferences[sid].append((oid, score))
+        self.profiler.count('pairs_scored', pairs_scored)
+
+        # 2) Sort each student's preference list by descending score
+        with self.profiler.span('sorting'):
+            for sid in student_preferences:
+                student_preferences[sid].sort(key=lambda x: x[1], reverse=True)
+
+        return student_preferences
+
+    def _meets_requirements(self, student: Dict, organization: Dict) -> bool:
+        """
+        Check the organization's mandatory requirements: a mandatory
+        minimum grade (minimum_grade_mandatory) rules out students below it.
+        """
+        if not organization.get('minimum_grade_mandatory', False):
+            return True
+        minimum = organization.get('minimum_grade', 0)
+        if not isinstance(minimum, numbers.Real) or math.isnan(minimum):
+            return True
+        grade = student.get('grades', {}).get('overall_grade', 0)
+        return isinstance(grade, numbers.Real) and grade >= minimum
+
+    def _run_legacy_engine(
+        self,
+        student_ids: List[str],
+        organizations: Dict[str, Dict],
+        student_preferences: Dict[str, List[Tuple[str, float]]]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]]]:
+        """
+        Original list-based deferred acceptance loop.
+
+        Returns:
+            tuple: (current_matches, student_scores)
+        """
+        unmatched_students = list(student_ids)
+        current_matches: Dict[str, List[str]] = {}
+        proposals = 0
+        bumps = 0
+
+        while unmatched_students:
+            sid = unmatched_students[0]
+            prefs = student_preferences[sid]
+            if not prefs:
+                # No viable org left for this student
+                unmatched_students.remove(sid)
+                continue
+
+            # Student proposes to their top choice
+            org_id, score = prefs[0]
+            proposals += 1
+            org_info = organizations[org_id]
+            capacity = org_info.get('available_positions', 1)
+
+            # Initialize org's match list if needed
+            if org_id not in current_matches:
+                current_matches[org_id] = []
+
+            if len(current_matches[org_id]) < capacity:
+                # Organization has space, accept the student
+                current_matches[org_id].append(sid)
+                unmatched_students.remove(sid)
+            else:
+                # Organization is full, see if this student should replace someone
+                matched_with_scores: List[Tuple[str, float]] = []
+                
+                # Get scores for all students currently matched with this org
+                for msid in current_matches[org_id]:
+                    ms_score = 0.0
+                    for (orgpref, s) in student_preferences[msid]:
+                        if orgpref == org_id:
+                            ms_score = s
+                            break
+                    matched_with_scores.append((msid, ms_score))
+
+                # Add the current student
+                matched_with_scores.append((sid, score))
+
+                # Sort by score, keep top 'capacity' students
+                sorted_candidates = sorted(matched_with_scores, key=lambda x: x[1], reverse=True)
+                new_matched = sorted_candidates[:capacity]
+                new_ids = [m[0] for m in new_matched]
+
+                # Update the organization's matches
+                current_matches[org_id] = new_ids
+
+                # Find students who lost their spot
+                bumped = set(x[0] for x in matched_with_scores) - set(new_ids)
+                
+                if sid in bumped:
+                    # Current student was bumped, remove top preference
+                    student_preferences[sid].pop(0)
+
+                # Handle all bumped students
+                for bump_sid in bumped:
+                    if bump_sid != sid:
+                        bumps += 1
+                        # Re-add them to unmatched list
+                        if bump_sid not in unmatched_students:
+                            unmatched_students.append(bump_sid)
+
+                # Remove current student from unmatched
+                unmatched_students.remove(sid)
+                
+                # Re-add if they were bumped
+                if sid in bumped:
+                    unmatched_students.append(sid)
+
+        # Build student_scores dictionary (scores for each preference)
+        student_scores: Dict[str, List[float]] = {}
+        for sid, prefs in student_preferences.items():
+            student_scores[sid] = [sc for (_, sc) in prefs]
+
+        self.last_round_stats = {'proposals': proposals, 'bumps': bumps}
+        return current_matches, student_scores
+
+    def _run_engine(
+        self,
+        student_ids: List[str],
+        org_ids: List[str],
+        preferences: List[List[int]],
+        scores: List[List[float]],
+        capacities: List[int],
+        extend: Optional[Callable[[int], bool]] = None
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        """
+        Run the selected engine (deferred acceptance or optimal assignment)
+        over index-based preference lists.
+
+        Args:
+            extend: heap engine only, see DeferredAcceptance
+
+        Returns:
+            tuple: (current_matches, student_scores, unmatched_students)
+        """
+        with self.profiler.span('assignment' if self.engine == 'optimal' else 'proposals'):
+            results = self._engine_results(
+                student_ids, org_ids, preferences, scores, capacities, extend
+            )
+        for name in ('proposals', 'bumps'):
+            if name in self.last_round_stats:
+                self.profiler.count(name, self.last_round_stats[name])
+        return results
+
+    def _engine_results(
+        self,
+        student_ids: List[str],
+        org_ids: List[str],
+        preferences: List[List[int]],
+        scores: List[List[float]],
+        capacities: List[int],
+        extend: Optional[Callable[[int], bool]] = None
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        if self.engine == 'heap':
+            engine = DeferredAcceptance(preferences, scores, capacities, extend)
+            engine.run(range(len(student_ids)))
+            self.last_round_stats = {
+                'proposals': engine.proposals,
+                'bumps': engine.bumps,
+                'extended_students': len(engine.extended)
+            }
+            if extend is not None:
+                logger.info(
+                    f"Top-{self.top_k} preferences: {len(engine.extended)} students "
+                    f"needed an extension"
+                )
+
+            return self.collect_results(student_ids, org_ids, preferences, engine)
+        elif self.engine == 'optimal':
+            engine = OptimalAssignment(preferences, scores, capacities)
+            engine.run()
+            self.last_round_stats = {'total_score': engine.total_score}
+            return self.collect_results(student_ids, org_ids, preferences, engine)
+        else:
+            student_preferences: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+            for i, prefs in enumerate(preferences):
+                if prefs:
+                    student_preferences[student_ids[i]] = [
+                        (org_ids[org], sc) for org, sc in zip(prefs, scores[i])
+                    ]
+            organizations = {
+                oid: {'available_positions': cap} for oid, cap in zip(org_ids, capacities)
+            }
+            current_matches, legacy_scores = self._run_legacy_engine(
+                student_ids, organizations, student_preferences
+            )
+            remaining = [legacy_scores[sid] for sid in student_ids]
+            return self._round_results(student_ids, preferences, current_matches, remaining)
+
+    def collect_results(
+        self,
+        student_ids: List[str],
+        org_ids: List[str],
+        preferences: List[List[int]],
+        engine
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        """
+        Convert a finished DeferredAcceptance, DecomposedDeferredAcceptance
+        or OptimalAssignment run to the (current_matches, student_scores,
+        unmatched_students) tuple. Only whether each student's entry in
+        preferences is empty is used.
+        """
+        current_matches = {
+            org_ids[org]: [student_ids[s] for s in sids]
+            for org, sids in engine.matches().items()
+        }
+        remaining = [engine.remaining_scores(i) for i in range(len(student_ids))]
+        return self._round_results(student_ids, preferences, current_matches, remaining)
+
+    def _round_results(
+        self,
+        student_ids: List[str],
+        preferences: List[List[int]],
+        current_matches: Dict[str, List[str]],
+        remaining: List[List[float]]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        # Students with preferences first, then the rest in input order
+        student_scores: Dict[str, List[float]] = {}
+        for i, sid in enumerate(student_ids):
+            if preferences[i]:
+                student_scores[sid] = remaining[i]
+        for sid in student_ids:
+            student_scores.setdefault(sid, [])
+
+        # Gather unmatched students (those not matched to any organization)
+        matched_students = {s for slist in current_matches.values() for s in slist}
+        unmatched_list = list(set(student_ids) - matched_students)
+
+        return current_matches, student_scores, unmatched_list
+
+    def run_matching_problem(
+        self,
+        problem: MatchingProblem,
+        previous_matches: Optional[Dict[str, List[str]]] = None
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        """
+        Run a single round of deferred acceptance on an encoded problem.
+
+        Students already in previous_matches are left out and organizations
+        only offer the positions previous rounds left; scores are computed
+        on the first round and reused by later rounds on the same problem.
+
+        Args:
+            problem: Encoded students and organizations
+            previous_matches: Dictionary of existing matches from previous rounds
+
+        Returns:
+            tuple: (current_matches, student_scores, unmatched_students)
+              as in run_matching_round, for the students still to be matched
+        """
+        try:
+            capacities, active = _remaining(problem, previous_matches)
+            if self.deadline is not None:
+                results = self._run_anytime(problem, capacities, active)
+            elif self.decompose:
+                results = self._run_decomposed(problem, capacities, active)
+            else:
+                self.unprocessed_students = []
+                preferences, scores = self._problem_preferences(problem, capacities, active)
+                extend = None
+                if self.top_k is not None:
+                    extend = _PreferenceExtender(self, problem, preferences, scores, capacities)
+                results = self._run_engine(
+                    problem.student_ids,
+                    problem.org_ids,
+                    preferences,
+                    scores,
+                    capacities.tolist(),
+                    extend
+                )
+            if active is None:
+                return results
+
+            current_matches, student_scores, unmatched = results
+            active_ids = {
+                sid for sid, keep in zip(problem.student_ids, active.tolist()) if keep
+            }
+            return (
+                current_matches,
+                {sid: sc for sid, sc in student_scores.items() if sid in active_ids},
+                [sid for sid in unmatched if sid in active_ids]
+            )
+        except Exception as e:
+            logger.error(f"Error in run_matching_problem: {str(e)}")
+            raise
+
+    def _run_anytime(
+        self,
+        problem: MatchingProblem,
+        capacities: np.ndarray,
+        active: Optional[np.ndarray]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        """
+        Deadline-limited heap deferred acceptance. Students are taken in
+        priority order (highest grade first) in blocks: each block is
+        scored against the orgs with capacity, sorted, and proposes, with
+        the students it displaces, before the next block is scored. When
+        the deadline passes the matching so far is returned; students not
+        yet scored or still waiting to propose go to unprocessed_students.
+
+        Returns:
+            tuple: (current_matches, student_scores, unmatched_students)
+        """
+        expires = time.perf_counter() + self.deadline
+        n_students = problem.n_students
+        preferences: List[List[int]] = [[] for _ in range(n_students)]
+        scores: List[List[float]] = [[] for _ in range(n_students)]
+        extend = None
+        if self.top_k is not None:
+            extend = _PreferenceExtender(self, problem, preferences, scores, capacities)
+        engine = DeferredAcceptance(preferences, scores, capacities.tolist(), extend)
+
+        order = _priority_order(problem, active)
+        open_orgs = np.flatnonzero(capacities > 0)
+        block_size = max(1, ANYTIME_BLOCK_PAIRS // max(len(open_orgs), 1))
+        processed = 0
+        completed = True
+        while processed < len(order):
+            if time.perf_counter() >= expires:
+                completed = False
+                break
+            students = order[processed:processed + block_size]
+            processed += len(students)
+            with self.profiler.span('scoring'):
+                block_prefs, block_scores = self._block_preferences(
+                    problem, students, open_orgs
+                )
+            for i, sid in enumerate(students.tolist()):
+                preferences[sid] = block_prefs[i]
+                scores[sid] = block_scores[i]
+            with self.profiler.span('proposals'):
+                completed = engine.run(students.tolist(), deadline=expires)
+            if not completed:
+                break
+
+        unprocessed = sorted(set(order[processed:].tolist()) | set(engine.pending))
+        self.unprocessed_students = [problem.student_ids[i] for i in unprocessed]
+        self.last_round_stats = {
+            'proposals': engine.proposals,
+            'bumps': engine.bumps,
+            'extended_students': len(engine.extended),
+            'scored_students': processed,
+            'unprocessed_students': len(unprocessed)
+        }
+        for name in ('proposals', 'bumps'):
+            self.profiler.count(name, self.last_round_stats[name])
+        self.profiler.count('pairs_scored', processed * len(open_orgs))
+        if not completed:
+            logger.info(
+                f"Deadline of {self.deadline}s reached: {processed} of {len(order)} "
+                f"students scored, {len(unprocessed)} not fully processed"
+            )
+
+        return self.collect_results(problem.student_ids, problem.org_ids, preferences, engine)
+
+    def _run_decomposed(
+        self,
+        problem: MatchingProblem,
+        capacities: np.ndarray,
+        active: Optional[np.ndarray]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        """
+        Heap deferred acceptance run per connected component of the
+        round's feasible pairs (see DecomposedDeferredAcceptance).
+
+        Returns:
+            tuple: (current_matches, student_scores, unmatched_students)
+        """
+        self.unprocessed_students = []
+        rows, cols, values = self._round_pairs(problem, capacities, active)
+        engine = DecomposedDeferredAcceptance(
+            rows,
+            cols,
+            values,
+            capacities,
+            problem.n_students,
+            self.workers,
+            self.min_parallel_pairs
+        )
+        with self.profiler.span('proposals'):
+            engine.run()
+
+        component_stats = engine.component_stats()
+        self.last_round_stats = dict(
+            component_stats,
+            proposals=engine.proposals,
+            bumps=engine.bumps
+        )
+        for name in ('proposals', 'bumps'):
+            self.profiler.count(name, self.last_round_stats[name])
+        logger.info(f"Decomposed matching round: {component_stats}")
+
+        # Students with at least one pair had a preference list
+        listed = (np.bincount(rows, minlength=problem.n_students) > 0).tolist()
+        return self.collect_results(problem.student_ids, problem.org_ids, listed, engine)
+
+    def _block_preferences(
+        self,
+        problem: MatchingProblem,
+        students: np.ndarray,
+        organizations: np.ndarray
+    ) -> Tuple[List[List[int]], List[List[float]]]:
+        """
+        Preference lists of the given students over the given orgs, scored
+        and ordered as _problem_preferences does, one list per student.
+        """
+        table_rows = np.repeat(np.arange(len(students)), len(organizations))
+        cols = np.tile(organizations, len(students))
+        values, _ = self._gather_scores(
+            problem,
+            self._score_tables(problem, students),
+            table_rows,
+            students[table_rows],
+            cols
+        )
+        feasible = (values > 0) & meets_requirements(problem, students, organizations).ravel()
+        table_rows, cols, values = table_rows[feasible], cols[feasible], values[feasible]
+
+        if self.top_k is not None:
+            table_rows, cols, values = _top_k_pairs(
+                table_rows, cols, values, len(students), problem.n_organizations, self.top_k
+            )
+
+        return preference_lists(table_rows, cols, values, len(students))
+
     def run_matching_round(
         self,
         students: Dict[str, Dict],
@@ -293,107 +1209,249 @@ class MatchingAlgorithm:
               - unmatched_students: [list_of_student_ids]
         """
         try:
-            unmatched_students = list(students.keys())
-            current_matches: Dict[str, List[str]] = {}
-            student_preferences: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+            if self.scoring != 'pairwise':
+                return self.run_matching_problem(
+                    MatchingProblem.from_dicts(students, organizations),
+                    previous_matches
+                )
 
-            # 1) Calculate scores for each feasible (student, org) pair
-            for sid, sdata in students.items():
-                for oid, odata in organizations.items():
-                    capacity = odata.get('available_positions', 1)
-                    if capacity <= 0:
-                        continue
-                    score, _ = self.calculate_match_scores(sdata, odata)
-                    if score > 0:
-                        student_preferences[sid].append((oid, score))
+            if previous_matches:
+                # Only unmatched students, against the remaining positions
+                matched = {sid for sids in previous_matches.values() for sid in sids}
+                students = {
+                    sid: sdata for sid, sdata in students.items() if sid not in matched
+                }
+                organizations = {
+                    oid: dict(
+                        odata,
+                        available_positions=max(
+                            odata.get('available_positions', 1)
+                            - len(previous_matches.get(oid, [])),
+                            0
+                        )
+                    )
+                    for oid, odata in organizations.items()
+                }
 
-            # 2) Sort each student's preference list by descending score
-            for sid in student_preferences:
-                student_preferences[sid].sort(key=lambda x: x[1], reverse=True)
+            # 1-2) Score feasible pairs and sort each student's preferences
+            student_preferences = self._pairwise_preferences(students, organizations)
+
+            # 3) Deferred acceptance with the selected engine
+            student_ids = list(students.keys())
+            org_ids = list(organizations.keys())
+            org_index = {oid: i for i, oid in enumerate(org_ids)}
+            preferences = []
+            scores = []
+            for sid in student_ids:
+                prefs = student_preferences.get(sid, [])
+                preferences.append([org_index[oid] for oid, _ in prefs])
+                scores.append([sc for _, sc in prefs])
+            capacities = [
+                odata.get('available_positions', 1) for odata in organizations.values()
+            ]
 
-            # 3) Deferred acceptance loop
-            while unmatched_students:
-                sid = unmatched_students[0]
-                prefs = student_preferences[sid]
-                if not prefs:
-                    # No viable org left for this student
-                    unmatched_students.remove(sid)
-                    continue
-
-                # Student proposes to their top choice
-                org_id, score = prefs[0]
-                org_info = organizations[org_id]
-                capacity = org_info.get('available_positions', 1)
-
-                # Initialize org's match list if needed
-                if org_id not in current_matches:
-                    current_matches[org_id] = []
-
-                if len(current_matches[org_id]) < capacity:
-                    # Organization has space, accept the student
-                    current_matches[org_id].append(sid)
-                    unmatched_students.remove(sid)
-                else:
-                    # Organization is full, see if this student should replace someone
-                    matched_with_scores: List[Tuple[str, float]] = []
-                    
-                    # Get scores for all students currently matched with this org
-                    for msid in current_matches[org_id]:
-                        ms_score = 0.0
-                        for (orgpref, s) in student_preferences[msid]:
-                            if orgpref == org_id:
-                                ms_score = s
-                                break
-                        matched_with_scores.append((msid, ms_score))
-
-                    # Add the current student
-                    matched_with_scores.append((sid, score))
-
-                    # Sort by score, keep top 'capacity' students
-                    sorted_candidates = sorted(matched_with_scores, key=lambda x: x[1], reverse=True)
-                    new_matched = sorted_candidates[:capacity]
-                    new_ids = [m[0] for m in new_matched]
-
-                    # Update the organization's matches
-                    current_matches[org_id] = new_ids
-
-                    # Find students who lost their spot
-                    bumped = set(x[0] for x in matched_with_scores) - set(new_ids)
-                    
-                    if sid in bumped:
-                        # Current student was bumped, remove top preference
-                        student_preferences[sid].pop(0)
-
-                    # Handle all bumped students
-                    for bump_sid in bumped:
-                        if bump_sid != sid:
-                            # Re-add them to unmatched list
-                            if bump_sid not in unmatched_students:
-                                unmatched_students.append(bump_sid)
-
-                    # Remove current student from unmatched
-                    unmatched_students.remove(sid)
-                    
-                    # Re-add if they were bumped
-                    if sid in bumped:
-                        unmatched_students.append(sid)
-
-            # Build student_scores dictionary (scores for each preference)
-            student_scores: Dict[str, List[float]] = {}
-            for sid, prefs in student_preferences.items():
-                student_scores[sid] = [sc for (_, sc) in prefs]
-
-            # Gather unmatched students (those not matched to any organization)
-            matched_students = {s for slist in current_matches.values() for s in slist}
-            all_students_set = set(students.keys())
-            unmatched_list = list(all_students_set - matched_students)
-
-            return current_matches, student_scores, unmatched_list
+            return self._run_engine(student_ids, org_ids, preferences, scores, capacities)
 
         except Exception as e:
             logger.error(f"Error in run_matching_round: {str(e)}")
             raise
 
+def meets_requirements(
+    problem: MatchingProblem,
+    students: Optional[np.ndarray] = None,
+    organizations: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    (n_students, n_organizations) mask of pairs that satisfy every
+    organization's mandatory requirements, restricted to the listed
+    students (rows) and organizations (columns) if given.
+    """
+    cols = slice(None) if organizations is None else organizations
+    min_grades = problem.minimum_grade[cols]
+    mandatory = (
+        problem.minimum_grade_mandatory[cols]
+        & problem.minimum_grade_valid[cols]
+        & ~np.isnan(min_grades)
+    )
+    rows = slice(None) if students is None else students
+    grades = problem.grades[rows]
+    comparable = problem.grades_valid[rows] & ~np.isnan(grades)
+    return ~mandatory[None, :] | (
+        comparable[:, None] & (grades[:, None] >= min_grades[None, :])
+    )
+
+def _priority_order(problem: MatchingProblem, active: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Indexes of the students to match, highest grade first (missing grades
+    last), ties in student order.
+    """
+    students = np.arange(problem.n_students)
+    if active is not None:
+        students = students[active]
+    grades = problem.grades[students].astype(float)
+    grades = np.where(problem.grades_valid[students] & ~np.isnan(grades), grades, -np.inf)
+    return students[np.lexsort((students, -grades))]
+
+def _remaining(
+    problem: MatchingProblem,
+    previous_matches: Optional[Dict[str, List[str]]]
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Positions left per org after previous_matches, and a mask of the
+    students not yet matched (None if there are no previous matches).
+    """
+    capacities = problem.capacities.astype(np.int64)
+    if not previous_matches:
+        return capacities, None
+
+    org_index = {oid: j for j, oid in enumerate(problem.org_ids)}
+    matched = set()
+    for oid, sids in previous_matches.items():
+        if oid in org_index:
+            capacities[org_index[oid]] -= len(sids)
+        matched.update(sids)
+    active = np.array([sid not in matched for sid in problem.student_ids], dtype=bool)
+    return np.maximum(capacities, 0), active
+
+class _PreferenceExtender:
+    """
+    Extends truncated preference lists for DeferredAcceptance: the first time
+    a student runs out, their full row is scored and sorted once and kept;
+    each call appends the next top_k entries of it.
+    """
+
+    def __init__(
+        self,
+        algorithm: MatchingAlgorithm,
+        problem: MatchingProblem,
+        preferences: List[List[int]],
+        scores: List[List[float]],
+        capacities: np.ndarray
+    ):
+        self.algorithm = algorithm
+        self.problem = problem
+        self.preferences = preferences
+        self.scores = scores
+        self.capacities = capacities
+        self._full_rows: Dict[int, Tuple[List[int], List[float]]] = {}
+
+    def __call__(self, sid: int) -> bool:
+        top_k = self.algorithm.top_k
+        loaded = len(self.preferences[sid])
+        if sid not in self._full_rows:
+            if loaded == 0 or loaded % top_k:
+                # An empty list or a partial chunk is already complete
+                return False
+            self._full_rows[sid] = self._full_row(sid)
+        full_prefs, full_scores = self._full_rows[sid]
+        if loaded >= len(full_prefs):
+            return False
+        self.preferences[sid].extend(full_prefs[loaded:loaded + top_k])
+        self.scores[sid].extend(full_scores[loaded:loaded + top_k])
+        return True
+
+    def _full_row(self, sid: int) -> Tuple[List[int], List[float]]:
+        """The student's complete preference list, as _problem_preferences builds it."""
+        problem = self.problem
+        values, _ = self.algorithm.score_student(problem, sid)
+        feasible = (
+            (values > 0)
+            & (self.capacities > 0)
+            & meets_requirements(problem, np.array([sid]))[0]
+        )
+        cols = np.flatnonzero(feasible)
+        values = values[cols]
+        order = np.lexsort((cols, -values))
+        return cols[order].tolist(), values[order].tolist()
+
+def _top_k_pairs(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    values: np.ndarray,
+    n_students: int,
+    n_orgs: int,
+    top_k: int,
+    chunk_size: int = 4096
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Keep each student's top_k pairs by descending score, ties in
+    organization order, from row-major (rows, cols, values) triples.
+
+    Each block of students is scattered into a dense block and the k-th best
+    score per row is found with np.partition; pairs tied with it are kept
+    in column order until the row has top_k.
+    """
+    if top_k >= n_orgs:
+        return rows, cols, values
+
+    keep = np.zeros(len(rows), dtype=bool)
+    for start in range(0, n_students, chunk_size):
+        stop = min(start + chunk_size, n_students)
+        lo, hi = np.searchsorted(rows, [start, stop])
+        if lo == hi:
+            continue
+        block_rows = rows[lo:hi] - start
+        block_cols = cols[lo:hi]
+
+        # Negated scores so the k-th smallest is the k-th best; inf = no pair
+        negated = np.full((stop - start, n_orgs), np.inf)
+        negated[block_rows, block_cols] = -values[lo:hi]
+        kth = np.partition(negated, top_k - 1, axis=1)[:, top_k - 1]
+
+        better = negated < kth[:, None]
+        tied = (negated == kth[:, None]) & np.isfinite(kth)[:, None]
+        tie_slots = top_k - better.sum(axis=1)
+        selected = better | (tied & (np.cumsum(tied, axis=1) <= tie_slots[:, None]))
+        keep[lo:hi] = selected[block_rows, block_cols]
+
+    return rows[keep], cols[keep], values[keep]
+
+def _sum_components(component_scores: Dict[str, np.ndarray], shape: Tuple) -> np.ndarray:
+    """Sum components in the same order as calculate_match_scores."""
+    total_scores = np.zeros(shape)
+    for name in SCORE_COMPONENTS:
+        total_scores = total_scores + component_scores[name]
+    return total_scores
+
+def _preference_table(prefs: np.ndarray, n_values: int) -> np.ndarray:
+    """
+    Student x value table for location / work mode: 1.0 if the value is
+    preferred, 0.0 if not, 0.5 if the student has no preference.
+    """
+    preferred = bitmask_contains(prefs, np.arange(n_values)).astype(float)
+    no_preference = ~prefs.any(axis=1)
+    preferred[no_preference] = 0.5
+    return preferred
+
+def preference_lists(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    values: np.ndarray,
+    n_students: int
+) -> Tuple[List[List[int]], List[List[float]]]:
+    """
+    Sort scored (student, organization) pairs into one preference list per
+    student: descending score, ties in organization order.
+
+    Returns:
+        tuple: (preferences, scores), one list per student
+    """
+    # Row-major, then descending score, then organization order
+    order = np.lexsort((cols, -values, rows))
+    indptr = np.searchsorted(rows[order], np.arange(n_students + 1))
+    return _split_rows(indptr, cols[order].tolist(), values[order].tolist())
+
+def _split_rows(
+    indptr: np.ndarray,
+    cols: List[int],
+    values: List[float]
+) -> Tuple[List[List[int]], List[List[float]]]:
+    """Split CSR-ordered columns/values into one Python list per row."""
+    bounds = indptr.tolist()
+    preferences = [cols[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+    scores = [values[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+    return preferences, scores
+
 def validate_matching_results(
     matches: Dict[str, List[str]],
     students: Dict[str, Dict],
@@ -0,0 +1,212 @@
+"""
+Candidate generation for matching: emits only the feasible (student,
+organization) pairs of a MatchingProblem, in CSR layout, so scoring can skip
+the rest of the students x organizations grid.
+
+A pair is a candidate when
+  - the organization has capacity in this run,
+  - the student meets the organization's mandatory requirements
+    (a mandatory minimum grade), and
+  - at least one score component can be positive for it, looked up through
+    per-run indexes of organizations by area of law, location, work mode
+    and minimum grade.
+
+Every pair with a positive score is a candidate, so scoring the candidates
+and keeping positive scores gives exactly the pairs full scoring would keep.
+
+Usage Flow:
+    index = CandidateIndex(problem)
+    candidates = index.generate()
+    rows, cols = candidates.rows(), candidates.indices
+"""
+
+from typing import List
+import logging
+
+import numpy as np
+
+from gem_app.utils.matching_problem import MatchingProblem, bitmask_contains
+
+logger = logging.getLogger(__name__)
+
+class CandidatePairs:
+    """
+    Candidate pairs in CSR layout: row i's organization indexes are
+    indices[indptr[i]:indptr[i + 1]], in ascending order.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def rows(self) -> np.ndarray:
+        """Row (student) index of every candidate, parallel to indices."""
+        return np.repeat(
+            np.arange(self.n_rows, dtype=np.int64), np.diff(self.indptr)
+        )
+
+class CandidateIndex:
+    """
+    Organization indexes built once per run, used to generate candidates:
+      - open_orgs: organizations with positions available
+      - area_members / location_members / work_mode_members: open orgs by
+        interned area, location and work mode (value x org membership)
+      - grade_order / grade_sorted: open orgs sorted by minimum grade
+      - mandatory_order / mandatory_sorted: open orgs whose minimum grade
+        is mandatory, sorted by that grade
+    """
+
+    def __init__(self, problem: MatchingProblem, chunk_size: int = 4096):
+        """
+        Args:
+            problem: Encoded matching input
+            chunk_size: Students per vectorized block when generating
+        """
+        self.problem = problem
+        self.chunk_size = chunk_size
+        n_orgs = problem.n_organizations
+
+        self.open_orgs = problem.capacities > 0
+
+        self.area_members = _members(problem.org_area, len(problem.areas), self.open_orgs)
+        self.location_members = _members(
+            problem.org_location, len(problem.locations), self.open_orgs
+        )
+        self.work_mode_members = _members(
+            problem.org_work_mode, len(problem.work_modes), self.open_orgs
+        )
+
+        area_named = np.array([bool(area) for area in problem.areas], dtype=bool)
+        self.named_area_orgs = self.open_orgs & area_named[problem.org_area]
+
+        # Soft grade requirement: grades score is positive at or above it.
+        # A NaN minimum never rejects; a non-numeric one always scores 0.
+        min_grade = problem.minimum_grade
+        comparable = self.open_orgs & problem.minimum_grade_valid & ~np.isnan(min_grade)
+        self.grade_order, self.grade_sorted, self.grade_position = _sorted_index(
+            min_grade, comparable, n_orgs
+        )
+        self.grade_unbounded = self.open_orgs & problem.minimum_grade_valid & np.isnan(min_grade)
+
+        # Mandatory grade requirement: a hard filter
+        mandatory = comparable & problem.minimum_grade_mandatory
+        self.mandatory_order, self.mandatory_sorted, self.mandatory_position = _sorted_index(
+            min_grade, mandatory, n_orgs
+        )
+        self.unrestricted_orgs = self.open_orgs & ~mandatory
+
+    def generate(self) -> CandidatePairs:
+        """Generate candidate pairs for every student of the problem."""
+        n_students = self.problem.n_students
+        counts: List[np.ndarray] = []
+        indices: List[np.ndarray] = []
+
+        for start in range(0, n_students, self.chunk_size):
+            stop = min(start + self.chunk_size, n_students)
+            mask = self._chunk_mask(start, stop)
+            counts.append(mask.sum(axis=1))
+            indices.append(np.nonzero(mask)[1])
+
+        indptr = np.zeros(n_students + 1, dtype=np.int64)
+        if counts:
+            np.cumsum(np.concatenate(counts), out=indptr[1:])
+        all_indices = (
+            np.concatenate(indices).astype(np.int32) if indices
+            else np.zeros(0, dtype=np.int32)
+        )
+
+        logger.info(
+            f"Generated {len(all_indices)} candidate pairs out of "
+            f"{n_students * self.problem.n_organizations}"
+        )
+        return CandidatePairs(indptr, all_indices)
+
+    def _chunk_mask(self, start: int, stop: int) -> np.ndarray:
+        """Candidate mask for students start..stop-1 against all orgs."""
+        problem = self.problem
+        grades = problem.grades[start:stop]
+        comparable = problem.grades_valid[start:stop] & ~np.isnan(grades)
+
+        # Hard filters: capacity and mandatory minimum grade
+        passing = np.where(
+            comparable,
+            np.searchsorted(self.mandatory_sorted, grades, side='right'),
+            0
+        )
+        feasible = self.unrestricted_orgs[None, :] | (
+            self.mandatory_position[None, :] < passing[:, None]
+        )
+
+        # Ranking: positive for every named area once the student ranked any
+        max_rank = problem.max_rank[start:stop].astype(float)
+        ranked = ~np.isnan(max_rank) & (max_rank > 0)
+        positive = ranked[:, None] & self.named_area_orgs[None, :]
+
+        # Grades: positive at or above the minimum grade
+        graded = comparable & (grades > 0)
+        above = np.where(
+            graded,
+            np.searchsorted(self.grade_sorted, grades, side='right'),
+            0
+        )
+        positive |= self.grade_position[None, :] < above[:, None]
+        positive |= graded[:, None] & self.grade_unbounded[None, :]
+
+        # Statement: positive for areas with a rated statement
+        rated = problem.statement_quality[start:stop] > 0
+        positive |= _lookup(
+            problem.statement_areas[start:stop], self.area_members
+        ) & rated[:, None]
+
+        # Location / work mode: positive if preferred or no preference
+        positive |= _preference_lookup(
+            problem.location_prefs[start:stop], self.location_members
+        )
+        positive |= _preference_lookup(
+            problem.work_mode_prefs[start:stop], self.work_mode_members
+        )
+
+        return feasible & positive & self.open_orgs[None, :]
+
+def _members(value_ids: np.ndarray, n_values: int, open_orgs: np.ndarray) -> np.ndarray:
+    """(n_values, n_orgs) membership of open orgs by interned value ID."""
+    members = np.zeros((n_values, len(value_ids)), dtype=bool)
+    open_idx = np.flatnonzero(open_orgs)
+    members[value_ids[open_idx], open_idx] = True
+    return members
+
+def _sorted_index(values: np.ndarray, include: np.ndarray, n_orgs: int):
+    """
+    Sort the included orgs by value.
+
+    Returns:
+        tuple: (order, sorted_values, position) where position[o] is o's
+        rank in order, or n_orgs if o is not included
+    """
+    order = np.flatnonzero(include)
+    order = order[np.argsort(values[order], kind='stable')]
+    position = np.full(n_orgs, n_orgs, dtype=np.int64)
+    position[order] = np.arange(len(order))
+    return order, values[order], position
+
+def _lookup(bitmask: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """Orgs whose value is set in each row's bitmask (rows x n_orgs)."""
+    n_values = members.shape[0]
+    if n_values == 0:
+        return np.zeros((bitmask.shape[0], members.shape[1]), dtype=bool)
+    selected = bitmask_contains(bitmask, np.arange(n_values)).astype(np.float32)
+    return (selected @ members.astype(np.float32)) > 0
+
+def _preference_lookup(bitmask: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """Like _lookup, but rows without any preference match every org."""
+    matched = _lookup(bitmask, members)
+    matched[~bitmask.any(axis=1)] = True
+    return matched
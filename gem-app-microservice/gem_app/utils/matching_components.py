@@ -0,0 +1,239 @@
+"""
+Decomposition of a deferred acceptance round into independent sub-markets.
+
+Students and organizations are the nodes of a bipartite graph whose edges
+are the feasible (student, organization) pairs. No proposal ever crosses
+between its connected components, so each component is matched on its own
+and the results are merged. Within a component, proposals happen in the
+same relative order as in a single run over everything, so every
+organization ends up with the same students in the same order.
+
+Components are found with vectorized union-find (hooking to the smaller
+root, then pointer jumping). They are packed into batches of similar pair
+counts and solved by a ProcessPoolExecutor; rounds with fewer than
+min_parallel_pairs pairs, or a single worker, are solved in-process.
+
+Usage Flow:
+    engine = DecomposedDeferredAcceptance(rows, cols, values, capacities, n_students)
+    engine.run()
+    matches = engine.matches()      # {org_index: [student_index, ...]}
+    engine.component_stats()        # component count and size distribution
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gem_app.utils.deferred_acceptance import DeferredAcceptance
+from gem_app.utils.parallel_scoring import PARALLEL_MIN_PAIRS
+
+logger = logging.getLogger(__name__)
+
+# (student indexes, org indexes, local rows, local cols, values, capacities)
+Component = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+def component_labels(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    n_students: int,
+    n_orgs: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Connected components of the bipartite graph with edges (rows, cols).
+
+    Returns:
+        tuple: (student_labels, org_labels), the smallest node of each
+        node's component, students numbered 0..n_students-1 and orgs
+        n_students..n_students+n_orgs-1
+    """
+    labels = np.arange(n_students + n_orgs)
+    u = np.asarray(rows, dtype=np.int64)
+    v = np.asarray(cols, dtype=np.int64) + n_students
+    while len(u):
+        lu = labels[u]
+        lv = labels[v]
+        differ = lu != lv
+        if not differ.any():
+            break
+        # Edges already inside one component stay there
+        u, v, lu, lv = u[differ], v[differ], lu[differ], lv[differ]
+
+        # Hook each root under the smallest root it shares an edge with
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+        # Point every node straight at its root
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+            labels = parents
+
+    return labels[:n_students], labels[n_students:]
+
+class DecomposedDeferredAcceptance:
+    """
+    Heap deferred acceptance over scored pairs, one DeferredAcceptance run
+    per connected component. Exposes matches() and remaining_scores() like
+    DeferredAcceptance, with identical results.
+
+    Attributes:
+        proposals / bumps: totals over all components
+        component_sizes: (students, organizations) of each component
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        capacities: np.ndarray,
+        n_students: int,
+        workers: Optional[int] = None,
+        min_parallel_pairs: int = PARALLEL_MIN_PAIRS,
+        batches_per_worker: int = 4
+    ):
+        """
+        Args:
+            rows / cols / values: feasible pairs in row-major order
+            capacities: per org, number of positions available
+            n_students: number of students (rows index into range(n_students))
+            workers: number of processes (defaults to the host's CPU count)
+            min_parallel_pairs: solve smaller rounds in-process
+            batches_per_worker: batches per process, to even out the load
+        """
+        self.rows = rows
+        self.cols = cols
+        self.values = values
+        self.capacities = np.asarray(capacities)
+        self.n_students = n_students
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_pairs = min_parallel_pairs
+        self.batches_per_worker = batches_per_worker
+
+        self.proposals = 0
+        self.bumps = 0
+        self.component_sizes: List[Tuple[int, int]] = []
+        self._matches: Dict[int, List[int]] = {}
+        self._remaining: Dict[int, List[float]] = {}
+
+    def run(self) -> None:
+        """Find the components, solve each and merge the results."""
+        components = self._components()
+        self.component_sizes = [(len(c[0]), len(c[1])) for c in components]
+        batches = _batches(components, self.workers * self.batches_per_worker)
+
+        workers = min(self.workers, len(batches))
+        if workers < 2 or len(self.rows) < self.min_parallel_pairs:
+            solved = [_solve_batch(batch) for batch in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                solved = list(executor.map(_solve_batch, batches))
+
+        for batch, results in zip(batches, solved):
+            for (students, orgs, *_), (matches, remaining, proposals, bumps) in zip(batch, results):
+                for org, sids in matches.items():
+                    self._matches[int(orgs[org])] = students[sids].tolist()
+                for sid, scores in zip(students.tolist(), remaining):
+                    self._remaining[sid] = scores
+                self.proposals += proposals
+                self.bumps += bumps
+
+        logger.info(
+            f"Matched {len(components)} components in {len(batches)} batches "
+            f"on {max(workers, 1)} processes"
+        )
+
+    def matches(self) -> Dict[int, List[int]]:
+        """Current matches keyed by org index, in org index order."""
+        return {org: self._matches[org] for org in sorted(self._matches)}
+
+    def remaining_scores(self, sid: int) -> List[float]:
+        """Scores of the preferences the student has not been rejected from."""
+        return self._remaining.get(sid, [])
+
+    def component_stats(self) -> Dict[str, Any]:
+        """Component count and size distribution (in students and orgs)."""
+        if not self.component_sizes:
+            return {'components': 0}
+        sizes = np.array(self.component_sizes)
+        students = sizes[:, 0]
+        return {
+            'components': len(sizes),
+            'largest_component_students': int(students.max()),
+            'largest_component_organizations': int(sizes[:, 1].max()),
+            'median_component_students': float(np.median(students)),
+            'largest_component_share': float(students.max() / students.sum()),
+            'singleton_components': int(np.sum(students == 1))
+        }
+
+    def _components(self) -> List[Component]:
+        """Per component, its students, orgs and pairs in local indexes."""
+        rows, cols, values = self.rows, self.cols, self.values
+        if len(rows) == 0:
+            return []
+        n_orgs = len(self.capacities)
+        student_labels, _ = component_labels(rows, cols, self.n_students, n_orgs)
+
+        # Group pairs by component, keeping row-major order within each
+        pair_labels = student_labels[rows]
+        order = np.argsort(pair_labels, kind='stable')
+        pair_labels = pair_labels[order]
+        bounds = np.flatnonzero(np.diff(pair_labels)) + 1
+        bounds = np.concatenate(([0], bounds, [len(order)])).tolist()
+
+        components = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            selected = order[start:stop]
+            students, local_rows = np.unique(rows[selected], return_inverse=True)
+            orgs, local_cols = np.unique(cols[selected], return_inverse=True)
+            components.append((
+                students,
+                orgs,
+                local_rows,
+                local_cols,
+                values[selected],
+                self.capacities[orgs]
+            ))
+        return components
+
+def _batches(components: List[Component], n_batches: int) -> List[List[Component]]:
+    """Pack components into up to n_batches lists of similar pair counts."""
+    if not components:
+        return []
+    n_batches = max(1, min(n_batches, len(components)))
+    loads = np.zeros(n_batches)
+    batches: List[List[Component]] = [[] for _ in range(n_batches)]
+    # Largest first, each to the least loaded batch
+    for index in sorted(range(len(components)), key=lambda i: -len(components[i][4])):
+        target = int(np.argmin(loads))
+        batches[target].append(components[index])
+        loads[target] += len(components[index][4])
+    return [batch for batch in batches if batch]
+
+def _solve_batch(
+    batch: List[Component]
+) -> List[Tuple[Dict[int, List[int]], List[List[float]], int, int]]:
+    """
+    Run deferred acceptance on each component of a batch.
+
+    Returns:
+        list: per component, (matches, remaining scores per student,
+        proposals, bumps) in the component's local indexes
+    """
+    # Imported here: matching_algorithm imports this module
+    from gem_app.utils.matching_algorithm import preference_lists
+
+    results = []
+    for students, _, local_rows, local_cols, values, capacities in batch:
+        preferences, scores = preference_lists(local_rows, local_cols, values, len(students))
+        engine = DeferredAcceptance(preferences, scores, capacities.tolist())
+        engine.run(range(len(students)))
+        results.append((
+            engine.matches(),
+            [engine.remaining_scores(i) for i in range(len(students))],
+            engine.proposals,
+            engine.bumps
+        ))
+    return results
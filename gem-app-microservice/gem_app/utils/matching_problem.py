@@ -0,0 +1,380 @@
+"""
+Compact, integer-encoded representation of a matching problem.
+
+Area, location and work-mode values are interned to small integer IDs.
+Student and organization features are stored as NumPy columns, and
+location/work-mode/statement membership as bitmasks, so scoring never
+touches Python strings and statement text is never kept.
+
+Usage Flow:
+1. Build from the loaders' dictionaries:
+    problem = MatchingProblem.from_dicts(students, organizations)
+   or incrementally from database rows:
+    builder = MatchingProblemBuilder()
+    builder.add_organization(org_id, area, location, work_mode, positions, min_grade)
+    builder.add_student(student_id, rankings, grade, statement_areas, ratings, locations, work_modes)
+    problem = builder.build()
+2. Score and match:
+    MatchingAlgorithm(scoring='vectorized').run_matching_problem(problem)
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+import logging
+import numbers
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Column names: student columns have one row per student, organization
+# columns one entry per organization
+STUDENT_COLUMNS = (
+    'grades', 'grades_valid', 'ranks', 'max_rank', 'statement_quality',
+    'statement_areas', 'location_prefs', 'work_mode_prefs'
+)
+ORGANIZATION_COLUMNS = (
+    'org_area', 'org_location', 'org_work_mode', 'minimum_grade',
+    'minimum_grade_valid', 'minimum_grade_mandatory', 'capacities'
+)
+
+class MatchingProblem:
+    """
+    Students x organizations matching input as NumPy columns.
+
+    Student columns (length n_students):
+        grades / grades_valid: overall grade and whether it is a real number
+        ranks: (n_students, n_areas) rank per interned area, NaN if unranked
+        max_rank: highest rank the student gave, NaN if no rankings
+        statement_quality: statement score for any area with a statement
+        statement_areas / location_prefs / work_mode_prefs: uint64 bitmasks
+            (n_students, words) over the interned areas/locations/work modes
+
+    Organization columns (length n_organizations):
+        org_area / org_location / org_work_mode: interned IDs
+        minimum_grade / minimum_grade_valid: grade requirement
+        minimum_grade_mandatory: whether the grade requirement is a hard filter
+        capacities: positions available in this run
+    """
+
+    def __init__(
+        self,
+        student_ids: List[str],
+        org_ids: List[str],
+        areas: List[Any],
+        locations: List[Any],
+        work_modes: List[Any],
+        columns: Dict[str, np.ndarray]
+    ):
+        self.student_ids = student_ids
+        self.org_ids = org_ids
+        self.areas = areas
+        self.locations = locations
+        self.work_modes = work_modes
+
+        self.grades = columns['grades']
+        self.grades_valid = columns['grades_valid']
+        self.ranks = columns['ranks']
+        self.max_rank = columns['max_rank']
+        self.statement_quality = columns['statement_quality']
+        self.statement_areas = columns['statement_areas']
+        self.location_prefs = columns['location_prefs']
+        self.work_mode_prefs = columns['work_mode_prefs']
+
+        self.org_area = columns['org_area']
+        self.org_location = columns['org_location']
+        self.org_work_mode = columns['org_work_mode']
+        self.minimum_grade = columns['minimum_grade']
+        self.minimum_grade_valid = columns['minimum_grade_valid']
+        self.minimum_grade_mandatory = columns['minimum_grade_mandatory']
+        self.capacities = columns['capacities']
+
+    @property
+    def n_students(self) -> int:
+        return len(self.student_ids)
+
+    @property
+    def n_organizations(self) -> int:
+        return len(self.org_ids)
+
+    @classmethod
+    def from_dicts(
+        cls,
+        students: Dict[str, Dict],
+        organizations: Dict[str, Dict]
+    ) -> 'MatchingProblem':
+        """
+        Encode the dictionary format used by MatchingAlgorithm.run_matching_round.
+
+        Args:
+            students: Dictionary of student data keyed by student ID
+            organizations: Dictionary of organization data keyed by org ID
+
+        Returns:
+            MatchingProblem: encoded problem with rows/columns in dict order
+        """
+        builder = MatchingProblemBuilder()
+        for oid, odata in organizations.items():
+            builder.add_organization(
+                oid,
+                odata.get('area_of_law', ''),
+                odata.get('location', ''),
+                odata.get('work_mode', ''),
+                odata.get('available_positions', 1),
+                odata.get('minimum_grade', 0),
+                odata.get('minimum_grade_mandatory', False)
+            )
+        for sid, sdata in students.items():
+            preferences = sdata.get('preferences', {})
+            builder.add_student(
+                sid,
+                sdata.get('rankings', {}),
+                sdata.get('grades', {}).get('overall_grade', 0),
+                [area for area, text in sdata.get('statements', {}).items() if text],
+                sdata.get('statement_ratings', {}),
+                preferences.get('location', []),
+                preferences.get('work_mode', [])
+            )
+        return builder.build()
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The NumPy columns by name, as passed to the constructor."""
+        return {
+            name: getattr(self, name)
+            for name in STUDENT_COLUMNS + ORGANIZATION_COLUMNS
+        }
+
+    def nbytes(self) -> int:
+        """Total size of the NumPy columns in bytes."""
+        return sum(
+            value.nbytes for value in vars(self).values()
+            if isinstance(value, np.ndarray)
+        )
+
+class MatchingProblemBuilder:
+    """
+    Accumulates students and organizations one at a time, interning
+    area/location/work-mode values, then packs them into a MatchingProblem.
+    """
+
+    def __init__(
+        self,
+        areas: Iterable[Any] = (),
+        locations: Iterable[Any] = (),
+        work_modes: Iterable[Any] = ()
+    ):
+        """
+        Args:
+            areas / locations / work_modes: values to intern first, in order,
+                e.g. a previous problem's, so their IDs stay the same
+        """
+        self._areas: Dict[Any, int] = {}
+        self._locations: Dict[Any, int] = {}
+        self._work_modes: Dict[Any, int] = {}
+        for ids, values in (
+            (self._areas, areas),
+            (self._locations, locations),
+            (self._work_modes, work_modes)
+        ):
+            for value in values:
+                _intern_one(ids, value)
+
+        self._org_ids: List[str] = []
+        self._org_rows: List[Tuple[int, int, int, Any, Any, bool]] = []
+
+        self._student_ids: List[str] = []
+        self._grades: List[Any] = []
+        self._rankings: List[Dict[int, float]] = []
+        self._max_rank: List[float] = []
+        self._statement_quality: List[float] = []
+        self._statement_areas: List[List[int]] = []
+        self._location_prefs: List[List[int]] = []
+        self._work_mode_prefs: List[List[int]] = []
+
+    def add_organization(
+        self,
+        org_id: str,
+        area_of_law: Any,
+        location: Any,
+        work_mode: Any,
+        available_positions: Any,
+        minimum_grade: Any,
+        minimum_grade_mandatory: bool = False
+    ) -> None:
+        """
+        Add one organization (column) to the problem.
+
+        Args:
+            minimum_grade_mandatory: if True, students below minimum_grade
+                are never matched to this organization
+        """
+        self._org_ids.append(org_id)
+        self._org_rows.append((
+            _intern_one(self._areas, area_of_law),
+            _intern_one(self._locations, location),
+            _intern_one(self._work_modes, work_mode),
+            available_positions,
+            minimum_grade,
+            bool(minimum_grade_mandatory)
+        ))
+
+    def add_student(
+        self,
+        student_id: str,
+        rankings: Dict[Any, float],
+        overall_grade: Any,
+        statement_areas: Iterable[Any],
+        statement_ratings: Dict[str, Any],
+        locations: Iterable[Any],
+        work_modes: Iterable[Any]
+    ) -> None:
+        """
+        Add one student (row) to the problem.
+
+        Args:
+            student_id: Student profile ID
+            rankings: {area_of_law: rank}
+            overall_grade: Overall grade out of 40
+            statement_areas: Areas the student wrote a non-empty statement for
+            statement_ratings: Statement ratings, as in the student dict
+            locations: Preferred locations (empty for no preference)
+            work_modes: Preferred work modes (empty for no preference)
+        """
+        self._student_ids.append(student_id)
+        self._grades.append(overall_grade)
+
+        max_rank = np.nan
+        encoded_ranks: Dict[int, float] = {}
+        if rankings:
+            try:
+                max_rank = float(max(rankings.values()))
+                encoded_ranks = {
+                    _intern_one(self._areas, area): float(rank)
+                    for area, rank in rankings.items()
+                }
+            except (TypeError, ValueError) as e:
+                logger.error(f"Invalid rankings for student {student_id}: {str(e)}")
+                max_rank = np.nan
+                encoded_ranks = {}
+        self._rankings.append(encoded_ranks)
+        self._max_rank.append(max_rank)
+
+        self._statement_quality.append(statement_quality(statement_ratings))
+        self._statement_areas.append(
+            [_intern_one(self._areas, area) for area in statement_areas]
+        )
+        self._location_prefs.append(
+            [_intern_one(self._locations, loc) for loc in locations or []]
+        )
+        self._work_mode_prefs.append(
+            [_intern_one(self._work_modes, mode) for mode in work_modes or []]
+        )
+
+    def build(self) -> MatchingProblem:
+        """Pack everything added so far into a MatchingProblem."""
+        n_students = len(self._student_ids)
+        n_areas = len(self._areas)
+
+        grades, grades_valid = real_array(self._grades)
+
+        ranks = np.full((n_students, n_areas), np.nan)
+        for row, encoded in enumerate(self._rankings):
+            if encoded:
+                ranks[row, list(encoded.keys())] = list(encoded.values())
+        max_rank = np.array(self._max_rank, dtype=float)
+
+        if self._org_rows:
+            (org_area, org_location, org_work_mode,
+             capacities, minimum_grade, mandatory) = zip(*self._org_rows)
+        else:
+            org_area = org_location = org_work_mode = ()
+            capacities = minimum_grade = mandatory = ()
+        min_grades, min_valid = real_array(list(minimum_grade))
+
+        columns = {
+            'grades': grades,
+            'grades_valid': grades_valid,
+            'ranks': narrow_float(ranks),
+            'max_rank': narrow_float(max_rank),
+            'statement_quality': np.array(self._statement_quality, dtype=float),
+            'statement_areas': pack_bitmask(self._statement_areas, n_areas),
+            'location_prefs': pack_bitmask(self._location_prefs, len(self._locations)),
+            'work_mode_prefs': pack_bitmask(self._work_mode_prefs, len(self._work_modes)),
+            'org_area': np.array(org_area, dtype=np.int32),
+            'org_location': np.array(org_location, dtype=np.int32),
+            'org_work_mode': np.array(org_work_mode, dtype=np.int32),
+            'minimum_grade': min_grades,
+            'minimum_grade_valid': min_valid,
+            'minimum_grade_mandatory': np.array(mandatory, dtype=bool),
+            'capacities': np.array(capacities, dtype=np.int32),
+        }
+
+        return MatchingProblem(
+            list(self._student_ids),
+            list(self._org_ids),
+            list(self._areas.keys()),
+            list(self._locations.keys()),
+            list(self._work_modes.keys()),
+            columns
+        )
+
+def statement_quality(ratings: Dict[str, Any]) -> float:
+    """
+    Statement score for an area the student wrote a statement for: the
+    average rating scaled to 0..1, or 0 if there are no usable ratings.
+    Mirrors MatchingAlgorithm._calculate_statement_score.
+    """
+    try:
+        if not ratings:
+            return 0.0
+        max_possible = len(ratings) * 5.0
+        return float(sum(ratings.values())) / max_possible
+    except Exception:
+        return 0.0
+
+def real_array(values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert values to a float array plus a mask of which entries are real
+    numbers (the scalar score helpers score anything else as 0).
+    """
+    valid = np.array(
+        [isinstance(v, numbers.Real) for v in values], dtype=bool
+    )
+    array = np.array(
+        [float(v) if ok else 0.0 for v, ok in zip(values, valid)], dtype=float
+    )
+    return array, valid
+
+def narrow_float(values: np.ndarray) -> np.ndarray:
+    """Store as float32 when that loses nothing (e.g. integer ranks)."""
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed, values, equal_nan=True):
+        return narrowed
+    return values
+
+def pack_bitmask(members: List[List[int]], n_values: int) -> np.ndarray:
+    """
+    Pack per-row lists of IDs into a (rows, words) uint64 bitmask, where
+    bit (id % 64) of word (id // 64) is set for each member ID.
+    """
+    words = max(1, -(-n_values // 64))
+    mask = np.zeros((len(members), words), dtype=np.uint64)
+    for row, ids in enumerate(members):
+        for value_id in ids:
+            mask[row, value_id // 64] |= np.uint64(1 << (value_id % 64))
+    return mask
+
+def bitmask_contains(mask: np.ndarray, value_ids: np.ndarray) -> np.ndarray:
+    """
+    Test every row of mask against every ID in value_ids.
+
+    Returns:
+        np.ndarray: bool array of shape (rows, len(value_ids))
+    """
+    value_ids = np.asarray(value_ids, dtype=np.int64)
+    words = mask[:, value_ids // 64]
+    shifts = (value_ids % 64).astype(np.uint64)
+    return ((words >> shifts[None, :]) & np.uint64(1)).astype(bool)
+
+def _intern_one(ids: Dict[Any, int], value: Any) -> int:
+    """Return the interned ID for value, assigning the next ID if new."""
+    return ids.setdefault(value, len(ids))
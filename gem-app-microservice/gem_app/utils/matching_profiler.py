@@ -0,0 +1,68 @@
+"""
+Lightweight per-phase instrumentation for matching runs: timed spans and
+counters, accumulated over every round of a run.
+
+A disabled profiler hands out a shared no-op context manager and ignores
+counts, so instrumented code costs a method call per phase when profiling
+is off.
+
+Usage Flow:
+    profiler = MatchingProfiler()
+    with profiler.span('scoring'):
+        ...
+    profiler.count('pairs_scored', n_pairs)
+    profiler.report()   # {'spans': {'scoring': seconds}, 'counters': {...}}
+"""
+
+from contextlib import nullcontext
+from typing import Any, Dict
+import time
+
+_DISABLED_SPAN = nullcontext()
+
+class MatchingProfiler:
+    """
+    Timed spans and counters of one matching run.
+
+    Attributes:
+        spans: total seconds spent in each named span
+        counters: total of each named counter
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    def span(self, name: str):
+        """Context manager adding the time spent inside it to span name."""
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return _Span(self, name)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add amount to counter name."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + int(amount)
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-serializable copy of the spans (rounded seconds) and counters."""
+        return {
+            'spans': {name: round(seconds, 6) for name, seconds in self.spans.items()},
+            'counters': dict(self.counters)
+        }
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: MatchingProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        spans = self.profiler.spans
+        spans[self.name] = spans.get(self.name, 0.0) + time.perf_counter() - self.start
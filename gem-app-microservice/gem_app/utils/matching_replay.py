@@ -0,0 +1,181 @@
+"""
+Offline replay of a matching run from a bundle written by
+MatchingService.run_matching(export_path=...): the run's encoded students
+and organizations, score weights and resulting matches (a MatchingSnapshot
+without scores). The bundle is matched again through any engine and the
+result is compared with the recorded one, with no app context or database.
+
+Rounds follow MatchingService.run_matching: later rounds match the
+students left over against the positions left, until max rounds or a
+round without matches.
+
+Usage:
+    python -m gem_app.utils.matching_replay run.npz
+    python -m gem_app.utils.matching_replay run.npz --engine optimal --output replay.json
+    python -m gem_app.utils.matching_replay run.npz --weights 0.5 0.2 0.2 0.05 0.05 --verify
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import logging
+import time
+
+from gem_app.utils.matching_algorithm import (
+    ENGINES, SCORE_COMPONENTS, SCORING_MODES, MatchingAlgorithm
+)
+from gem_app.utils.matching_snapshot import MatchingSnapshot
+from gem_app.utils.matching_verifier import score_matrix, verify_matching
+from gem_app.utils.weight_sweep import WeightVector, normalize_weights
+
+logger = logging.getLogger(__name__)
+
+def replay(
+    snapshot: MatchingSnapshot,
+    engine: Optional[str] = None,
+    scoring: str = 'sparse',
+    max_rounds: int = 3,
+    top_k: Optional[int] = None,
+    decompose: bool = False,
+    weights: Optional[WeightVector] = None,
+    verify: bool = False,
+    max_reported: int = 100
+) -> Dict[str, Any]:
+    """
+    Match a bundle's problem again and compare with its recorded matches.
+
+    Args:
+        snapshot: the loaded bundle
+        engine: matching engine (defaults to the recorded one, else 'heap')
+        scoring / top_k / decompose: as in MatchingAlgorithm
+        max_rounds: Maximum number of matching rounds
+        weights: score weights (defaults to the recorded ones)
+        verify: also check the replayed matches with verify_matching
+        max_reported: most changed students listed (all are counted)
+
+    Returns:
+        dict: settings, 'wall_time_s', 'rounds', 'matched',
+        'recorded_matched', 'changed_count' and 'changed' (student_id,
+        recorded org_id, replayed org_id), 'round_stats', 'matches' and
+        with verify a 'verification' report
+    """
+    problem = snapshot.problem
+    algorithm = MatchingAlgorithm(
+        scoring=scoring,
+        engine=engine or snapshot.engine or 'heap',
+        top_k=top_k,
+        decompose=decompose
+    )
+    if weights is not None:
+        algorithm.weights = dict(zip(SCORE_COMPONENTS, normalize_weights(weights).tolist()))
+    elif snapshot.weights is not None:
+        algorithm.weights = dict(snapshot.weights)
+
+    all_matches: Dict[str, List[str]] = {}
+    unmatched = list(problem.student_ids)
+    rounds = []
+    start = time.perf_counter()
+    while unmatched and len(rounds) < max_rounds:
+        round_start = time.perf_counter()
+        round_matches, _, unmatched = algorithm.run_matching_problem(
+            problem, previous_matches=all_matches
+        )
+        for org_id, student_ids in round_matches.items():
+            all_matches.setdefault(org_id, []).extend(student_ids)
+        rounds.append(dict(
+            algorithm.last_round_stats,
+            matched=sum(len(sids) for sids in round_matches.values()),
+            wall_time_s=time.perf_counter() - round_start
+        ))
+        if not round_matches:
+            break
+    wall_time = time.perf_counter() - start
+
+    replayed = MatchingSnapshot.from_matches(problem, all_matches)
+    changed = (replayed.assignment != snapshot.assignment).nonzero()[0]
+
+    def org_id(index: int) -> Optional[str]:
+        return problem.org_ids[index] if index >= 0 else None
+
+    result = {
+        'engine': algorithm.engine,
+        'scoring': scoring,
+        'top_k': top_k,
+        'decompose': decompose,
+        'weights': algorithm.weights,
+        'students': problem.n_students,
+        'organizations': problem.n_organizations,
+        'wall_time_s': wall_time,
+        'rounds': len(rounds),
+        'matched': int((replayed.assignment >= 0).sum()),
+        'recorded_matched': int((snapshot.assignment >= 0).sum()),
+        'changed_count': len(changed),
+        'changed': [
+            (
+                problem.student_ids[i],
+                org_id(int(snapshot.assignment[i])),
+                org_id(int(replayed.assignment[i]))
+            )
+            for i in changed[:max_reported].tolist()
+        ],
+        'round_stats': rounds,
+        'matches': all_matches
+    }
+    if verify:
+        result['verification'] = verify_matching(
+            problem, all_matches, score_matrix(problem, *algorithm.scored_pairs(problem))
+        )
+    return result
+
+def main():
+    """Replay a bundle and print (and optionally write) the comparison."""
+    parser = argparse.ArgumentParser(description="Replay a matching bundle offline")
+    parser.add_argument("bundle", help="Bundle written by MatchingService.run_matching(export_path=...)")
+    parser.add_argument("--engine", choices=ENGINES, default=None, help="Engine (default: the recorded one)")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default='sparse', help="Scoring mode")
+    parser.add_argument("--max-rounds", type=int, default=3, help="Maximum matching rounds")
+    parser.add_argument("--top-k", type=int, default=None, help="Top-K preference lists (heap engine only)")
+    parser.add_argument("--decompose", action='store_true', help="Match connected components separately (heap engine only)")
+    parser.add_argument(
+        "--weights", type=float, nargs=len(SCORE_COMPONENTS), default=None,
+        metavar='W', help=f"Score weights ({', '.join(SCORE_COMPONENTS)})"
+    )
+    parser.add_argument("--verify", action='store_true', help="Check capacities and stability of the replay")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    snapshot = MatchingSnapshot.load(args.bundle)
+    load_time = time.perf_counter() - start
+
+    result = replay(
+        snapshot,
+        engine=args.engine,
+        scoring=args.scoring,
+        max_rounds=args.max_rounds,
+        top_k=args.top_k,
+        decompose=args.decompose,
+        weights=args.weights,
+        verify=args.verify
+    )
+    result['load_time_s'] = load_time
+
+    print(
+        f"students={result['students']} organizations={result['organizations']} "
+        f"engine={result['engine']} load={load_time:.3f}s match={result['wall_time_s']:.3f}s "
+        f"rounds={result['rounds']} matched={result['matched']} "
+        f"(recorded {result['recorded_matched']}) changed={result['changed_count']}"
+    )
+    if args.verify:
+        verification = result['verification']
+        print(
+            f"valid={verification['valid']} stable={verification['stable']} "
+            f"blocking_pairs={verification['blocking_pair_count']}"
+        )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
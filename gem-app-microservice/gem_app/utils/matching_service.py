@@ -4,18 +4,40 @@ to run multi-round matching and persist results as Match objects in the database
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
+import numpy as np
+
+from flask import current_app
+from sqlalchemy import func, insert
+
 from gem_app.extensions import db
-from gem_app.models.matching import Match, MatchingRound
+from gem_app.models.matching import Match, MatchHistory, MatchingRound
 from gem_app.models.student import StudentProfile, Statement, AreaRanking
 from gem_app.models.organization import OrganizationProfile, OrganizationRequirement
+from gem_app.models.user import User
 from gem_app.utils.matching_algorithm import MatchingAlgorithm
+from gem_app.utils.incremental_matching import IncrementalMatcher
+from gem_app.utils.matching_problem import MatchingProblem, MatchingProblemBuilder
+from gem_app.utils.matching_profiler import MatchingProfiler
+from gem_app.utils.matching_snapshot import MatchingSnapshot
+from gem_app.utils.matching_verifier import score_matrix, verify_matching
+from gem_app.utils.score_cache import ScoreCache
+from gem_app.utils.vacancy_chain import VacancyChain
+from gem_app.utils.weight_sweep import WeightSweep, WeightVector
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Score caches by directory, shared by every MatchingService in the process
+_score_caches: Dict[str, ScoreCache] = {}
+
+# New Match rows inserted (and committed) per statement
+MATCH_INSERT_CHUNK = 5000
+
 class MatchingService:
     """
     A service class that orchestrates:
@@ -29,11 +51,35 @@ class MatchingService:
         # results => {'matches': {org_id: [student_id, ...]}, 'unmatched': [student_id,...]}
     """
 
-    def __init__(self):
-        """Initialize the matching service with an algorithm instance."""
-        self.matching_algorithm = MatchingAlgorithm()
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        score_cache: Optional[ScoreCache] = None
+    ):
+        """
+        Initialize the matching service with an algorithm instance.
+
+        Args:
+            snapshot_path: where incremental runs keep their MatchingSnapshot
+                (defaults to the MATCHING_SNAPSHOT_PATH config value)
+            score_cache: cache for computed scores (defaults to one in the
+                SCORE_CACHE_DIR config directory, if set)
+        """
+        self.matching_algorithm = MatchingAlgorithm(
+            scoring='sparse', engine='heap', score_cache=score_cache
+        )
+        self.snapshot_path = snapshot_path
 
-    def run_matching(self, max_rounds: int = 3, round_number: Optional[int] = None) -> Dict[str, Any]:
+    def run_matching(
+        self,
+        max_rounds: int = 3,
+        round_number: Optional[int] = None,
+        engine: Optional[str] = None,
+        incremental: bool = False,
+        profile: Optional[bool] = None,
+        deadline: Optional[float] = None,
+        export_path: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Main entry point for the matching process:
           1) Gathers data for students and organizations
@@ -43,18 +89,66 @@ class MatchingService:
         Args:
             max_rounds: Maximum number of matching rounds to run
             round_number: Optional specific round number to use
+            engine: Optional matching engine for this run ('heap' deferred
+                acceptance by default, or 'optimal' for maximum total score)
+            incremental: Repair the previous incremental run's matching in
+                round 1, rescoring only what changed (see IncrementalMatcher);
+                without a snapshot, round 1 is a full run that writes one
+            profile: Record per-phase timings and counters (load, scoring,
+                sorting, proposals, persistence) on the MatchingRound and in
+                the results (defaults to the MATCHING_PROFILE config value)
+            deadline: Optional time budget in seconds for the whole run, for
+                quick previews: rounds stop when it runs out and return the
+                best partial matching found (see MatchingAlgorithm deadline)
+            export_path: Optional file to write the run's encoded input,
+                weights and matches to, as a compressed bundle that
+                matching_replay can replay without the database
             
         Returns:
-            dict: Results with 'matches' and 'unmatched' keys
+            dict: Results with 'matches' and 'unmatched' keys, plus an
+            'incremental' report for incremental runs, 'score_cache'
+            hit/miss counters when a score cache is used, a 'profile'
+            breakdown when profiling, and under a deadline 'unprocessed'
+            (students not fully processed) and 'deadline_reached'; full runs
+            also report a stability and capacity 'verification'
         """
         try:
-            # Prepare data for the algorithm
-            students = self._get_students_for_matching()
-            organizations = self._get_organizations_for_matching()
+            if self.matching_algorithm.score_cache is None:
+                self.matching_algorithm.score_cache = self._default_score_cache()
+            algorithm = self.matching_algorithm
+            if engine is not None and engine != algorithm.engine:
+                algorithm = MatchingAlgorithm(
+                    scoring=algorithm.scoring,
+                    engine=engine,
+                    score_cache=algorithm.score_cache
+                )
+            if deadline is not None:
+                if incremental:
+                    raise ValueError("Incremental matching cannot run under a deadline")
+                algorithm = MatchingAlgorithm(
+                    scoring=algorithm.scoring,
+                    engine=algorithm.engine,
+                    score_cache=algorithm.score_cache,
+                    deadline=deadline
+                )
+                expires = time.perf_counter() + deadline
+            if incremental and algorithm.engine == 'optimal':
+                raise ValueError("Incremental matching requires deferred acceptance")
+            if profile is None:
+                profile = current_app.config.get('MATCHING_PROFILE', False)
+            profiler = MatchingProfiler(enabled=profile)
+            algorithm.profiler = profiler
+
+            # Prepare data for the algorithm, keeping the snapshot's
+            # interned values so its scores line up
+            with profiler.span('load'):
+                snapshot = self._load_snapshot() if incremental else None
+                problem = self._get_matching_problem(snapshot.problem if snapshot else None)
+            matcher = IncrementalMatcher(algorithm) if incremental else None
 
             # Initialize tracking structures
             all_matches = {}  # Will store all matches across rounds
-            unmatched_students = list(students.keys())
+            unmatched_students = list(problem.student_ids)
             
             # If not specified, calculate current round number
             if round_number is None:
@@ -65,15 +159,27 @@ class MatchingService:
             
             # Run multiple rounds of matching
             current_round = 1
+            unprocessed = []
             while unmatched_students and current_round <= max_rounds:
+                if deadline is not None:
+                    # Each round gets what is left of the budget
+                    algorithm.deadline = max(expires - time.perf_counter(), 0.0)
+
                 logger.info(f"Starting matching round {current_round} with {len(unmatched_students)} unmatched students")
                 
-                # Run a matching round
-                round_matches, student_scores, unmatched_students = self.matching_algorithm.run_matching_round(
-                    students,
-                    organizations,
-                    previous_matches=all_matches
-                )
+                # Run a matching round: later rounds only match students
+                # left over, against the positions left, reusing round-1 scores
+                if matcher is not None and current_round == 1:
+                    round_result = self._run_incremental_round(matcher, problem, snapshot)
+                else:
+                    round_result = algorithm.run_matching_problem(
+                        problem,
+                        previous_matches=all_matches
+                    )
+                round_matches, student_scores, unmatched_students = round_result
+                profiler.count('rounds')
+                if deadline is not None:
+                    unprocessed = algorithm.unprocessed_students
                 
                 # Track which round each match was made in
                 for org_id, student_ids in round_matches.items():
@@ -96,14 +202,53 @@ class MatchingService:
                 
                 current_round += 1
 
+                # A round without new matches leaves the next one identical
+                if not round_matches or unprocessed:
+                    break
+
+            # Check capacities and stability before saving (a deadline run
+            # is partial and has not scored everyone)
+            verification = None
+            if deadline is None:
+                with profiler.span('verification'):
+                    verification = verify_matching(
+                        problem,
+                        all_matches,
+                        score_matrix(problem, *algorithm.scored_pairs(problem))
+                    )
+                self._log_verification(verification)
+
             # Save matches to database
-            self._save_matches_to_database(all_matches, round_results, round_number)
+            with profiler.span('persistence'):
+                matching_round = self._save_matches_to_database(
+                    all_matches, round_results, round_number, profiler, problem, algorithm
+                )
+            if profiler.enabled:
+                matching_round.profile = profiler.report()
+                db.session.commit()
 
-            return {
+            if export_path is not None:
+                MatchingSnapshot.from_matches(
+                    problem, all_matches, weights=algorithm.weights, engine=algorithm.engine
+                ).save(export_path, compress=True)
+
+            results = {
                 'matches': all_matches,
                 'unmatched': unmatched_students,
                 'round_results': round_results
             }
+            if matcher is not None:
+                results['incremental'] = matcher.report
+            if algorithm.score_cache is not None:
+                results['score_cache'] = algorithm.score_cache.stats()
+            if profiler.enabled:
+                results['profile'] = matching_round.profile
+            if verification is not None:
+                results['verification'] = verification
+            if deadline is not None:
+                results['unprocessed'] = unprocessed
+                results['deadline_reached'] = bool(unprocessed)
+            return results
         
         except Exception as e:
             logger.error(f"Error running matching: {str(e)}")
@@ -117,66 +262,544 @@ class MatchingService:
         Returns:
             dict: Student data keyed by student ID
         """
-        # Get students with 'unmatched' or 'pending' status
-        eligible_students = StudentProfile.query.filter(
-            StudentProfile.status.in_(['unmatched', 'pending'])
-        ).all()
-
-        # Build student dictionary for the algorithm
         students_dict = {}
-        for student in eligible_students:
-            # Skip students without a user
-            if not student.user:
-                continue
-                
-            student_id = str(student.id)  # Use profile ID as the key
-
-            # Build ranking dictionary from AreaRanking objects
-            ranking_dict = {}
-            for ranking in student.rankings:
-                ranking_dict[ranking.area_of_law] = float(ranking.rank)
-
-            # Build statements dictionary from Statement objects
-            statement_dict = {}
-            for stmt in student.statements:
-                statement_dict[stmt.area_of_law] = stmt.content
-
-            # Build statement ratings dictionary
-            statement_ratings = {}
-            for stmt in student.statements:
-                if stmt.graded_by is not None:
-                    area_ratings = {}
-                    if stmt.clarity_rating is not None:
-                        area_ratings['clarity'] = stmt.clarity_rating
-                    if stmt.relevance_rating is not None:
-                        area_ratings['relevance'] = stmt.relevance_rating
-                    if stmt.passion_rating is not None:
-                        area_ratings['passion'] = stmt.passion_rating
-                    if stmt.understanding_rating is not None:
-                        area_ratings['understanding'] = stmt.understanding_rating
-                    if stmt.goals_rating is not None:
-                        area_ratings['goals'] = stmt.goals_rating
-                    
-                    statement_ratings[stmt.area_of_law] = area_ratings
-
-            # Create a properly formatted student entry
+        for student in self._load_students(with_content=True):
+            student_id = str(student['id'])  # Use profile ID as the key
             students_dict[student_id] = {
                 'id': student_id,
-                'user_id': student.user.id,
-                'rankings': ranking_dict,
-                'grades': {'overall_grade': float(student.overall_grade or 0.0)},
-                'statements': statement_dict,
-                'statement_ratings': statement_ratings,
-                'preferences': {
-                    # These fields might not exist in the current model
-                    # We'll use empty lists as fallback
-                    'location': getattr(student, 'location_preferences', []) or [],
-                    'work_mode': [getattr(student, 'work_mode', '')] if hasattr(student, 'work_mode') and student.work_mode else []
-                }
+                'user_id': student['user_id'],
+                'rankings': student['rankings'],
+                'grades': {'overall_grade': float(student['overall_grade'] or 0.0)},
+                'statements': student['statements'],
+                'statement_ratings': self._statement_ratings(student['graded_statements']),
+                'preferences': student['preferences']
             }
 
         return students_dict
 
+    def _load_students(self, with_content: bool = False) -> List[Dict[str, Any]]:
+        """
+        Eligible students (status 'unmatched' or 'pending', with a user) as
+        plain records, from three flat column-only queries: profiles joined
+        to users, rankings, and statements. No ORM objects are built, so
+        there are no per-student lazy loads.
+
+        Args:
+            with_content: Load statement text; otherwise 'statements' maps
+                each area to whether its statement has any content
+
+        Returns:
+            list: per student, in profile ID order: 'id', 'user_id',
+            'overall_grade', 'rankings' (area -> rank), 'statements',
+            'graded_statements' (rows with the rating columns) and
+            'preferences'
+        """
+        eligible = StudentProfile.status.in_(['unmatched', 'pending'])
+        # Preference columns exist on some deployments' profile model only
+        preference_columns = [
+            getattr(StudentProfile, name)
+            for name in ('location_preferences', 'work_mode')
+            if hasattr(StudentProfile, name)
+        ]
+
+        profiles = db.session.query(
+            StudentProfile.id,
+            StudentProfile.user_id,
+            StudentProfile.overall_grade,
+            *preference_columns
+        ).join(User, User.id == StudentProfile.user_id).filter(
+            eligible
+        ).order_by(StudentProfile.id).all()
+
+        students = {}
+        for row in profiles:
+            students[row.id] = {
+                'id': row.id,
+                'user_id': row.user_id,
+                'overall_grade': row.overall_grade,
+                'rankings': {},
+                'statements': {},
+                'graded_statements': [],
+                'preferences': self._student_preferences(row)
+            }
+
+        rankings = db.session.query(
+            AreaRanking.student_profile_id,
+            AreaRanking.area_of_law,
+            AreaRanking.rank
+        ).join(StudentProfile, StudentProfile.id == AreaRanking.student_profile_id).filter(
+            eligible
+        ).order_by(AreaRanking.id)
+        for student_id, area, rank in rankings:
+            if student_id in students:
+                students[student_id]['rankings'][area] = float(rank)
+
+        content = Statement.content if with_content else func.length(Statement.content)
+        statements = db.session.query(
+            Statement.student_profile_id,
+            Statement.area_of_law,
+            content.label('content'),
+            Statement.graded_by,
+            Statement.clarity_rating,
+            Statement.relevance_rating,
+            Statement.passion_rating,
+            Statement.understanding_rating,
+            Statement.goals_rating
+        ).join(StudentProfile, StudentProfile.id == Statement.student_profile_id).filter(
+            eligible
+        ).order_by(Statement.id)
+        for stmt in statements:
+            student = students.get(stmt.student_profile_id)
+            if student is None:
+                continue
+            if with_content:
+                student['statements'][stmt.area_of_law] = stmt.content
+            else:
+                has_content = student['statements'].get(stmt.area_of_law, False)
+                student['statements'][stmt.area_of_law] = has_content or bool(stmt.content)
+            if stmt.graded_by is not None:
+                student['graded_statements'].append(stmt)
+
+        return list(students.values())
+
+    def _run_incremental_round(
+        self,
+        matcher: IncrementalMatcher,
+        problem: MatchingProblem,
+        snapshot: Optional[MatchingSnapshot]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[float]], List[str]]:
+        """
+        Repair the snapshot's matching for the current problem (or run a
+        full match if there is none) and save the new snapshot. A snapshot
+        that cannot be saved only makes the next run a full one.
+        """
+        if snapshot is None:
+            round_result, new_snapshot = matcher.match(problem)
+        else:
+            round_result, new_snapshot = matcher.rematch(snapshot, problem)
+        path = self._snapshot_path()
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            new_snapshot.save(path)
+        except OSError as e:
+            logger.warning(f"Could not save matching snapshot {path}: {str(e)}")
+        # Later rounds reuse the snapshot's scores
+        matcher.algorithm.use_scores(problem, new_snapshot.scores)
+        return round_result
+
+    def verify_matches(self) -> Dict[str, Any]:
+        """
+        Check the pending matches in the database, e.g. after a manual
+        edit: each organization's open positions (accepted matches already
+        fill theirs), duplicated students, and stability among eligible
+        students (see verify_matching).
+
+        Returns:
+            dict: the verify_matching report
+        """
+        try:
+            problem = self._get_matching_problem(include_full=True)
+            matches: Dict[str, List[str]] = defaultdict(list)
+            pending = Match.query.filter(
+                Match.status == 'pending',
+                Match.organization_profile_id.isnot(None)
+            ).all()
+            for match in pending:
+                matches[str(match.organization_profile_id)].append(str(match.student_profile_id))
+
+            algorithm = MatchingAlgorithm(
+                scoring='sparse', score_cache=self.matching_algorithm.score_cache
+            )
+            verification = verify_matching(
+                problem, matches, score_matrix(problem, *algorithm.scored_pairs(problem))
+            )
+            self._log_verification(verification)
+            return verification
+        except Exception as e:
+            logger.error(f"Error verifying matches: {str(e)}")
+            raise
+
+    def repair_rejection(self, match: Match, user_id: int) -> Dict[str, Any]:
+        """
+        Fill the seat of a rejected pending match with a vacancy chain (see
+        VacancyChain) instead of a full rerun: the rejected student moves on
+        to their next acceptable organization, and the freed seat goes to
+        whoever now prefers it, and so on. Students whose match changes get
+        a new pending match and their old one is marked 'superseded', all
+        in one transaction.
+
+        The chain runs on the last incremental run's snapshot when it has
+        scores (see _repair_pairs), so a rejection costs a few column-only
+        queries instead of loading and scoring the whole cohort.
+
+        Faculty positions are not part of the matching problem, so a match
+        without an organization has nothing to repair.
+
+        Args:
+            match: the match that was just rejected
+            user_id: user recorded on the superseded matches' history
+
+        Returns:
+            dict: 'moves' ({'student_id', 'from', 'to'} per student whose
+            match changed, None for unmatched), 'created' and 'superseded'
+            match IDs, and 'steps' of the chain
+        """
+        repair = {'moves': [], 'created': [], 'superseded': [], 'steps': 0}
+        if match.organization_profile_id is None:
+            return repair
+        try:
+            problem, pairs, capacities = self._repair_pairs(match)
+            student_index = {sid: i for i, sid in enumerate(problem.student_ids)}
+            org_index = {oid: j for j, oid in enumerate(problem.org_ids)}
+            student = student_index.get(str(match.student_profile_id))
+            org = org_index.get(str(match.organization_profile_id))
+            if student is None or org is None or capacities[org] == 0:
+                # The student is no longer eligible or the org has no open positions
+                return repair
+
+            chain = VacancyChain(*pairs, capacities, problem.n_students)
+
+            # Pending matches as (id, student, org) rows; only the ones the
+            # chain supersedes are loaded as Match objects
+            pending = Match.query.filter(
+                Match.status == 'pending',
+                Match.organization_profile_id.isnot(None)
+            ).with_entities(Match.id, Match.student_profile_id, Match.organization_profile_id).all()
+            pending_by_student = {}
+            pending_orgs = {}
+            for match_id, sid, oid in pending:
+                i = student_index.get(str(sid))
+                j = org_index.get(str(oid))
+                if i is not None and j is not None and capacities[j] > 0:
+                    pending_by_student[i] = match_id
+                    pending_orgs[i] = j
+            chain.seat(list(pending_orgs), list(pending_orgs.values()))
+
+            # Nobody goes back to an organization that rejected them
+            rejected = Match.query.filter(
+                Match.status == 'rejected',
+                Match.organization_profile_id.isnot(None)
+            ).with_entities(Match.student_profile_id, Match.organization_profile_id).all()
+            forbidden = [
+                (student_index[str(sid)], org_index[str(oid)])
+                for sid, oid in rejected
+                if str(sid) in student_index and str(oid) in org_index
+            ]
+            chain.forbid([i for i, _ in forbidden], [j for _, j in forbidden])
+
+            moves = chain.repair([student], [org])
+
+            superseded_ids = [
+                pending_by_student[i] for i, (old, _) in moves.items()
+                if old >= 0 and i in pending_by_student
+            ]
+            previous_matches = {}
+            if superseded_ids:
+                previous_matches = {
+                    previous.id: previous
+                    for previous in Match.query.filter(Match.id.in_(superseded_ids))
+                }
+
+            new_matches = []
+            for i, (old, new) in moves.items():
+                previous = previous_matches.get(pending_by_student.get(i))
+                if previous is not None and old >= 0:
+                    previous.status = 'superseded'
+                    previous.modified_by = user_id
+                    db.session.add(MatchHistory(
+                        match_id=previous.id,
+                        action='superseded',
+                        old_status='pending',
+                        new_status='superseded',
+                        performed_by=user_id,
+                        notes=f"Vacancy chain after match {match.id} was rejected"
+                    ))
+                    repair['superseded'].append(previous.id)
+                if new >= 0:
+                    new_matches.append((i, new))
+                repair['moves'].append({
+                    'student_id': problem.student_ids[i],
+                    'from': problem.org_ids[old] if old >= 0 else None,
+                    'to': problem.org_ids[new] if new >= 0 else None
+                })
+
+            if new_matches:
+                rows = np.array([i for i, _ in new_matches], dtype=np.int64)
+                cols = np.array([j for _, j in new_matches], dtype=np.int64)
+                totals, components = self.matching_algorithm.score_pairs(problem, rows, cols)
+                created = []
+                for k, (i, j) in enumerate(new_matches):
+                    new_match = Match(
+                        student_profile_id=int(problem.student_ids[i]),
+                        organization_profile_id=int(problem.org_ids[j]),
+                        status='pending',
+                        match_type='algorithmic',
+                        score=float(totals[k]),
+                        round_number=match.round_number,
+                        ranking_score=float(components['ranking'][k]),
+                        grades_score=float(components['grades'][k]),
+                        statement_score=float(components['statement'][k]),
+                        location_score=float(components['location'][k]),
+                        work_mode_score=float(components['work_mode'][k])
+                    )
+                    db.session.add(new_match)
+                    created.append(new_match)
+                db.session.flush()
+                repair['created'] = [new_match.id for new_match in created]
+
+            db.session.commit()
+            repair['steps'] = chain.steps
+            logger.info(
+                f"Vacancy chain after rejecting match {match.id} moved "
+                f"{len(moves)} students in {chain.steps} steps"
+            )
+            return repair
+        except Exception as e:
+            logger.error(f"Error repairing rejected match: {str(e)}")
+            db.session.rollback()
+            raise
+
+    def _repair_pairs(
+        self,
+        match: Match
+    ) -> Tuple[MatchingProblem, Tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+        """
+        The problem, scored pairs and current capacities a vacancy chain
+        repairs over.
+
+        The last incremental run's snapshot is reused when it has scores,
+        its weights (if recorded) are the algorithm's, and it includes the
+        match's student and organization. Only capacities and student
+        eligibility are refreshed, from two column-only queries; students
+        and organizations added since the snapshot are left to the next
+        run. Otherwise the full problem is loaded and scored.
+
+        Returns:
+            tuple: (problem, (rows, cols, values), capacities)
+        """
+        snapshot = self._load_snapshot()
+        if (
+            snapshot is None
+            or snapshot.scores is None
+            or (snapshot.weights is not None and snapshot.weights != self.matching_algorithm.weights)
+            or str(match.student_profile_id) not in snapshot.problem.student_ids
+            or str(match.organization_profile_id) not in snapshot.problem.org_ids
+        ):
+            problem = self._get_matching_problem()
+            if self.matching_algorithm.score_cache is None:
+                self.matching_algorithm.score_cache = self._default_score_cache()
+            return problem, self.matching_algorithm.scored_pairs(problem), problem.capacities
+
+        problem = snapshot.problem
+        org_index = {oid: j for j, oid in enumerate(problem.org_ids)}
+        capacities = np.zeros(problem.n_organizations, dtype=np.int64)
+        positions = db.session.query(
+            OrganizationProfile.id,
+            OrganizationProfile.available_positions,
+            OrganizationProfile.filled_positions
+        )
+        for org_id, available, filled in positions:
+            j = org_index.get(str(org_id))
+            if j is not None:
+                capacities[j] = max(available - filled, 0)
+
+        # Eligible as in _load_students
+        eligible = {
+            str(student_id) for student_id, in db.session.query(StudentProfile.id).join(
+                User, User.id == StudentProfile.user_id
+            ).filter(StudentProfile.status.in_(['unmatched', 'pending']))
+        }
+        eligible_rows = np.array(
+            [sid in eligible for sid in problem.student_ids], dtype=bool
+        )
+
+        # Row-major, like scored_pairs; organizations that filled up since
+        # drop out, as they would from a freshly loaded problem
+        rows, cols = np.nonzero(snapshot.scores)
+        keep = eligible_rows[rows] & (capacities[cols] > 0)
+        rows, cols = rows[keep], cols[keep]
+        return problem, (rows, cols, snapshot.scores[rows, cols]), capacities
+
+    def sweep_weights(
+        self,
+        weight_vectors: List[WeightVector],
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare matchings of the current students and open positions under
+        several score weight vectors (see WeightSweep). Nothing is written
+        to the database.
+
+        Args:
+            weight_vectors: dicts of component weights, or sequences in
+                (ranking, grades, statement, location, work_mode) order
+            workers: Optional number of processes matching vectors in parallel
+
+        Returns:
+            dict: 'students', 'positions' and per vector a summary under
+            'results' (match_rate, mean_rank, total_score, ...)
+        """
+        try:
+            if self.matching_algorithm.score_cache is None:
+                self.matching_algorithm.score_cache = self._default_score_cache()
+            problem = self._get_matching_problem()
+            sweep = WeightSweep(
+                problem, score_cache=self.matching_algorithm.score_cache, workers=workers
+            )
+            return {
+                'students': problem.n_students,
+                'positions': int(problem.capacities.sum()),
+                'results': sweep.run(weight_vectors)
+            }
+        except Exception as e:
+            logger.error(f"Error sweeping matching weights: {str(e)}")
+            raise
+
+    @staticmethod
+    def _log_verification(verification: Dict[str, Any]) -> None:
+        if not verification['valid']:
+            logger.warning(
+                f"Matching has {len(verification['errors'])} errors: "
+                f"{verification['errors'][:5]}"
+            )
+        if not verification['stable']:
+            logger.warning(
+                f"Matching has {verification['blocking_pair_count']} blocking pairs"
+            )
+
+    @staticmethod
+    def _default_score_cache() -> Optional[ScoreCache]:
+        """
+        The process-wide cache for the SCORE_CACHE_DIR config directory (a
+        relative one is under the app's instance folder), or None if the
+        directory is not set or cannot be created.
+        """
+        directory = current_app.config.get('SCORE_CACHE_DIR')
+        if not directory:
+            return None
+        directory = os.path.join(current_app.instance_path, directory)
+        if directory not in _score_caches:
+            try:
+                _score_caches[directory] = ScoreCache(
+                    directory, current_app.config.get('SCORE_CACHE_MAX_BYTES', 1 << 30)
+                )
+            except OSError as e:
+                logger.warning(f"Scoring without a cache, cannot use {directory}: {str(e)}")
+                return None
+        return _score_caches[directory]
+
+    def _snapshot_path(self) -> str:
+        """
+        snapshot_path, or the MATCHING_SNAPSHOT_PATH config value (a
+        relative one is under the app's instance folder).
+        """
+        if self.snapshot_path:
+            return self.snapshot_path
+        return os.path.join(current_app.instance_path, current_app.config['MATCHING_SNAPSHOT_PATH'])
+
+    def _load_snapshot(self) -> Optional[MatchingSnapshot]:
+        """The previous incremental run's snapshot, or None if unavailable."""
+        path = self._snapshot_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            return MatchingSnapshot.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable matching snapshot {path}: {str(e)}")
+            return None
+
+    def _get_matching_problem(
+        self,
+        previous: Optional[MatchingProblem] = None,
+        include_full: bool = False
+    ) -> MatchingProblem:
+        """
+        Load open organizations and eligible students straight into a compact
+        MatchingProblem. Equivalent to MatchingProblem.from_dicts over the
+        dictionary loaders, without keeping statement text.
+
+        Args:
+            previous: Optional earlier problem whose interned areas, locations
+                and work modes keep their IDs
+            include_full: Keep organizations with no open positions, with a
+                capacity of 0, e.g. so pending matches there still count as
+                over capacity
+
+        Returns:
+            MatchingProblem: encoded matching input
+        """
+        if previous is not None:
+            builder = MatchingProblemBuilder(
+                previous.areas, previous.locations, previous.work_modes
+            )
+        else:
+            builder = MatchingProblemBuilder()
+
+        for org in self._load_organizations():
+            # Accepted matches fill positions, and their students are not
+            # eligible, so only the open positions are matched
+            positions = max(org['available_positions'] - org['filled_positions'], 0)
+            if positions == 0 and not include_full:
+                continue
+            builder.add_organization(
+                str(org['id']),
+                org['area_of_law'],
+                org['location'],
+                org['work_mode'],
+                positions,
+                org['minimum_grade'],
+                org['minimum_grade_mandatory']
+            )
+
+        for student in self._load_students():
+            preferences = student['preferences']
+            builder.add_student(
+                str(student['id']),
+                student['rankings'],
+                float(student['overall_grade'] or 0.0),
+                [area for area, has_content in student['statements'].items() if has_content],
+                self._statement_ratings(student['graded_statements']),
+                preferences['location'],
+                preferences['work_mode']
+            )
+
+        return builder.build()
+
+    @staticmethod
+    def _statement_ratings(statements) -> Dict[str, Dict[str, int]]:
+        """
+        Build the statement ratings dictionary from a student's statements
+        (models or rows with the rating columns): per graded statement's
+        area, the ratings that have been given.
+        """
+        statement_ratings = {}
+        for stmt in statements:
+            if stmt.graded_by is not None:
+                area_ratings = {}
+                if stmt.clarity_rating is not None:
+                    area_ratings['clarity'] = stmt.clarity_rating
+                if stmt.relevance_rating is not None:
+                    area_ratings['relevance'] = stmt.relevance_rating
+                if stmt.passion_rating is not None:
+                    area_ratings['passion'] = stmt.passion_rating
+                if stmt.understanding_rating is not None:
+                    area_ratings['understanding'] = stmt.understanding_rating
+                if stmt.goals_rating is not None:
+                    area_ratings['goals'] = stmt.goals_rating
+
+                statement_ratings[stmt.area_of_law] = area_ratings
+        return statement_ratings
+
+    @staticmethod
+    def _student_preferences(student) -> Dict[str, List[str]]:
+        """Location and work-mode preferences for a student (model or row)."""
+        return {
+            # These fields might not exist in the current model
+            # We'll use empty lists as fallback
+            'location': getattr(student, 'location_preferences', []) or [],
+            'work_mode': [getattr(student, 'work_mode', '')] if hasattr(student, 'work_mode') and student.work_mode else []
+        }
+
     def _get_organizations_for_matching(self) -> Dict[str, Dict]:
         """
         Load organizations from the database and convert to dictionary format.
@@ -184,53 +807,120 @@ class MatchingService:
         Returns:
             dict: Organization data keyed by organization ID
         """
-        orgs = OrganizationProfile.query.all()
         orgs_dict = {}
         
-        for org in orgs:
+        for org in self._load_organizations():
             # Skip if no positions available
-            if org.available_positions <= org.filled_positions:
+            if org['available_positions'] <= org['filled_positions']:
                 continue
                 
-            org_id = str(org.id)  # Use profile ID as the key
-
-            # Find minimum grade requirement if any
-            min_grade = 0.0  # Default minimum grade
-            if hasattr(org, 'requirements'):
-                for req in org.requirements:
-                    if req.requirement_type == 'minimum_grade':
-                        try:
-                            min_grade = float(req.value)
-                        except (ValueError, TypeError):
-                            # Keep default if conversion fails
-                            pass
+            org_id = str(org['id'])  # Use profile ID as the key
 
             # Create organization entry
             orgs_dict[org_id] = {
                 'id': org_id,
-                'user_id': org.user_id,
-                'name': org.name,
-                'area_of_law': org.area_of_law,
-                'location': org.location,
-                'work_mode': org.work_mode,
-                'available_positions': org.available_positions - org.filled_positions,  # Available positions remaining
-                'minimum_grade': min_grade
+                'user_id': org['user_id'],
+                'name': org['name'],
+                'area_of_law': org['area_of_law'],
+                'location': org['location'],
+                'work_mode': org['work_mode'],
+                'available_positions': org['available_positions'] - org['filled_positions'],  # Available positions remaining
+                'minimum_grade': org['minimum_grade'],
+                'minimum_grade_mandatory': org['minimum_grade_mandatory']
             }
 
         return orgs_dict
 
+    def _load_organizations(self) -> List[Dict[str, Any]]:
+        """
+        Every organization as a plain record with its minimum grade
+        requirement, from two column-only queries (profiles, minimum grade
+        requirements) instead of a requirements lazy load per organization.
+
+        Returns:
+            list: per organization, in profile ID order, its profile columns
+            plus 'minimum_grade' and 'minimum_grade_mandatory'
+        """
+        requirements = defaultdict(list)
+        rows = db.session.query(
+            OrganizationRequirement.organization_profile_id,
+            OrganizationRequirement.requirement_type,
+            OrganizationRequirement.value,
+            OrganizationRequirement.is_mandatory
+        ).filter(
+            OrganizationRequirement.requirement_type == 'minimum_grade'
+        ).order_by(OrganizationRequirement.id)
+        for req in rows:
+            requirements[req.organization_profile_id].append(req)
+
+        profiles = db.session.query(
+            OrganizationProfile.id,
+            OrganizationProfile.user_id,
+            OrganizationProfile.name,
+            OrganizationProfile.area_of_law,
+            OrganizationProfile.location,
+            OrganizationProfile.work_mode,
+            OrganizationProfile.available_positions,
+            OrganizationProfile.filled_positions
+        ).order_by(OrganizationProfile.id)
+
+        organizations = []
+        for row in profiles:
+            org = row._asdict()
+            min_grade, mandatory = self._minimum_grade_requirement(requirements.get(row.id, []))
+            org['minimum_grade'] = min_grade
+            org['minimum_grade_mandatory'] = mandatory
+            organizations.append(org)
+        return organizations
+
+    @staticmethod
+    def _minimum_grade_requirement(requirements) -> Tuple[float, bool]:
+        """
+        Minimum grade requirement among an organization's requirements
+        (models or rows).
+
+        Returns:
+            tuple: (minimum_grade, is_mandatory), (0.0, False) if none
+        """
+        min_grade = 0.0  # Default minimum grade
+        mandatory = False
+        for req in requirements:
+            if req.requirement_type == 'minimum_grade':
+                try:
+                    min_grade = float(req.value)
+                    mandatory = bool(req.is_mandatory)
+                except (ValueError, TypeError):
+                    # Keep default if conversion fails
+                    pass
+        return min_grade, mandatory
+
     def _save_matches_to_database(self, 
                                   final_matches: Dict[str, List[str]], 
                                   round_results: List[Dict], 
-                                  round_number: int) -> None:
+                                  round_number: int,
+                                  profiler: Optional[MatchingProfiler] = None,
+                                  problem: Optional[MatchingProblem] = None,
+                                  algorithm: Optional[MatchingAlgorithm] = None) -> MatchingRound:
         """
         Save matching results to the database.
+
+        Existing (student, organization) pairs are read in one query, the
+        component scores of the new pairs are computed in one vectorized
+        call on the run's problem, and the new Match rows are inserted with
+        executemany, committing every MATCH_INSERT_CHUNK rows.
         
         Args:
             final_matches: Dictionary of matches {org_id: [student_id, ...]}
             round_results: List of match details with round numbers
             round_number: The round number to use for this batch
+            profiler: Optional profiler counting db_rows_written
+            problem: the problem that was matched (loaded again if not given)
+            algorithm: the algorithm that scored it (defaults to this service's)
+
+        Returns:
+            MatchingRound: the round record the matches were saved under
         """
+        profiler = profiler or MatchingProfiler(enabled=False)
         try:
             # Create a MatchingRound record
             matching_round = MatchingRound.query.filter_by(round_number=round_number).first()
@@ -260,6 +950,7 @@ class MatchingService:
                     started_by=user_id
                 )
                 db.session.add(matching_round)
+                profiler.count('db_rows_written')
                 db.session.commit()
             
             # Create a round_info dictionary to track which round each match was made in
@@ -269,47 +960,59 @@ class MatchingService:
                 org_id = result['org_id']
                 match_round = result['round']
                 round_info[(student_id, org_id)] = match_round
-            
-            # Create Match objects for each student-organization pair
+
+            # Pairs that already have a Match, in one query
+            existing = {
+                (student_id, org_id)
+                for student_id, org_id in db.session.query(
+                    Match.student_profile_id, Match.organization_profile_id
+                ).filter(Match.organization_profile_id.isnot(None))
+            }
+
+            if problem is None:
+                problem = self._get_matching_problem()
+            algorithm = algorithm or self.matching_algorithm
+            student_index = {sid: i for i, sid in enumerate(problem.student_ids)}
+            org_index = {oid: j for j, oid in enumerate(problem.org_ids)}
+
+            # New pairs of eligible students and open organizations
+            new_pairs = []
             for org_id, student_ids in final_matches.items():
+                if org_id not in org_index:
+                    continue
                 for student_id in student_ids:
-                    # Check if this match already exists
-                    existing_match = Match.query.filter_by(
-                        student_profile_id=int(student_id),
-                        organization_profile_id=int(org_id)
-                    ).first()
-                    
-                    if not existing_match:
-                        # Create component scores
-                        students = self._get_students_for_matching()
-                        organizations = self._get_organizations_for_matching()
-                        
-                        student = students.get(student_id)
-                        organization = organizations.get(org_id)
-                        
-                        if student and organization:
-                            total_score, component_scores = self.matching_algorithm.calculate_match_scores(
-                                student, organization
-                            )
-                            
-                            # Get the round this match was made in
-                            match_round = round_info.get((student_id, org_id), 1)
-                            
-                            # Create the match record
-                            match = Match(
-                                student_profile_id=int(student_id),
-                                organization_profile_id=int(org_id),
-                                status='pending',
-                                match_type='algorithmic',
-                                score=total_score,
-                                round_number=match_round,
-                                ranking_score=component_scores.get('ranking', 0),
-                                grades_score=component_scores.get('grades', 0),
-                                statement_score=component_scores.get('statement', 0),
-                                location_score=component_scores.get('location', 0),
-                                work_mode_score=component_scores.get('work_mode', 0)
-                            )
-                            db.session.add(match)
+                    if student_id not in student_index:
+                        continue
+                    if (int(student_id), int(org_id)) not in existing:
+                        new_pairs.append((student_id, org_id))
+
+            rows = np.array([student_index[sid] for sid, _ in new_pairs], dtype=np.int64)
+            cols = np.array([org_index[oid] for _, oid in new_pairs], dtype=np.int64)
+            totals, components = algorithm.score_pairs(problem, rows, cols)
+
+            records = []
+            for k, (student_id, org_id) in enumerate(new_pairs):
+                records.append({
+                    'student_profile_id': int(student_id),
+                    'organization_profile_id': int(org_id),
+                    'status': 'pending',
+                    'match_type': 'algorithmic',
+                    'score': float(totals[k]),
+                    # Get the round this match was made in
+                    'round_number': round_info.get((student_id, org_id), 1),
+                    'ranking_score': float(components['ranking'][k]),
+                    'grades_score': float(components['grades'][k]),
+                    'statement_score': float(components['statement'][k]),
+                    'location_score': float(components['location'][k]),
+                    'work_mode_score': float(components['work_mode'][k])
+                })
+
+            # Large results are committed in chunks to bound transaction size
+            for start in range(0, len(records), MATCH_INSERT_CHUNK):
+                chunk = records[start:start + MATCH_INSERT_CHUNK]
+                db.session.execute(insert(Match), chunk)
+                db.session.commit()
+                profiler.count('db_rows_written', len(chunk))
             
             # Update the matching round status
             matching_round.status = 'completed'
@@ -321,6 +1024,7 @@ class MatchingService:
             db.session.commit()
             
             logger.info(f"Saved {matching_round.matched_students} matches to database in round {round_number}")
+            return matching_round
             
         except Exception as e:
             db.session.rollback()
@@ -0,0 +1,170 @@
+"""
+Persisted state of a matching run: the encoded problem, the score matrix
+and the resulting assignment, saved as a single .npz file so a later run
+can start from it instead of from scratch.
+
+Without a score matrix, and with the score weights and engine recorded,
+a snapshot is a compact bundle of a run's inputs and result that can be
+replayed offline (see matching_replay.py).
+
+Usage Flow:
+    snapshot = MatchingSnapshot(problem, scores, assignment, proposals)
+    snapshot.save('matching_snapshot.npz')
+    snapshot = MatchingSnapshot.load('matching_snapshot.npz')
+
+    bundle = MatchingSnapshot.from_matches(problem, matches, weights=algorithm.weights)
+    bundle.save('run.npz', compress=True)
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+
+import numpy as np
+
+from gem_app.utils.matching_problem import MatchingProblem
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the file layout changes; older files are rejected on load
+SNAPSHOT_VERSION = 2
+# Versions load can read (version 1 always has scores, never weights)
+SUPPORTED_VERSIONS = (1, 2)
+
+class MatchingSnapshot:
+    """
+    Matching state kept between runs.
+
+    Attributes:
+        problem: encoded students and organizations of the run
+        scores: (n_students, n_organizations) score of every pair a student
+            may propose to when the org has capacity (positive and meeting
+            mandatory requirements), 0 elsewhere; None in replay bundles
+        assignment: per student, matched org index or -1
+        full_run_proposals: proposals made by the last full run
+        weights: score component weights of the run, if recorded
+        engine: matching engine of the run, if recorded
+    """
+
+    def __init__(
+        self,
+        problem: MatchingProblem,
+        scores: Optional[np.ndarray],
+        assignment: np.ndarray,
+        full_run_proposals: int = 0,
+        weights: Optional[Dict[str, float]] = None,
+        engine: Optional[str] = None
+    ):
+        self.problem = problem
+        self.scores = scores
+        self.assignment = np.asarray(assignment, dtype=np.int32)
+        self.full_run_proposals = int(full_run_proposals)
+        self.weights = dict(weights) if weights is not None else None
+        self.engine = engine
+
+    @classmethod
+    def from_matches(
+        cls,
+        problem: MatchingProblem,
+        matches: Dict[str, List[str]],
+        weights: Optional[Dict[str, float]] = None,
+        engine: Optional[str] = None
+    ) -> 'MatchingSnapshot':
+        """
+        A snapshot without scores of {org_id: [student_id, ...]} matches;
+        IDs not in problem are left out.
+        """
+        student_index = {sid: i for i, sid in enumerate(problem.student_ids)}
+        org_index = {oid: j for j, oid in enumerate(problem.org_ids)}
+        assignment = np.full(problem.n_students, -1, dtype=np.int32)
+        for oid, sids in matches.items():
+            if oid not in org_index:
+                continue
+            for sid in sids:
+                if sid in student_index:
+                    assignment[student_index[sid]] = org_index[oid]
+        return cls(problem, None, assignment, weights=weights, engine=engine)
+
+    def matches(self) -> Dict[str, list]:
+        """Current matches as {org_id: [student_id, ...]}."""
+        result: Dict[str, list] = {}
+        for sid, org in zip(self.problem.student_ids, self.assignment.tolist()):
+            if org >= 0:
+                result.setdefault(self.problem.org_ids[org], []).append(sid)
+        return result
+
+    def save(self, path: str, compress: bool = False) -> None:
+        """
+        Write the snapshot to path, replacing any existing file atomically.
+
+        Args:
+            compress: zip-deflate the arrays (smaller bundles, slower saves)
+        """
+        problem = self.problem
+        arrays: Dict[str, Any] = {
+            f'column_{name}': values for name, values in problem.columns().items()
+        }
+        if self.scores is not None:
+            arrays['scores'] = self.scores
+        metadata = {
+            'version': SNAPSHOT_VERSION,
+            'student_ids': problem.student_ids,
+            'org_ids': problem.org_ids,
+            'areas': problem.areas,
+            'locations': problem.locations,
+            'work_modes': problem.work_modes,
+            'full_run_proposals': self.full_run_proposals,
+            'weights': self.weights,
+            'engine': self.engine
+        }
+
+        tmp_path = f"{path}.tmp"
+        savez = np.savez_compressed if compress else np.savez
+        with open(tmp_path, 'wb') as f:
+            savez(
+                f,
+                metadata=np.array(json.dumps(metadata)),
+                assignment=self.assignment,
+                **arrays
+            )
+        os.replace(tmp_path, path)
+        logger.info(
+            f"Saved matching snapshot ({problem.n_students} students x "
+            f"{problem.n_organizations} organizations) to {path}"
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'MatchingSnapshot':
+        """
+        Read a snapshot written by save.
+
+        Raises:
+            ValueError: if the file was written by an incompatible version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data['metadata']))
+            if metadata.get('version') not in SUPPORTED_VERSIONS:
+                raise ValueError(
+                    f"Unsupported matching snapshot version: {metadata.get('version')}"
+                )
+            columns = {
+                key[len('column_'):]: data[key]
+                for key in data.files if key.startswith('column_')
+            }
+            problem = MatchingProblem(
+                metadata['student_ids'],
+                metadata['org_ids'],
+                metadata['areas'],
+                metadata['locations'],
+                metadata['work_modes'],
+                columns
+            )
+            return cls(
+                problem,
+                data['scores'] if 'scores' in data.files else None,
+                data['assignment'],
+                metadata['full_run_proposals'],
+                metadata.get('weights'),
+                metadata.get('engine')
+            )
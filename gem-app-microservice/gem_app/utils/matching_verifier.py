@@ -0,0 +1,212 @@
+"""
+Vectorized checks of a matching against an encoded problem: capacities,
+duplicated or unknown IDs, infeasible pairs, and stability.
+
+A feasible pair (student, organization) blocks a matching when the student
+would rather have the organization than their match (a higher score, or
+the same score at a lower organization index, which is the order
+preference lists use; any feasible organization if unmatched) and the
+organization has a free position or holds a student with a lower score.
+Deferred acceptance results have no blocking pairs; manual edits and the
+optimal engine may introduce some.
+
+Scores come as a dense (n_students, n_organizations) matrix with 0 for
+infeasible pairs, as in MatchingSnapshot.scores. Blocking pairs are found
+a block of students at a time, in O(n*m) NumPy operations.
+
+Usage Flow:
+    scores = score_matrix(problem, *algorithm.scored_pairs(problem))
+    report = verify_matching(problem, matches, scores)
+    report['valid'], report['stable'], report['errors']
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gem_app.utils.matching_problem import MatchingProblem
+
+def score_matrix(
+    problem: MatchingProblem,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    values: np.ndarray
+) -> np.ndarray:
+    """Dense score matrix from scored pairs, 0 for every other pair."""
+    scores = np.zeros((problem.n_students, problem.n_organizations))
+    scores[rows, cols] = values
+    return scores
+
+def match_arrays(
+    problem: MatchingProblem,
+    matches: Dict[str, List[str]]
+) -> Tuple[np.ndarray, np.ndarray, List[str], List[Tuple[str, str]]]:
+    """
+    Encode {org_id: [student_id, ...]} matches as index arrays.
+
+    Returns:
+        tuple: (students, orgs, unknown_organizations, unknown_pairs) where
+        students / orgs hold the indexes of each known match and
+        unknown_pairs lists (student_id, org_id) entries with an unknown
+        student
+    """
+    student_index = {sid: i for i, sid in enumerate(problem.student_ids)}
+    org_index = {oid: j for j, oid in enumerate(problem.org_ids)}
+
+    students: List[int] = []
+    orgs: List[int] = []
+    unknown_organizations: List[str] = []
+    unknown_pairs: List[Tuple[str, str]] = []
+    for oid, sids in matches.items():
+        org = org_index.get(oid)
+        if org is None:
+            unknown_organizations.append(oid)
+            continue
+        for sid in sids:
+            student = student_index.get(sid)
+            if student is None:
+                unknown_pairs.append((sid, oid))
+                continue
+            students.append(student)
+            orgs.append(org)
+
+    return (
+        np.array(students, dtype=np.int64),
+        np.array(orgs, dtype=np.int64),
+        unknown_organizations,
+        unknown_pairs
+    )
+
+def blocking_pairs(
+    scores: np.ndarray,
+    assignment: np.ndarray,
+    capacities: np.ndarray,
+    block_rows: int = 4096
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every blocking pair of a matching (see module docstring).
+
+    Args:
+        scores: (n_students, n_organizations) scores, 0 where infeasible
+        assignment: per student, org index or -1
+        capacities: per org, number of positions
+        block_rows: students compared per NumPy block, to bound memory
+
+    Returns:
+        tuple: (student_indexes, org_indexes) of the blocking pairs
+    """
+    n_students, n_orgs = scores.shape
+    matched = np.flatnonzero(assignment >= 0)
+    current = np.full(n_students, -np.inf)
+    current[matched] = scores[matched, assignment[matched]]
+
+    # Score a student needs for each org to want them: -inf with a free
+    # position, else the lowest score it holds
+    counts = np.bincount(assignment[matched], minlength=n_orgs)
+    lowest = np.full(n_orgs, np.inf)
+    np.minimum.at(lowest, assignment[matched], current[matched])
+    threshold = np.where(counts < capacities, -np.inf, lowest)
+
+    org_order = np.arange(n_orgs)
+    found_rows = []
+    found_cols = []
+    for start in range(0, n_students, block_rows):
+        stop = min(start + block_rows, n_students)
+        block = scores[start:stop]
+        block_current = current[start:stop, None]
+        prefers = (block > block_current) | (
+            (block == block_current) & (org_order[None, :] < assignment[start:stop, None])
+        )
+        blocking = (block > 0) & prefers & (block > threshold[None, :])
+        rows, cols = np.nonzero(blocking)
+        found_rows.append(rows + start)
+        found_cols.append(cols)
+
+    if not found_rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(found_rows), np.concatenate(found_cols)
+
+def verify_matching(
+    problem: MatchingProblem,
+    matches: Dict[str, List[str]],
+    scores: np.ndarray,
+    capacities: Optional[np.ndarray] = None,
+    max_reported: int = 100
+) -> Dict[str, Any]:
+    """
+    Check a matching for capacity, duplicate, unknown-ID, feasibility and
+    stability problems.
+
+    Args:
+        problem: Encoded students and organizations
+        matches: Dictionary of matches {org_id: [student_id, ...]}
+        scores: (n_students, n_organizations) scores, 0 where infeasible
+        capacities: positions per org, if not problem.capacities
+        max_reported: most blocking and infeasible pairs listed (all are counted)
+
+    Returns:
+        dict: 'valid' (no capacity, duplicate, unknown-ID or infeasible
+        problems), 'stable' (no blocking pairs), 'errors' (messages) and
+        the offending IDs under 'over_capacity', 'duplicates',
+        'unknown_students', 'unknown_organizations', 'infeasible_matches'
+        and 'blocking_pairs' (with 'blocking_pair_count')
+    """
+    if capacities is None:
+        capacities = problem.capacities
+    capacities = np.asarray(capacities, dtype=np.int64)
+    students, orgs, unknown_orgs, unknown_pairs = match_arrays(problem, matches)
+    # A student matched more than once keeps the last match listed
+    assignment = np.full(problem.n_students, -1, dtype=np.int64)
+    assignment[students] = orgs
+    errors = []
+
+    # 1) Capacities
+    counts = np.bincount(orgs, minlength=problem.n_organizations)
+    over = np.flatnonzero(counts > capacities)
+    over_capacity = {problem.org_ids[j]: int(counts[j]) for j in over.tolist()}
+    for j in over.tolist():
+        errors.append(
+            f"Organization {problem.org_ids[j]} matched with {counts[j]} students "
+            f"but capacity is {capacities[j]}."
+        )
+
+    # 2) Unknown and duplicated IDs
+    for oid in unknown_orgs:
+        errors.append(f"Unknown organization ID: {oid}")
+    for sid, oid in unknown_pairs:
+        errors.append(f"Unknown student ID: {sid} in matches for organization {oid}")
+    times_matched = np.bincount(students, minlength=problem.n_students)
+    duplicates = [problem.student_ids[i] for i in np.flatnonzero(times_matched > 1).tolist()]
+    for sid in duplicates:
+        errors.append(f"Student {sid} matched multiple times.")
+
+    # 3) Matched pairs that were never feasible
+    matched = np.flatnonzero(assignment >= 0)
+    infeasible = matched[scores[matched, assignment[matched]] <= 0]
+    for i in infeasible[:max_reported].tolist():
+        errors.append(
+            f"Student {problem.student_ids[i]} matched with organization "
+            f"{problem.org_ids[assignment[i]]} without a feasible score."
+        )
+
+    # 4) Stability
+    rows, cols = blocking_pairs(scores, assignment, capacities)
+
+    return {
+        'valid': not errors,
+        'stable': len(rows) == 0,
+        'errors': errors,
+        'over_capacity': over_capacity,
+        'duplicates': duplicates,
+        'unknown_students': [sid for sid, _ in unknown_pairs],
+        'unknown_organizations': unknown_orgs,
+        'infeasible_matches': [
+            (problem.student_ids[i], problem.org_ids[assignment[i]])
+            for i in infeasible[:max_reported].tolist()
+        ],
+        'blocking_pair_count': int(len(rows)),
+        'blocking_pairs': [
+            (problem.student_ids[i], problem.org_ids[j])
+            for i, j in zip(rows[:max_reported].tolist(), cols[:max_reported].tolist())
+        ]
+    }
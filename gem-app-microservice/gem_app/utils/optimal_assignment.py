@@ -0,0 +1,200 @@
+"""
+Maximum-welfare assignment of students to organizations: the matching that
+maximizes the total match score subject to organization capacities, as an
+alternative to deferred acceptance (which is stable but not welfare-optimal).
+
+Each organization is expanded into one slot per position, capped at the
+number of students it could take, and the students x slots benefit matrix
+is solved as a rectangular linear assignment problem. Pairs that are not
+on a student's preference list have benefit 0, which is the same as
+leaving the slot or student unassigned.
+
+SciPy's linear_sum_assignment is used when SciPy is installed; otherwise a
+NumPy shortest-augmenting-path solver (the same Jonker-Volgenant variant)
+is used.
+
+Usage Flow:
+    solver = OptimalAssignment(preferences, scores, capacities)
+    solver.run()
+    matches = solver.matches()   # {org_index: [student_index, ...]}
+"""
+
+from typing import Dict, List, Tuple
+import logging
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+logger = logging.getLogger(__name__)
+
+class OptimalAssignment:
+    """
+    Maximum total score assignment over index-based preference lists.
+
+    Attributes:
+        assignment: per student, assigned org index or -1
+        total_score: sum of the scores of the assigned pairs
+    """
+
+    def __init__(
+        self,
+        preferences: List[List[int]],
+        scores: List[List[float]],
+        capacities: List[int]
+    ):
+        """
+        Args:
+            preferences: per student, org indexes in descending preference order
+            scores: per student, the score for each entry of preferences
+            capacities: per org, number of positions available
+        """
+        self.preferences = preferences
+        self.scores = scores
+        self.capacities = capacities
+
+        self.assignment: List[int] = [-1] * len(preferences)
+        self.total_score = 0.0
+
+    def run(self) -> None:
+        """Solve the assignment problem and record each student's org."""
+        n_students = len(self.preferences)
+        n_orgs = len(self.capacities)
+
+        rows = np.repeat(
+            np.arange(n_students), [len(prefs) for prefs in self.preferences]
+        )
+        cols = np.fromiter(
+            (org for prefs in self.preferences for org in prefs), dtype=np.int64, count=len(rows)
+        )
+        values = np.fromiter(
+            (sc for row in self.scores for sc in row), dtype=float, count=len(rows)
+        )
+        if len(rows) == 0:
+            return
+
+        # An org never needs more slots than students who listed it
+        listed = np.bincount(cols, minlength=n_orgs)
+        slots = np.minimum(np.maximum(np.asarray(self.capacities, dtype=np.int64), 0), listed)
+        slot_org = np.repeat(np.arange(n_orgs), slots)
+
+        benefit = np.zeros((n_students, n_orgs))
+        benefit[rows, cols] = values
+        benefit = benefit[:, slot_org]
+
+        student_idx, slot_idx = solve_assignment(benefit)
+        assigned = benefit[student_idx, slot_idx] > 0
+        for sid, slot in zip(student_idx[assigned].tolist(), slot_idx[assigned].tolist()):
+            self.assignment[sid] = int(slot_org[slot])
+        self.total_score = float(benefit[student_idx[assigned], slot_idx[assigned]].sum())
+
+        logger.info(
+            f"Optimal assignment of {n_students} students to {len(slot_org)} slots: "
+            f"{int(assigned.sum())} assigned, total score {self.total_score:.4f}"
+        )
+
+    def matches(self) -> Dict[int, List[int]]:
+        """
+        Assigned students keyed by org index, orgs in index order, students
+        by descending score (ties in student order).
+        """
+        result: Dict[int, List[Tuple[float, int]]] = {}
+        for sid, org in enumerate(self.assignment):
+            if org >= 0:
+                result.setdefault(org, []).append((-self._score(sid, org), sid))
+        return {org: [sid for _, sid in sorted(result[org])] for org in sorted(result)}
+
+    def remaining_scores(self, sid: int) -> List[float]:
+        """
+        Scores from the assigned org down the student's preference list,
+        or [] if the student is unassigned.
+        """
+        org = self.assignment[sid]
+        if org < 0:
+            return []
+        return self.scores[sid][self.preferences[sid].index(org):]
+
+    def _score(self, sid: int, org: int) -> float:
+        return self.scores[sid][self.preferences[sid].index(org)]
+
+def solve_assignment(benefit: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maximize the total benefit of a rectangular assignment: every row of
+    the smaller dimension is assigned to a distinct row/column of the other.
+
+    Returns:
+        tuple: (row_indexes, col_indexes) of the assigned cells
+    """
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(benefit, maximize=True)
+
+    transposed = benefit.shape[0] > benefit.shape[1]
+    cost = -(benefit.T if transposed else benefit)
+    row_ind, col_ind = _shortest_augmenting_path(np.ascontiguousarray(cost))
+    if transposed:
+        order = np.argsort(col_ind)
+        return col_ind[order], row_ind[order]
+    return row_ind, col_ind
+
+def _shortest_augmenting_path(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Minimum-cost assignment of every row of cost (n_rows <= n_cols), one
+    Dijkstra-style shortest augmenting path per row with dual potentials,
+    vectorized over columns.
+    """
+    n_rows, n_cols = cost.shape
+    u = np.zeros(n_rows)
+    v = np.zeros(n_cols)
+    col4row = np.full(n_rows, -1, dtype=np.int64)
+    row4col = np.full(n_cols, -1, dtype=np.int64)
+
+    for cur_row in range(n_rows):
+        shortest = np.full(n_cols, np.inf)
+        path = np.full(n_cols, -1, dtype=np.int64)
+        remaining = np.ones(n_cols, dtype=bool)
+        visited_rows = np.zeros(n_rows, dtype=bool)
+
+        min_val = 0.0
+        i = cur_row
+        sink = -1
+        while sink < 0:
+            visited_rows[i] = True
+            reduced = min_val + cost[i] - u[i] - v
+            update = remaining & (reduced < shortest)
+            path[update] = i
+            shortest[update] = reduced[update]
+
+            # Closest unvisited column, preferring a free one on ties
+            candidates = np.where(remaining, shortest, np.inf)
+            min_val = candidates.min()
+            closest = np.flatnonzero(candidates == min_val)
+            free = closest[row4col[closest] < 0]
+            j = int(free[0]) if len(free) else int(closest[0])
+
+            remaining[j] = False
+            if row4col[j] < 0:
+                sink = j
+            else:
+                i = int(row4col[j])
+
+        # Update dual potentials
+        u[cur_row] += min_val
+        others = visited_rows.copy()
+        others[cur_row] = False
+        u[others] += min_val - shortest[col4row[others]]
+        visited_cols = ~remaining
+        v[visited_cols] -= min_val - shortest[visited_cols]
+
+        # Augment along the path back to cur_row
+        j = sink
+        while True:
+            i = int(path[j])
+            row4col[j] = i
+            col4row[i], j = j, col4row[i]
+            if i == cur_row:
+                break
+
+    return np.arange(n_rows), col4row
@@ -0,0 +1,207 @@
+"""
+Multi-core scoring of a MatchingProblem.
+
+Students are split into shards that a ProcessPoolExecutor scores in
+parallel. The problem's columns are copied once into
+multiprocessing.shared_memory blocks that every worker attaches to
+read-only, and each worker writes its rows of the total score matrix
+straight into a shared result block, so only shard bounds are sent to
+workers and nothing is pickled back.
+
+Problems with fewer than min_parallel_pairs (student, organization) pairs,
+or a single worker, are scored in-process.
+
+Usage Flow:
+    scorer = ParallelScorer(weights, workers=4)
+    total_scores = scorer.score(problem)   # same as score_problem(problem)[0]
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from gem_app.utils.matching_problem import (
+    MatchingProblem, ORGANIZATION_COLUMNS, STUDENT_COLUMNS
+)
+
+logger = logging.getLogger(__name__)
+
+# Below this many pairs, process start-up costs more than it saves
+PARALLEL_MIN_PAIRS = 2_000_000
+
+# (shared memory name, shape, dtype) of one shared array
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+class SharedArrays:
+    """
+    NumPy arrays backed by shared memory blocks owned by this process.
+    close() releases and unlinks every block.
+    """
+
+    def __init__(self):
+        self.specs: Dict[str, ArraySpec] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def allocate(self, name: str, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        """Create an uninitialized shared array."""
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        self.specs[name] = (block.name, tuple(shape), dtype.str)
+        self.arrays[name] = array
+        return array
+
+    def add(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Create a shared copy of values."""
+        array = self.allocate(name, values.shape, values.dtype)
+        array[...] = values
+        return array
+
+    def close(self) -> None:
+        # Views must be gone before their buffers can be released
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+class ParallelScorer:
+    """
+    Scores the full students x organizations grid across processes with
+    the same result as MatchingAlgorithm.score_problem.
+    """
+
+    def __init__(
+        self,
+        weights: Dict[str, float],
+        workers: Optional[int] = None,
+        min_parallel_pairs: int = PARALLEL_MIN_PAIRS,
+        shards_per_worker: int = 4
+    ):
+        """
+        Args:
+            weights: score component weights, as in MatchingAlgorithm
+            workers: number of processes (defaults to the host's CPU count)
+            min_parallel_pairs: score smaller problems in-process
+            shards_per_worker: shards per process, to even out the load
+        """
+        self.weights = dict(weights)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_pairs = min_parallel_pairs
+        self.shards_per_worker = shards_per_worker
+
+    def score(self, problem: MatchingProblem) -> np.ndarray:
+        """
+        Total scores of every (student, organization) pair.
+
+        Returns:
+            np.ndarray: array of shape (n_students, n_organizations)
+        """
+        n_students = problem.n_students
+        n_pairs = n_students * problem.n_organizations
+        if self.workers < 2 or n_students < 2 or n_pairs < self.min_parallel_pairs:
+            total_scores, _ = _algorithm(self.weights).score_problem(problem)
+            return total_scores
+
+        shards = _shards(n_students, self.workers * self.shards_per_worker)
+        workers = min(self.workers, len(shards))
+        shared = SharedArrays()
+        try:
+            for name, values in problem.columns().items():
+                shared.add(name, values)
+            shared.allocate('total_scores', (n_students, problem.n_organizations), float)
+
+            layout = {
+                'student_ids': problem.student_ids,
+                'org_ids': problem.org_ids,
+                'areas': problem.areas,
+                'locations': problem.locations,
+                'work_modes': problem.work_modes
+            }
+            context = multiprocessing.get_context()
+            # Forked workers share our resource tracker; others start their own
+            untrack = context.get_start_method() != 'fork'
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(shared.specs, layout, self.weights, untrack)
+            ) as executor:
+                # Re-raise the first worker error, if any
+                for _ in executor.map(_score_shard, shards):
+                    pass
+
+            logger.info(
+                f"Scored {n_pairs} pairs in {len(shards)} shards on {workers} processes"
+            )
+            return np.array(shared.arrays['total_scores'])
+        finally:
+            shared.close()
+
+def _algorithm(weights: Dict[str, float]):
+    """A MatchingAlgorithm with the given weights."""
+    # Imported here: matching_algorithm imports this module
+    from gem_app.utils.matching_algorithm import MatchingAlgorithm
+    algorithm = MatchingAlgorithm(scoring='vectorized')
+    algorithm.weights = dict(weights)
+    return algorithm
+
+def _shards(n_rows: int, n_shards: int) -> List[Tuple[int, int]]:
+    """Split range(n_rows) into up to n_shards contiguous (start, stop) bounds."""
+    bounds = np.linspace(0, n_rows, min(n_shards, n_rows) + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+# Per-process worker state, set by _init_worker
+_worker: Dict[str, Any] = {}
+
+def _init_worker(
+    specs: Dict[str, ArraySpec],
+    layout: Dict[str, List[Any]],
+    weights: Dict[str, float],
+    untrack: bool
+) -> None:
+    """Attach the shared arrays once per worker process."""
+    blocks = []
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        if untrack:
+            # The parent owns and unlinks the block; don't let this
+            # process's own resource tracker claim it too
+            resource_tracker.unregister(block._name, 'shared_memory')
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    _worker.update(
+        blocks=blocks,
+        arrays=arrays,
+        layout=layout,
+        algorithm=_algorithm(weights)
+    )
+
+def _score_shard(bounds: Tuple[int, int]) -> None:
+    """Score students start..stop-1 into the shared total score matrix."""
+    start, stop = bounds
+    arrays = _worker['arrays']
+    layout = _worker['layout']
+
+    columns = {name: arrays[name][start:stop] for name in STUDENT_COLUMNS}
+    columns.update({name: arrays[name] for name in ORGANIZATION_COLUMNS})
+    problem = MatchingProblem(
+        layout['student_ids'][start:stop],
+        layout['org_ids'],
+        layout['areas'],
+        layout['locations'],
+        layout['work_modes'],
+        columns
+    )
+    total_scores, _ = _worker['algorithm'].score_problem(problem)
+    arrays['total_scores'][start:stop] = total_scores
@@ -0,0 +1,301 @@
+"""
+On-disk cache of parsed uploads, so re-uploading the same transcript or
+survey export skips PyPDF2 and pandas entirely.
+
+Entries are keyed by a SHA-256 hash of the file's bytes, what was parsed
+(e.g. 'grades' or 'survey') and the parser's version, so changing a
+parser invalidates its entries. Each entry is one gzip-compressed file of
+JSON lines, one [key, value] item of the parsed dict per line, optionally
+followed by a {"meta": ...} line; entries can be written and read a line
+at a time, so streamed surveys stay bounded in memory. The cache is
+bounded in bytes and evicts least recently used entries first, using each
+entry's modification time, which is refreshed on every hit.
+
+Usage Flow:
+    cache = ParseCache('parse_cache', max_bytes=256 << 20)
+    key = cache.key(pdf_path, 'grades', GRADE_PARSER_VERSION)
+    data = cache.get(key)              # None on a miss
+    if data is None:
+        cache.put(key, parse(pdf_path))
+
+    entry = cache.open(key)            # streamed: iterate (key, value) items
+    with cache.writer(key) as writer:  # committed when the block succeeds
+        writer.add(student_id, record)
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the entry format changes, so older entries are never hit
+CACHE_VERSION = 1
+
+ENTRY_SUFFIX = '.jsonl.gz'
+
+# Bytes hashed at a time, so large files are never read whole
+HASH_BLOCK_BYTES = 1 << 20
+
+# Process-wide caches by directory, see default_parse_cache
+_parse_caches: Dict[str, 'ParseCache'] = {}
+
+class ParseCache:
+    """
+    Size-bounded LRU store of parsed dicts, keyed by content hash.
+
+    Attributes:
+        hits / misses: get() and open() outcomes since this instance was created
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20):
+        """
+        Args:
+            directory: where entries are stored (created if missing)
+            max_bytes: total size the cache is trimmed to after each write
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(source: Union[str, bytes], kind: str, version: int) -> str:
+        """
+        Content hash of a file (a path, or its bytes), what it was parsed
+        into and the parser version. The file's name is not part of it.
+        """
+        hasher = hashlib.sha256()
+        header = {'version': CACHE_VERSION, 'kind': kind, 'parser_version': version}
+        hasher.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+        if isinstance(source, bytes):
+            hasher.update(source)
+        else:
+            with open(source, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                    hasher.update(block)
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The parsed dict of an entry, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            if not os.path.exists(path):
+                self.misses += 1
+                return None
+            try:
+                data = dict(ParseCacheEntry(path))
+                os.utime(path)
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"Discarding unreadable parse cache entry {key}: {str(e)}")
+                _remove(path)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data
+
+    def open(self, key: str) -> Optional['ParseCacheEntry']:
+        """An entry to iterate item by item, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                os.utime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return ParseCacheEntry(path)
+
+    def put(self, key: str, data: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> None:
+        """Store a parsed dict under key, then evict down to max_bytes."""
+        with self.writer(key) as writer:
+            for item_key, value in data.items():
+                writer.add(item_key, value)
+            writer.meta = meta
+
+    def writer(self, key: str) -> 'ParseCacheWriter':
+        """
+        A writer that adds items one at a time. The entry is stored when
+        the writer is committed (or its with-block exits normally) and
+        dropped if it is discarded or the block raises.
+        """
+        return ParseCacheWriter(self, key)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and the current number and size of entries."""
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, _, size in entries)
+        }
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            for filename, _, _ in self._entries():
+                _remove(os.path.join(self.directory, filename))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _store(self, key: str, tmp_path: str) -> None:
+        """Move a finished temporary file into place, then evict."""
+        with self._lock:
+            try:
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                logger.warning(f"Could not store parse cache entry {key}: {str(e)}")
+                _remove(tmp_path)
+                return
+            self._evict(keep=key + ENTRY_SUFFIX)
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used entries (other than keep) until under max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for filename, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if filename == keep:
+                continue
+            _remove(os.path.join(self.directory, filename))
+            total -= size
+            logger.info(f"Evicted parse cache entry {filename} ({size} bytes)")
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """(file name, last use time, size in bytes) of every complete entry."""
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith('.') or not filename.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                entries.append((filename, os.path.getmtime(path), os.path.getsize(path)))
+            except OSError:
+                continue
+        return entries
+
+class ParseCacheEntry:
+    """
+    A stored entry, iterated as (key, value) items read one line at a
+    time. Its meta is set once iteration reaches the end.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta: Optional[Dict[str, Any]] = None
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    self.meta = item.get('meta')
+                    continue
+                yield item[0], item[1]
+
+class ParseCacheWriter:
+    """
+    Writes one entry to a temporary file; see ParseCache.writer. An item
+    that is not JSON-serializable drops the whole entry, as does a
+    temporary file that cannot be created (e.g. the disk is full), so
+    parsing carries on uncached.
+    """
+
+    def __init__(self, cache: ParseCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.meta: Optional[Dict[str, Any]] = None
+        self._file = None
+        self._tmp_path: Optional[str] = None
+        try:
+            fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, prefix='.tmp-')
+            os.close(fd)
+            self._file = gzip.open(self._tmp_path, 'wt', encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"Not caching parse result {key}: {str(e)}")
+            self.discard()
+
+    def add(self, key: str, value: Any) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(json.dumps([key, value]) + '\n')
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Not caching parse result {self.key}: {str(e)}")
+            self.discard()
+
+    def commit(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if self.meta is not None:
+                self._file.write(json.dumps({'meta': self.meta}) + '\n')
+            self._file.close()
+            self._file = None
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Not caching parse result {self.key}: {str(e)}")
+            self.discard()
+            return
+        tmp_path, self._tmp_path = self._tmp_path, None
+        self.cache._store(self.key, tmp_path)
+
+    def discard(self) -> None:
+        if self._file is not None:
+            file, self._file = self._file, None
+            try:
+                file.close()
+            except OSError:
+                pass
+        if self._tmp_path is not None:
+            _remove(self._tmp_path)
+            self._tmp_path = None
+
+    def __enter__(self) -> 'ParseCacheWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+def default_parse_cache() -> Optional[ParseCache]:
+    """
+    The process-wide cache for the PARSE_CACHE_DIR config directory (a
+    relative one is under the app's instance folder), or None outside an
+    app context, if the directory is not set or if it cannot be created.
+    """
+    # Imported here so parsing works without Flask, e.g. in worker processes
+    from flask import current_app, has_app_context
+
+    if not has_app_context():
+        return None
+    directory = current_app.config.get('PARSE_CACHE_DIR')
+    if not directory:
+        return None
+    directory = os.path.join(current_app.instance_path, directory)
+    if directory not in _parse_caches:
+        try:
+            _parse_caches[directory] = ParseCache(
+                directory, current_app.config.get('PARSE_CACHE_MAX_BYTES', 256 << 20)
+            )
+        except OSError as e:
+            logger.warning(f"Parsing without a cache, cannot use {directory}: {str(e)}")
+            return None
+    return _parse_caches[directory]
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -20,6 +20,9 @@ import PyPDF2
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bumped whenever parsing changes, so cached parse results are never reused
+GRADE_PARSER_VERSION = 1
+
 class GradeParser:
     """
     A class for parsing PDF-based grade reports. Uses compiled regex 
@@ -222,11 +225,14 @@ class GradeParser:
 
         return "\n".join(lines)
 
-def process_grade_pdf(pdf_path: str) -> Tuple[Dict, Optional[str]]:
+def process_grade_pdf(pdf_path: str, cache=None) -> Tuple[Dict, Optional[str]]:
     """
     High-level function to parse a PDF at pdf_path, validate the results, 
     compute overall_grade, then return (data, error_msg).
     If an error occurs, data is empty and error_msg is non-empty.
+
+    With a ParseCache, a PDF parsed before (same bytes, same parser
+    version) is returned from the cache without parsing it again.
     """
     parser = GradeParser()
     # concurrency_lock.acquire()  # Uncomment if concurrency is used
@@ -234,6 +240,12 @@ def process_grade_pdf(pdf_path: str) -> Tuple[Dict, Optional[str]]:
         with open(pdf_path, 'rb') as f:
             pdf_content = f.read()
 
+        if cache is not None:
+            key = cache.key(pdf_content, 'grades', GRADE_PARSER_VERSION)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached, None
+
         grades_data = parser.parse_pdf(pdf_content)
         errors = parser.validate_grades(grades_data)
         if errors:
@@ -242,6 +254,8 @@ def process_grade_pdf(pdf_path: str) -> Tuple[Dict, Optional[str]]:
         # Compute overall grade
         overall = parser.calculate_overall_grade(grades_data['course_grades'])
         grades_data['overall_grade'] = overall
+        if cache is not None:
+            cache.put(key, grades_data)
         return grades_data, None
 
     except Exception as e:
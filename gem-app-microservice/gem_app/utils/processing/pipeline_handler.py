@@ -8,32 +8,44 @@ No placeholders or guesswork remain. Any concurrency or advanced logging lines
 are commented out. Uncomment them if you need them.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from datetime import datetime
 
 # from gem_app.utils.concurrency import concurrency_lock  # Uncomment if concurrency is used
 
-from ..csv_parser import SurveyDataParser  # parses CSV survey data
-from ..pdf_parser import GradeParser       # parses PDF grade data
+from sqlalchemy.orm import selectinload
+
+from ..csv_parser import SurveyDataParser, SurveyStream, process_survey_data  # parses CSV survey data
+from ..pdf_parser import GradeParser, process_grade_pdf  # parses PDF grade data
+from ..parse_cache import ParseCache, default_parse_cache
 from ...models.student import StudentProfile, StudentGrade, Statement, AreaRanking
+from ...models.user import User
 from ...models.organization import OrganizationProfile
 from ... import db
 
 logger = logging.getLogger(__name__)
 
+# Students saved per transaction when streaming a survey CSV
+SURVEY_BATCH_SIZE = 500
+
 class ProcessingPipeline:
     """
     Handles the processing of student data (survey CSVs) and grade PDFs, 
     plus updating StudentProfile and Statement data in the database.
     """
 
-    def __init__(self):
+    def __init__(self, parse_cache: Optional[ParseCache] = None):
         """
         Initializes parsers and counters for processed/failed items and errors encountered.
+
+        Args:
+            parse_cache: cache of parsed files (defaults to the app's
+                PARSE_CACHE_DIR cache, if any)
         """
         self.survey_parser = SurveyDataParser()
         self.grade_parser = GradeParser()
+        self.parse_cache = parse_cache if parse_cache is not None else default_parse_cache()
 
         self.errors: List[str] = []
         self.processed_count: int = 0
@@ -68,10 +80,10 @@ class ProcessingPipeline:
             if 'csv_files' in files:
                 for csv_file in files['csv_files']:
                     try:
-                        # parse_csv returns (data_dict, list_of_errors)
-                        survey_data, parse_errors = self.survey_parser.parse_csv(csv_file)
-                        if parse_errors:
-                            results['errors'].extend(parse_errors)
+                        # process_survey_data returns (data_dict, error_msg)
+                        survey_data, error_msg = process_survey_data(csv_file, cache=self.parse_cache)
+                        if error_msg:
+                            results['errors'].append(error_msg)
                             results['failed'] += 1
                             continue
 
@@ -87,8 +99,8 @@ class ProcessingPipeline:
             if 'pdf_files' in files:
                 for pdf_file in files['pdf_files']:
                     try:
-                        # parse_pdf returns (grades_dict, error_msg)
-                        grades_data, error_msg = self.grade_parser.parse_pdf(pdf_file)
+                        # process_grade_pdf returns (grades_dict, error_msg)
+                        grades_data, error_msg = process_grade_pdf(pdf_file, cache=self.parse_cache)
                         if error_msg:
                             results['errors'].append(error_msg)
                             results['failed'] += 1
@@ -171,6 +183,127 @@ class ProcessingPipeline:
             # concurrency_lock.release()  # Uncomment if concurrency is used
             pass
 
+    def process_survey_stream(
+        self,
+        csv_path: str,
+        batch_size: int = SURVEY_BATCH_SIZE,
+        chunksize: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Import a survey CSV of any size: students are streamed from disk
+        (see SurveyStream) and saved batch_size at a time, one transaction
+        per batch, so memory stays bounded by the chunk and batch sizes.
+        Invalid rows are skipped and reported rather than failing the file.
+
+        Args:
+            csv_path: survey CSV on disk
+            batch_size: students saved per transaction
+            chunksize: CSV rows read at a time (SurveyStream's default if None)
+
+        Returns:
+            A dictionary with 'success', 'rows' read, students 'processed',
+            'invalid_rows', 'duplicates', 'unknown_students' (IDs without a
+            StudentProfile) and 'errors' (aggregated across chunks).
+        """
+        stream = SurveyStream(csv_path, parser=self.survey_parser, cache=self.parse_cache)
+        if chunksize:
+            stream.chunksize = chunksize
+
+        processed = 0
+        unknown: List[str] = []
+        for batch in stream.batches(batch_size):
+            saved, missing = self._save_survey_batch(batch)
+            processed += saved
+            unknown.extend(missing)
+
+        errors = list(stream.errors)
+        if stream.invalid_rows > len(errors):
+            errors.append(f"{stream.invalid_rows} invalid rows in total (first {stream.max_errors} listed).")
+        if unknown:
+            errors.append(f"No student found for {len(unknown)} Student ID(s).")
+
+        self.processed_count += processed
+        logger.info(
+            f"Imported {processed} of {stream.students} students from {stream.rows} "
+            f"rows of {csv_path} ({stream.invalid_rows} invalid)"
+        )
+        return {
+            'success': stream.students > 0 or not stream.errors,
+            'rows': stream.rows,
+            'processed': processed,
+            'invalid_rows': stream.invalid_rows,
+            'duplicates': stream.duplicates,
+            'unknown_students': unknown[:100],
+            'errors': errors
+        }
+
+    def _save_survey_batch(self, data: Dict[str, Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """
+        Save a batch of parsed survey students in one transaction: their
+        profiles, rankings and statements are loaded in one round of
+        queries, updated as _process_survey_data does, and committed
+        together. Those objects are then expunged so memory does not grow
+        with the number of batches; anything else in the session, such as
+        the request's user, stays attached. Rolls back the batch on error.
+
+        Returns:
+            (students saved, student IDs without a StudentProfile)
+        """
+        # concurrency_lock.acquire()  # Uncomment if concurrency is used
+        try:
+            profiles = (
+                db.session.query(User.student_id, StudentProfile)
+                .join(StudentProfile, StudentProfile.user_id == User.id)
+                .filter(User.student_id.in_(list(data.keys())))
+                .options(
+                    selectinload(StudentProfile.rankings),
+                    selectinload(StudentProfile.statements)
+                )
+                .all()
+            )
+            students = {str(sid): profile for sid, profile in profiles}
+
+            unknown = []
+            # Every object this batch loaded or created
+            batch_objects = []
+            for student in students.values():
+                batch_objects.append(student)
+                batch_objects.extend(student.rankings)
+                batch_objects.extend(student.statements)
+            for student_id, student_info in data.items():
+                student = students.get(student_id)
+                if student is None:
+                    unknown.append(student_id)
+                    continue
+
+                for area, rank in student_info.get('rankings', {}).items():
+                    # Blank ranks arrive as NaN; leave those areas unranked
+                    if rank is not None and rank == rank:
+                        batch_objects.append(self._update_ranking(student, area, rank))
+                for area, content in student_info.get('statements', {}).items():
+                    batch_objects.append(self._update_statement(student, area, content))
+
+                prefs = student_info.get('preferences', {})
+                if 'location' in prefs:
+                    student.location_preferences = prefs['location']
+                if 'work_mode' in prefs:
+                    student.work_mode = prefs['work_mode']
+
+            db.session.commit()
+            for obj in batch_objects:
+                if obj in db.session:
+                    db.session.expunge(obj)
+            return len(data) - len(unknown), unknown
+
+        except Exception as e:
+            self.failed_count += 1
+            self.errors.append(str(e))
+            db.session.rollback()
+            raise
+        finally:
+            # concurrency_lock.release()  # Uncomment if concurrency is used
+            pass
+
     def _process_grades(self, grades_data: Dict[str, Any]) -> None:
         """
         Process parsed grades data for a single student, replacing old StudentGrade 
@@ -218,36 +351,40 @@ class ProcessingPipeline:
             # concurrency_lock.release()  # Uncomment if concurrency is used
             pass
 
-    def _update_ranking(self, student: StudentProfile, area: str, rank: float) -> None:
+    def _update_ranking(self, student: StudentProfile, area: str, rank: float) -> AreaRanking:
         """
-        Update or create a ranking for a specific area of law for the given student.
+        Update or create a ranking for a specific area of law for the given
+        student, and return it.
         """
         ranking = next((r for r in student.rankings if r.area_of_law == area), None)
         if ranking:
             ranking.rank = rank
-        else:
-            new_ranking = AreaRanking(
-                student_profile_id=student.id,
-                area_of_law=area,
-                rank=rank
-            )
-            db.session.add(new_ranking)
-
-    def _update_statement(self, student: StudentProfile, area: str, content: str) -> None:
+            return ranking
+        new_ranking = AreaRanking(
+            student_profile_id=student.id,
+            area_of_law=area,
+            rank=rank
+        )
+        db.session.add(new_ranking)
+        return new_ranking
+
+    def _update_statement(self, student: StudentProfile, area: str, content: str) -> Statement:
         """
-        Update or create a Statement for the given student and area of law.
+        Update or create a Statement for the given student and area of law,
+        and return it.
         """
         stmt = next((s for s in student.statements if s.area_of_law == area), None)
         if stmt:
             stmt.content = content
             stmt.updated_at = datetime.utcnow()
-        else:
-            new_stmt = Statement(
-                student_profile_id=student.id,
-                area_of_law=area,
-                content=content
-            )
-            db.session.add(new_stmt)
+            return stmt
+        new_stmt = Statement(
+            student_profile_id=student.id,
+            area_of_law=area,
+            content=content
+        )
+        db.session.add(new_stmt)
+        return new_stmt
 
     def _calculate_batch_statistics(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,170 @@
+"""
+On-disk cache of computed scores, so rerunning matching on unchanged data
+skips scoring entirely.
+
+Entries are keyed by a SHA-256 hash of the encoded problem's feature
+columns and vocabularies, the score weights and what was computed. Each
+entry is a directory of .npy files that are loaded memory-mapped. The
+cache is bounded in bytes and evicts least recently used entries first,
+using each entry's modification time, which is refreshed on every hit.
+
+Usage Flow:
+    cache = ScoreCache('score_cache', max_bytes=1 << 30)
+    key = cache.key(problem, weights, 'matrix')
+    arrays = cache.get(key)            # None on a miss
+    if arrays is None:
+        cache.put(key, {'total': total_scores, ...})
+    cache.stats()   # {'hits': ..., 'misses': ..., 'entries': ..., 'bytes': ...}
+"""
+
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from gem_app.utils.matching_problem import MatchingProblem
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever scoring changes, so older entries are never hit
+CACHE_VERSION = 1
+
+class ScoreCache:
+    """
+    Size-bounded LRU store of named arrays, keyed by content hash.
+
+    Attributes:
+        hits / misses: get() outcomes since this instance was created
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        """
+        Args:
+            directory: where entries are stored (created if missing)
+            max_bytes: total size the cache is trimmed to after each put
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(problem: MatchingProblem, weights: Dict[str, float], kind: str) -> str:
+        """
+        Content hash of everything scores depend on: the problem's feature
+        columns and vocabularies, the weights, and the kind of entry.
+        Student and organization IDs are not part of it.
+        """
+        hasher = hashlib.sha256()
+        header = {
+            'version': CACHE_VERSION,
+            'kind': kind,
+            'weights': sorted((name, repr(float(w))) for name, w in weights.items()),
+            'areas': problem.areas,
+            'locations': problem.locations,
+            'work_modes': problem.work_modes
+        }
+        hasher.update(json.dumps(header, sort_keys=True, default=repr).encode('utf-8'))
+        for name, values in sorted(problem.columns().items()):
+            values = np.ascontiguousarray(values)
+            hasher.update(f"{name}:{values.dtype.str}:{values.shape}".encode('utf-8'))
+            hasher.update(memoryview(values.reshape(-1)).cast('B'))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Read-only memory-mapped arrays of an entry, or None on a miss.
+        """
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            if not os.path.isdir(path):
+                self.misses += 1
+                return None
+            try:
+                arrays = {
+                    filename[:-len('.npy')]: np.load(
+                        os.path.join(path, filename), mmap_mode='r'
+                    )
+                    for filename in os.listdir(path) if filename.endswith('.npy')
+                }
+                os.utime(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable score cache entry {key}: {str(e)}")
+                shutil.rmtree(path, ignore_errors=True)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return arrays
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Store arrays under key, then evict down to max_bytes."""
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            tmp_path = None
+            try:
+                tmp_path = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+                for name, values in arrays.items():
+                    np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(values))
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not store score cache entry {key}: {str(e)}")
+                if tmp_path is not None:
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                return
+            self._evict(keep=key)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and the current number and size of entries."""
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, _, size in entries)
+        }
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            for key, _, _ in self._entries():
+                shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used entries (other than keep) until under max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted score cache entry {key} ({size} bytes)")
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """(key, last use time, size in bytes) of every complete entry."""
+        entries = []
+        for key in os.listdir(self.directory):
+            path = os.path.join(self.directory, key)
+            if key.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(path, filename))
+                    for filename in os.listdir(path)
+                )
+                entries.append((key, os.path.getmtime(path), size))
+            except OSError:
+                continue
+        return entries
@@ -0,0 +1,266 @@
+"""
+Localized repair of a stable matching after a match is withdrawn, e.g. an
+organization rejecting a pending match: instead of rerunning the whole
+matching, only the students the change reaches move.
+
+Starting from a stable matching with the rejected pair removed,
+  1) each free student (the rejected one, or anyone bumped) proposes to
+     the best organization that would take them: one with room, or one
+     holding a lower score, whose lowest-scored student is bumped in turn,
+  2) each organization with a vacancy takes the highest-scored student who
+     would rather be there than at their current match; the seat that
+     student leaves is the next vacancy,
+until nobody is free with an organization left to try and no vacancy
+attracts anyone. Preferences are those of verify_matching (descending
+score, ties by organization index), so the result has no blocking pairs.
+
+Scores come as the scored pairs of MatchingAlgorithm.scored_pairs (e.g.
+from the score cache), so each step looks at one student's row or one
+organization's column of feasible pairs and a chain costs milliseconds
+regardless of the cohort size.
+
+Usage Flow:
+    chain = VacancyChain(rows, cols, values, capacities, n_students)
+    displaced = chain.seat(students, orgs)  # the current matching
+    chain.forbid([student], [org])        # pairs that may not match again
+    moves = chain.repair([student], [org])
+    # moves => {student: (old_org, new_org)}, -1 for unmatched
+"""
+
+from typing import Dict, Iterable, List, Tuple
+import logging
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class VacancyChain:
+    """
+    A matching over scored pairs that can be repaired in place.
+
+    Attributes:
+        assignment: per student, matched org index or -1
+        steps: proposals and vacancy moves made by repairs so far
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        capacities: np.ndarray,
+        n_students: int
+    ):
+        """
+        Args:
+            rows / cols / values: feasible pairs in row-major order
+            capacities: per org, number of positions available
+            n_students: number of students (rows index into range(n_students))
+        """
+        self.n_students = n_students
+        self.n_orgs = len(capacities)
+        self.capacities = np.asarray(capacities, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.values = np.array(values, dtype=np.float64)
+        rows = np.asarray(rows, dtype=np.int64)
+
+        # Row slices of the row-major pairs, and a column-major view with
+        # students in index order within each column
+        self._keys = rows * self.n_orgs + self.cols
+        self._row_starts = np.searchsorted(rows, np.arange(n_students + 1))
+        self._by_col = np.argsort(self.cols, kind='stable')
+        self._col_rows = rows[self._by_col]
+        self._col_starts = np.searchsorted(self.cols[self._by_col], np.arange(self.n_orgs + 1))
+
+        self.assignment = np.full(n_students, -1, dtype=np.int64)
+        self._current = np.full(n_students, -np.inf)
+        self._holders: List[Dict[int, float]] = [{} for _ in range(self.n_orgs)]
+        self.steps = 0
+        # Students seat() could not keep, by the org they were seated at
+        self.displaced: Dict[int, int] = {}
+
+    def seat(self, students: Iterable[int], orgs: Iterable[int]) -> List[int]:
+        """
+        Restore a matching. A pair that is not feasible keeps its seat
+        with a score of 0, so anyone feasible is preferred to it.
+
+        An org given more students than its capacity keeps its best ones;
+        the rest are left free and recorded in displaced, and the next
+        repair() reports them as moved from that org.
+
+        Returns:
+            list: the students displaced by this call
+        """
+        students = np.asarray(list(students), dtype=np.int64)
+        orgs = np.asarray(list(orgs), dtype=np.int64)
+        scores = self._pair_scores(students, orgs)
+        displaced = []
+        for sid, org, score in zip(students.tolist(), orgs.tolist(), scores.tolist()):
+            score = max(score, 0.0)
+            holders = self._holders[org]
+            if len(holders) >= self.capacities[org] and (
+                not holders
+                or min((value, -holder) for holder, value in holders.items()) > (score, -sid)
+            ):
+                # Full with better students (or no positions): not seated
+                bumped = sid
+            else:
+                bumped = self._place(sid, org, score)
+            if bumped >= 0:
+                self.displaced[bumped] = org
+                displaced.append(bumped)
+        return displaced
+
+    def forbid(self, students: Iterable[int], orgs: Iterable[int]) -> None:
+        """Make pairs infeasible, e.g. matches an organization rejected."""
+        keys = np.asarray(list(students), dtype=np.int64) * self.n_orgs + np.asarray(
+            list(orgs), dtype=np.int64
+        )
+        positions = np.searchsorted(self._keys, keys)
+        positions = positions[positions < len(self._keys)]
+        positions = positions[np.isin(self._keys[positions], keys)]
+        self.values[positions] = 0.0
+
+    def repair(
+        self,
+        free_students: Iterable[int],
+        vacant_orgs: Iterable[int]
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Run the vacancy chain from students who lost their match and orgs
+        that gained room. Students displaced by seat() are free as well.
+
+        Returns:
+            dict: per student whose match changed, (old_org, new_org)
+        """
+        before: Dict[int, int] = {}
+        free = deque(free_students)
+        vacancies = deque(vacant_orgs)
+        for sid in free:
+            before[sid] = int(self.assignment[sid])
+            self._leave(sid)
+        for sid, org in self.displaced.items():
+            if sid not in before:
+                before[sid] = org
+                free.append(sid)
+        self.displaced = {}
+
+        while free or vacancies:
+            # Settle every free student before offering vacancies, like
+            # deferred acceptance would
+            while free:
+                sid = free.popleft()
+                org = self._best_acceptance(sid)
+                if org < 0:
+                    continue
+                self.steps += 1
+                bumped = self._place(sid, org, self._score(sid, org))
+                if bumped >= 0:
+                    before.setdefault(bumped, org)
+                    free.append(bumped)
+
+            if vacancies:
+                org = vacancies.popleft()
+                sid = self._best_candidate(org)
+                if sid < 0:
+                    continue
+                self.steps += 1
+                left = int(self.assignment[sid])
+                before.setdefault(sid, left)
+                self._leave(sid)
+                bumped = self._place(sid, org, self._score(sid, org))
+                if bumped >= 0:
+                    before.setdefault(bumped, org)
+                    free.append(bumped)
+                # Room may remain for more, and the seat left is a vacancy
+                vacancies.appendleft(org)
+                if left >= 0:
+                    vacancies.append(left)
+
+        return {
+            sid: (old, int(self.assignment[sid]))
+            for sid, old in before.items()
+            if old != self.assignment[sid]
+        }
+
+    def _best_acceptance(self, sid: int) -> int:
+        """The student's most preferred org that would accept them, or -1."""
+        start, stop = self._row_starts[sid], self._row_starts[sid + 1]
+        cols = self.cols[start:stop]
+        values = self.values[start:stop]
+        thresholds = np.array([self._threshold(org) for org in cols.tolist()])
+        accepting = (values > 0) & (values > thresholds)
+        if not accepting.any():
+            return -1
+        # Columns ascend within a row, so argmax picks the lowest org on ties
+        return int(cols[np.argmax(np.where(accepting, values, -np.inf))])
+
+    def _best_candidate(self, org: int) -> int:
+        """
+        The highest-scored student (lowest index on ties) who would rather
+        be at org than at their match and whom org would accept, or -1.
+        """
+        start, stop = self._col_starts[org], self._col_starts[org + 1]
+        pairs = self._by_col[start:stop]
+        students = self._col_rows[start:stop]
+        values = self.values[pairs]
+        current = self._current[students]
+        prefers = (values > current) | (
+            (values == current) & (org < self.assignment[students])
+        )
+        candidates = (values > 0) & prefers & (values > self._threshold(org))
+        if not candidates.any():
+            return -1
+        return int(students[np.argmax(np.where(candidates, values, -np.inf))])
+
+    def _threshold(self, org: int) -> float:
+        """
+        Score a student must exceed to be accepted: -inf with room, inf
+        with no positions.
+        """
+        holders = self._holders[org]
+        if len(holders) < self.capacities[org]:
+            return float('-inf')
+        if not holders:
+            return float('inf')
+        return min(holders.values())
+
+    def _place(self, sid: int, org: int, score: float) -> int:
+        """
+        Seat a student at org, bumping its lowest-scored student (the
+        highest index on ties) if it is full. A student is never seated
+        at an org with no positions and counts as bumped.
+
+        Returns:
+            int: the bumped student, or -1
+        """
+        holders = self._holders[org]
+        bumped = -1
+        if len(holders) >= self.capacities[org]:
+            if not holders:
+                return sid
+            bumped = min(holders, key=lambda holder: (holders[holder], -holder))
+            self._leave(bumped)
+        holders[sid] = score
+        self.assignment[sid] = org
+        self._current[sid] = score
+        return bumped
+
+    def _leave(self, sid: int) -> None:
+        org = self.assignment[sid]
+        if org >= 0:
+            del self._holders[org][sid]
+        self.assignment[sid] = -1
+        self._current[sid] = -np.inf
+
+    def _score(self, sid: int, org: int) -> float:
+        return float(self._pair_scores(np.array([sid]), np.array([org]))[0])
+
+    def _pair_scores(self, students: np.ndarray, orgs: np.ndarray) -> np.ndarray:
+        """Score of each pair, 0 if it is not among the feasible pairs."""
+        keys = students * self.n_orgs + orgs
+        if not len(self._keys):
+            return np.zeros(len(keys))
+        positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[positions] == keys, self.values[positions], 0.0)
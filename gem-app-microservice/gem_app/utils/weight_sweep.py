@@ -0,0 +1,251 @@
+"""
+What-if sweeps over score weight vectors: match the same problem under
+several weightings of the score components (ranking, grades, statement,
+location, work_mode) and compare summary metrics, without touching the
+database.
+
+Every component is linear in its weight, so the unweighted components of
+the candidate pairs (see CandidateIndex) are computed once, and cached in
+the score cache if there is one, as an (n_pairs, 5) matrix. Each weight
+vector's total scores are then a single matrix-vector contraction, and
+heap deferred acceptance runs on the pairs with a positive total. Vectors
+are matched in a ProcessPoolExecutor whose workers attach to the pairs in
+shared memory; small problems, a single vector or a single worker run
+in-process.
+
+Totals are summed by the contraction rather than component by component,
+so exact score ties may break differently than in a matching run.
+
+Usage Flow:
+    sweep = WeightSweep(problem, score_cache=cache)
+    results = sweep.run([
+        {'ranking': 0.3, 'grades': 0.3, 'statement': 0.2, 'location': 0.1, 'work_mode': 0.1},
+        [0.5, 0.2, 0.2, 0.05, 0.05],          # in SCORE_COMPONENTS order
+    ])
+    # one summary per vector: match_rate, mean_rank, total_score, ...
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from gem_app.utils.deferred_acceptance import DeferredAcceptance
+from gem_app.utils.matching_algorithm import (
+    SCORE_COMPONENTS, MatchingAlgorithm, preference_lists
+)
+from gem_app.utils.matching_candidates import CandidateIndex
+from gem_app.utils.matching_problem import MatchingProblem
+from gem_app.utils.parallel_scoring import SharedArrays
+from gem_app.utils.score_cache import ScoreCache
+
+logger = logging.getLogger(__name__)
+
+# Below this many candidate pairs, process start-up costs more than it saves
+SWEEP_MIN_PARALLEL_PAIRS = 200_000
+
+WeightVector = Union[Mapping[str, float], Sequence[float]]
+
+class WeightSweep:
+    """
+    Matches one problem under many weight vectors.
+
+    Attributes:
+        rows / cols: candidate pairs in row-major order
+        components: (n_pairs, len(SCORE_COMPONENTS)) unweighted scores
+    """
+
+    def __init__(
+        self,
+        problem: MatchingProblem,
+        score_cache: Optional[ScoreCache] = None,
+        workers: Optional[int] = None,
+        min_parallel_pairs: int = SWEEP_MIN_PARALLEL_PAIRS
+    ):
+        """
+        Args:
+            problem: Encoded students and organizations
+            score_cache: optional cache for the unweighted components
+            workers: number of processes (defaults to the host's CPU count)
+            min_parallel_pairs: match smaller problems in-process
+        """
+        self.problem = problem
+        self.score_cache = score_cache
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_pairs = min_parallel_pairs
+        self.rows, self.cols, self.components = self._unit_components()
+
+        # Each pair's rank of the org's area of law by the student, NaN if unranked
+        self.pair_ranks = problem.ranks[self.rows, problem.org_area[self.cols]].astype(float)
+
+    def run(self, weight_vectors: Sequence[WeightVector]) -> List[Dict[str, Any]]:
+        """
+        Match the problem once per weight vector.
+
+        Args:
+            weight_vectors: dicts of component weights (missing components
+                weigh 0) or sequences in SCORE_COMPONENTS order
+
+        Returns:
+            list: per vector, its 'weights' and the summary metrics of
+            _summarize, in input order
+        """
+        vectors = np.array([normalize_weights(w) for w in weight_vectors], dtype=float)
+        if not len(vectors):
+            return []
+
+        arrays = {
+            'rows': self.rows,
+            'cols': self.cols,
+            'components': self.components,
+            'pair_ranks': self.pair_ranks,
+            'capacities': self.problem.capacities.astype(np.int64)
+        }
+        workers = min(self.workers, len(vectors))
+        if workers < 2 or len(self.rows) < self.min_parallel_pairs:
+            summaries = [_summarize(arrays, self.problem.n_students, w) for w in vectors]
+        else:
+            summaries = self._run_parallel(arrays, vectors, workers)
+
+        logger.info(
+            f"Swept {len(vectors)} weight vectors over {len(self.rows)} candidate "
+            f"pairs on {max(workers, 1)} processes"
+        )
+        return [
+            dict(summary, weights=dict(zip(SCORE_COMPONENTS, w.tolist())))
+            for w, summary in zip(vectors, summaries)
+        ]
+
+    def _run_parallel(
+        self,
+        arrays: Dict[str, np.ndarray],
+        vectors: np.ndarray,
+        workers: int
+    ) -> List[Dict[str, Any]]:
+        shared = SharedArrays()
+        try:
+            for name, values in arrays.items():
+                shared.add(name, values)
+            context = multiprocessing.get_context()
+            # Forked workers share our resource tracker; others start their own
+            untrack = context.get_start_method() != 'fork'
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(shared.specs, self.problem.n_students, untrack)
+            ) as executor:
+                return list(executor.map(_summarize_shared, vectors))
+        finally:
+            shared.close()
+
+    def _unit_components(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Candidate pairs and their components at weight 1, cached if possible."""
+        unit_weights = {name: 1.0 for name in SCORE_COMPONENTS}
+        if self.score_cache is not None:
+            key = self.score_cache.key(self.problem, unit_weights, 'components')
+            cached = self.score_cache.get(key)
+            if cached is not None:
+                return cached['rows'], cached['cols'], cached['components']
+
+        algorithm = MatchingAlgorithm(scoring='sparse')
+        algorithm.weights = unit_weights
+        candidates = CandidateIndex(self.problem).generate()
+        rows = candidates.rows()
+        cols = candidates.indices.astype(np.int64)
+        _, component_scores = algorithm.score_pairs(self.problem, rows, cols)
+        components = np.column_stack([component_scores[name] for name in SCORE_COMPONENTS])
+
+        if self.score_cache is not None:
+            self.score_cache.put(key, {'rows': rows, 'cols': cols, 'components': components})
+        return rows, cols, components
+
+def normalize_weights(weights: WeightVector) -> np.ndarray:
+    """
+    A weight vector as an array in SCORE_COMPONENTS order.
+
+    Raises:
+        ValueError: for unknown components, a wrong length or negative weights
+    """
+    if isinstance(weights, Mapping):
+        unknown = set(weights) - set(SCORE_COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown score components: {sorted(unknown)}")
+        vector = np.array([float(weights.get(name, 0.0)) for name in SCORE_COMPONENTS])
+    else:
+        vector = np.array([float(w) for w in weights])
+        if len(vector) != len(SCORE_COMPONENTS):
+            raise ValueError(
+                f"Weight vectors need {len(SCORE_COMPONENTS)} weights "
+                f"({', '.join(SCORE_COMPONENTS)}), got {len(vector)}"
+            )
+    if np.any(~np.isfinite(vector)) or np.any(vector < 0):
+        raise ValueError(f"Weights must be finite and not negative: {vector.tolist()}")
+    return vector
+
+def _summarize(
+    arrays: Dict[str, np.ndarray],
+    n_students: int,
+    weights: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Run deferred acceptance under one weight vector.
+
+    Returns:
+        dict: 'matched', 'match_rate' (of all students), 'fill_rate' (of
+        all positions), 'mean_rank' (students' own rank of their matched
+        org's area of law, over ranked areas; None if there are none),
+        'total_score' and 'mean_score' of the matched pairs, 'proposals'
+    """
+    rows, cols = arrays['rows'], arrays['cols']
+    capacities = arrays['capacities']
+    totals = arrays['components'] @ weights
+    keep = np.flatnonzero(totals > 0)
+
+    preferences, scores = preference_lists(rows[keep], cols[keep], totals[keep], n_students)
+    engine = DeferredAcceptance(preferences, scores, capacities.tolist())
+    engine.run(range(n_students))
+
+    # Locate each match among the row-major pairs
+    assignment = np.array(engine.assignment, dtype=np.int64)
+    matched = np.flatnonzero(assignment >= 0)
+    n_orgs = len(capacities)
+    pair_keys = rows[keep] * n_orgs + cols[keep]
+    matched_pairs = keep[np.searchsorted(pair_keys, matched * n_orgs + assignment[matched])]
+
+    ranks = arrays['pair_ranks'][matched_pairs]
+    ranks = ranks[~np.isnan(ranks)]
+    match_scores = totals[matched_pairs]
+    positions = int(capacities.sum())
+    return {
+        'matched': len(matched),
+        'match_rate': len(matched) / n_students if n_students else 0.0,
+        'fill_rate': len(matched) / positions if positions else 0.0,
+        'mean_rank': float(ranks.mean()) if len(ranks) else None,
+        'total_score': float(match_scores.sum()),
+        'mean_score': float(match_scores.mean()) if len(matched) else 0.0,
+        'proposals': engine.proposals
+    }
+
+# Per-process worker state, set by _init_worker
+_worker: Dict[str, Any] = {}
+
+def _init_worker(specs: Dict[str, Any], n_students: int, untrack: bool) -> None:
+    """Attach the shared pair arrays once per worker process."""
+    blocks = []
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        if untrack:
+            # The parent owns and unlinks the block
+            resource_tracker.unregister(block._name, 'shared_memory')
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _worker.update(blocks=blocks, arrays=arrays, n_students=n_students)
+
+def _summarize_shared(weights: np.ndarray) -> Dict[str, Any]:
+    return _summarize(_worker['arrays'], _worker['n_students'], weights)
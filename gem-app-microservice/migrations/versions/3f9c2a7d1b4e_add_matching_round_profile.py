@@ -0,0 +1,33 @@
+"""Add matching_rounds.profile for profiled matching runs
+
+Revision ID: 3f9c2a7d1b4e
+Revises: 
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b4e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_profile_column():
+    columns = sa.inspect(op.get_bind()).get_columns('matching_rounds')
+    return any(column['name'] == 'profile' for column in columns)
+
+
+def upgrade():
+    # complete_migrations.py runs db.create_all() first, which already
+    # creates the column on a fresh database
+    if not _has_profile_column():
+        op.add_column('matching_rounds', sa.Column('profile', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    if _has_profile_column():
+        op.drop_column('matching_rounds', 'profile')
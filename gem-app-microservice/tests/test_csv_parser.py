@@ -0,0 +1,144 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from gem_app.utils.csv_parser import (
+    DataBatchProcessor, SurveyDataParser, SurveyStream, process_survey_data
+)
+from gem_app.utils.parse_cache import ParseCache
+
+def survey_row(student_id, **ranks):
+    """A survey row ranking every area 1-9 in order, with overrides."""
+    parser = SurveyDataParser()
+    row = {
+        'RecipientLastName': f"Last{student_id}",
+        'RecipientFirstName': f"First{student_id}",
+        'RecipientEmail': f"Student{student_id}@Example.edu",
+        'Student ID': student_id,
+        'Location': 'Toronto, Ottawa',
+        'WorkMode': 'hybrid'
+    }
+    for rank, col in enumerate(parser.required_columns['rankings'], start=1):
+        row[col] = ranks.get(col, rank)
+    for col in parser.required_columns['statements']:
+        row[col] = f"{col} statement of {student_id}"
+    return row
+
+@pytest.fixture
+def write_survey(tmp_path):
+    def write(rows, name='survey.csv'):
+        path = tmp_path / name
+        pd.DataFrame(rows).to_csv(path, index=False)
+        return str(path)
+    return write
+
+@pytest.mark.parametrize('rank', ['257', '200', '10000000000000000000'])
+def test_out_of_range_rank_is_kept_by_both_paths(write_survey, rank):
+    path = write_survey([
+        survey_row('1001', PublicInterestRank=rank),
+        survey_row('1002')
+    ])
+
+    processed, error = process_survey_data(path)
+    assert error is None
+    streamed = dict(SurveyStream(path, chunksize=1))
+
+    assert processed['1001']['rankings']['PublicInterest'] == float(rank)
+    assert streamed['1001']['rankings'] == processed['1001']['rankings']
+
+def test_negative_rank_is_invalid_in_both_paths(write_survey):
+    path = write_survey([survey_row('1001', PublicInterestRank='-3')])
+
+    _, error = process_survey_data(path)
+    assert 'invalid numeric rank values in PublicInterestRank' in error
+    stream = SurveyStream(path)
+    assert dict(stream) == {}
+    assert stream.errors == ['Row 2: invalid rank in PublicInterestRank']
+
+def test_stream_matches_process_survey_data(write_survey):
+    path = write_survey([survey_row(str(1001 + i)) for i in range(7)])
+
+    processed, error = process_survey_data(path)
+    assert error is None
+    stream = SurveyStream(path, chunksize=3)
+
+    assert dict(stream) == processed
+    assert (stream.rows, stream.students, stream.invalid_rows) == (7, 7, 0)
+
+def test_stream_reports_invalid_rows_across_chunks(write_survey):
+    rows = [survey_row(str(1001 + i)) for i in range(5)]
+    rows[1]['IPLawRank'] = 'abc'
+    rows[4]['Student ID'] = None
+    path = write_survey(rows)
+
+    stream = SurveyStream(path, chunksize=2)
+    assert sorted(dict(stream)) == ['1001', '1003', '1004']
+    # Spreadsheet rows: the header is row 1
+    assert stream.errors == [
+        'Row 3: invalid rank in IPLawRank',
+        'Row 6: missing Student ID'
+    ]
+    assert stream.invalid_rows == 2
+
+    capped = SurveyStream(path, chunksize=2, max_errors=1)
+    list(capped)
+    assert capped.errors == ['Row 3: invalid rank in IPLawRank']
+    assert capped.invalid_rows == 2
+
+def test_stream_keeps_first_row_of_duplicates_across_chunks(write_survey):
+    rows = [survey_row('1001'), survey_row('1002'), survey_row('1003')]
+    duplicate = survey_row('1001', PublicInterestRank=9)
+    path = write_survey(rows + [duplicate])
+
+    stream = SurveyStream(path, chunksize=2)
+    streamed = dict(stream)
+    assert sorted(streamed) == ['1001', '1002', '1003']
+    assert streamed['1001']['rankings']['PublicInterest'] == 1.0
+    assert stream.duplicates == 1
+
+def test_bulk_process_matches_extract_student_data(write_survey):
+    rows = [survey_row(str(1001 + i)) for i in range(3)]
+    rows[2]['Location'] = None
+    parser = SurveyDataParser()
+    df, errors = parser.parse_csv(write_survey(rows))
+    assert errors == []
+
+    bulk = parser.bulk_process_students(df)
+    assert bulk == {
+        sid: parser.extract_student_data(df, sid) for sid in ['1001', '1002', '1003']
+    }
+
+def test_parallel_batch_matches_sequential(write_survey):
+    first = write_survey([survey_row('1001'), survey_row('1002')], 'first.csv')
+    second = write_survey([survey_row('1002', PublicInterestRank=9)], 'second.csv')
+    files = [first, second, first + '.missing']
+
+    sequential = DataBatchProcessor().process_batch(files, [])
+    parallel = DataBatchProcessor(workers=2).process_batch(files, [], parallel=True)
+
+    assert parallel == sequential
+    merged, errors = parallel
+    # The later file wins for a student in both
+    assert merged['1002']['rankings']['PublicInterest'] == 9.0
+    assert len(errors) == 1 and errors[0].startswith(first + '.missing')
+
+def test_stream_is_replayed_from_cache(write_survey, tmp_path):
+    rows = [survey_row('1001'), survey_row('1002', IPLawRank='abc')]
+    path = write_survey(rows)
+    cache = ParseCache(str(tmp_path / 'parsed'))
+
+    first = SurveyStream(path, cache=cache)
+    streamed = dict(first)
+    replayed = SurveyStream(path, cache=cache)
+
+    assert dict(replayed) == streamed
+    assert replayed.errors == first.errors == ['Row 3: invalid rank in IPLawRank']
+    assert cache.hits == 1
+
+def test_stream_without_writable_cache(write_survey, tmp_path):
+    path = write_survey([survey_row('1001'), survey_row('1002')])
+    cache = ParseCache(str(tmp_path / 'parsed'))
+    shutil.rmtree(cache.directory)
+
+    assert sorted(dict(SurveyStream(path, cache=cache))) == ['1001', '1002']
@@ -0,0 +1,33 @@
+import copy
+import random
+
+from benchmarks.cohort import generate_cohort
+from gem_app.utils.deferred_acceptance import DeferredAcceptance
+from gem_app.utils.incremental_matching import IncrementalMatcher
+from gem_app.utils.matching_problem import MatchingProblem
+from gem_app.utils.matching_verifier import verify_matching
+
+def test_acceptance_threshold_without_positions():
+    engine = DeferredAcceptance([[0, 1]], [[2.0, 1.0]], [0, 1])
+    assert engine.acceptance_threshold(0) == float('inf')
+    assert engine.acceptance_threshold(1) == float('-inf')
+
+    engine.run([0])
+    assert engine.assignment == [1]
+    assert engine.acceptance_threshold(1) == 1.0
+
+def test_rematch_after_capacity_drops_to_zero():
+    rng = random.Random(3)
+    students, organizations = generate_cohort(200, 30, seed=3)
+    matcher = IncrementalMatcher()
+    _, snapshot = matcher.match(MatchingProblem.from_dicts(students, organizations))
+
+    for _ in range(20):
+        organizations = copy.deepcopy(organizations)
+        organizations[rng.choice(list(organizations))]['available_positions'] = rng.randint(0, 2)
+        problem = MatchingProblem.from_dicts(students, organizations)
+        (matches, _, _), snapshot = matcher.rematch(snapshot, problem)
+
+        report = verify_matching(snapshot.problem, matches, snapshot.scores)
+        assert report['valid'], report['errors']
+        assert report['stable']
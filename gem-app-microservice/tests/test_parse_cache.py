@@ -0,0 +1,61 @@
+import os
+import shutil
+
+from gem_app.utils.parse_cache import ENTRY_SUFFIX, ParseCache
+
+def entry_path(cache, key):
+    return os.path.join(cache.directory, key + ENTRY_SUFFIX)
+
+def test_hit_returns_stored_data(tmp_path):
+    cache = ParseCache(str(tmp_path / 'parsed'))
+    key = cache.key(b'grades.pdf bytes', 'grades', 1)
+    assert cache.get(key) is None
+
+    cache.put(key, {'student_id': '1001', 'overall_grade': 81.5}, meta={'rows': 1})
+    assert cache.get(key) == {'student_id': '1001', 'overall_grade': 81.5}
+
+    entry = cache.open(key)
+    assert list(entry) == [('student_id', '1001'), ('overall_grade', 81.5)]
+    assert entry.meta == {'rows': 1}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_key_depends_on_content_kind_and_version():
+    key = ParseCache.key(b'data', 'survey', 1)
+    assert key == ParseCache.key(b'data', 'survey', 1)
+    assert key != ParseCache.key(b'other', 'survey', 1)
+    assert key != ParseCache.key(b'data', 'grades', 1)
+    assert key != ParseCache.key(b'data', 'survey', 2)
+
+def test_evicts_least_recently_used_first(tmp_path):
+    cache = ParseCache(str(tmp_path / 'parsed'))
+    for age, key in enumerate(['c', 'b', 'a']):
+        cache.put(key, {'text': key * 1000})
+        # Oldest first: 'a' was used longest ago
+        os.utime(entry_path(cache, key), (1000 - age, 1000 - age))
+    cache.get('a')  # now the most recently used
+
+    size = os.path.getsize(entry_path(cache, 'a'))
+    cache.max_bytes = 3 * size
+    cache.put('d', {'text': 'd' * 1000})
+
+    assert not os.path.exists(entry_path(cache, 'b'))
+    assert all(os.path.exists(entry_path(cache, key)) for key in ['a', 'c', 'd'])
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    cache = ParseCache(str(tmp_path / 'parsed'))
+    with open(entry_path(cache, 'broken'), 'wb') as f:
+        f.write(b'not gzip')
+
+    assert cache.get('broken') is None
+    assert not os.path.exists(entry_path(cache, 'broken'))
+    assert cache.misses == 1
+
+def test_unwritable_directory_skips_caching(tmp_path):
+    cache = ParseCache(str(tmp_path / 'parsed'))
+    shutil.rmtree(cache.directory)
+
+    cache.put('entry', {'student_id': '1001'})
+    with cache.writer('streamed') as writer:
+        writer.add('1001', {'rankings': {}})
+    assert cache.get('entry') is None
+    assert cache.get('streamed') is None
@@ -0,0 +1,20 @@
+import shutil
+
+import numpy as np
+
+from gem_app.utils.score_cache import ScoreCache
+
+def test_put_and_get(tmp_path):
+    cache = ScoreCache(str(tmp_path / 'scores'))
+    cache.put('entry', {'total': np.arange(6.0).reshape(2, 3)})
+
+    arrays = cache.get('entry')
+    assert np.array_equal(arrays['total'], np.arange(6.0).reshape(2, 3))
+    assert cache.stats()['hits'] == 1
+
+def test_put_without_directory_is_skipped(tmp_path):
+    cache = ScoreCache(str(tmp_path / 'scores'))
+    shutil.rmtree(cache.directory)
+
+    cache.put('entry', {'total': np.zeros(3)})
+    assert cache.get('entry') is None
@@ -0,0 +1,56 @@
+import numpy as np
+
+from gem_app.utils.vacancy_chain import VacancyChain
+
+def make_chain(scores, capacities):
+    """A chain over a dense (students x orgs) score list, 0 for infeasible."""
+    scores = np.array(scores, dtype=np.float64)
+    rows, cols = np.nonzero(scores)
+    return VacancyChain(rows, cols, scores[rows, cols], capacities, scores.shape[0])
+
+def test_single_step_repair():
+    chain = make_chain([[3.0, 1.0]], [1, 1])
+    chain.seat([0], [0])
+    chain.forbid([0], [0])
+
+    assert chain.repair([0], [0]) == {0: (0, 1)}
+    assert chain.steps == 1
+
+def test_multi_hop_chain():
+    # Student 1 would rather be at org 0, student 2 waits for org 1
+    chain = make_chain(
+        [[6.0, 0.0],
+         [5.0, 4.0],
+         [0.0, 3.0]],
+        [1, 1]
+    )
+    chain.seat([0, 1], [0, 1])
+    chain.forbid([0], [0])
+
+    moves = chain.repair([0], [0])
+    assert moves == {0: (0, -1), 1: (1, 0), 2: (-1, 1)}
+    assert chain.assignment.tolist() == [-1, 0, 1]
+
+def test_seat_at_org_without_positions():
+    chain = make_chain([[2.0, 1.0]], [1, 0])
+
+    assert chain.seat([0], [1]) == [0]
+    assert chain.assignment.tolist() == [-1]
+    assert chain.repair([], []) == {0: (1, 0)}
+
+def test_seat_at_overfull_org_keeps_best_students():
+    chain = make_chain([[1.0], [2.0], [3.0]], [2])
+
+    assert chain.seat([0, 1, 2], [0, 0, 0]) == [0]
+    assert chain.assignment.tolist() == [-1, 0, 0]
+    # Nowhere else to go: reported as leaving the org
+    assert chain.repair([], []) == {0: (0, -1)}
+    assert chain.displaced == {}
+
+def test_no_positions_never_accepts():
+    chain = make_chain([[1.0, 5.0], [1.0, 0.0]], [1, 0])
+    chain.seat([1], [0])
+    chain.forbid([1], [0])
+
+    # Student 0 prefers org 1, which has no positions
+    assert chain.repair([1, 0], [0]) == {1: (0, -1), 0: (-1, 0)}
@@ -0,0 +1,112 @@
+import pytest
+
+from gem_app import create_app, db
+from gem_app.config import TestingConfig
+from gem_app.models.matching import Match
+from gem_app.models.organization import OrganizationProfile
+from gem_app.models.student import AreaRanking, StudentProfile
+from gem_app.models.user import User
+from gem_app.utils.matching_service import MatchingService
+
+class VerifyConfig(TestingConfig):
+    SECRET_KEY = 'test'
+    JWT_SECRET_KEY = 'test'
+    SCORE_CACHE_DIR = ''
+    PARSE_CACHE_DIR = ''
+    WTF_CSRF_ENABLED = False
+
+@pytest.fixture
+def app():
+    app = create_app(VerifyConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def add_user(email, role):
+    user = User(email=email, first_name='Test', last_name=role.title(), role=role)
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+def add_organization(name, available, filled):
+    org = OrganizationProfile(
+        user_id=add_user(f"{name}@example.org", 'organization').id,
+        name=name,
+        area_of_law='Public Interest',
+        location='Toronto',
+        work_mode='hybrid',
+        available_positions=available,
+        filled_positions=filled
+    )
+    db.session.add(org)
+    db.session.flush()
+    return org
+
+def add_student(name, status):
+    student = StudentProfile(
+        user_id=add_user(f"{name}@example.edu", 'student').id,
+        overall_grade=30.0,
+        status=status
+    )
+    db.session.add(student)
+    db.session.flush()
+    db.session.add(AreaRanking(
+        student_profile_id=student.id, area_of_law='Public Interest', rank=1
+    ))
+    return student
+
+def add_match(student, org, status):
+    match = Match(
+        student_profile_id=student.id,
+        organization_profile_id=org.id,
+        status=status,
+        match_type='algorithmic'
+    )
+    db.session.add(match)
+    return match
+
+def test_accepted_match_fills_its_seat(app):
+    # Two positions: one filled by an accepted match, one by a pending match
+    org = add_organization('clinic', available=2, filled=1)
+    add_match(add_student('accepted', 'matched'), org, 'accepted')
+    add_match(add_student('pending', 'pending'), org, 'pending')
+    # Scores the same as the pending student, so it does not block
+    add_student('waiting', 'unmatched')
+    db.session.commit()
+
+    report = MatchingService().verify_matches()
+    assert report['valid'], report['errors']
+    assert report['stable'], report['blocking_pairs']
+
+def test_pending_match_at_full_organization(app):
+    org = add_organization('full', available=1, filled=1)
+    add_match(add_student('accepted', 'matched'), org, 'accepted')
+    add_match(add_student('pending', 'pending'), org, 'pending')
+    db.session.commit()
+
+    report = MatchingService().verify_matches()
+    assert not report['valid']
+    assert report['over_capacity'] == {str(org.id): 1}
+
+def test_manual_move_of_pending_match(app):
+    admin = add_user('admin@example.org', 'admin')
+    old_org = add_organization('old', available=1, filled=0)
+    new_org = add_organization('new', available=1, filled=0)
+    match = add_match(add_student('moved', 'pending'), old_org, 'pending')
+    db.session.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+        session['_fresh'] = True
+    response = client.put(
+        f"/admin/matching/{match.id}", json={'organization_id': new_org.id}
+    )
+    assert response.status_code == 200
+
+    # A pending match takes no position, so the seat is not counted twice
+    assert OrganizationProfile.query.get(new_org.id).filled_positions == 0
+    report = response.get_json()['verification']
+    assert report['valid'], report['errors']